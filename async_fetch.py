@@ -0,0 +1,125 @@
+# Descarga masiva de tickers con asyncio
+# Lanza todas las peticiones a la vez con un límite de concurrencia; las
+# peticiones repetidas del mismo (ticker, rango, intervalo) se agrupan en una
+# sola descarga; los errores transitorios (5xx, 429, red) se reintentan con
+# espera exponencial y los fallos de un ticker no detienen al resto: se
+# devuelven en el informe por ticker.
+# Las barras se guardan en el almacén local (bar_store.py), así que solo se
+# descargan los tramos que falten. Los proveedores son bloqueantes (yfinance,
+# urllib), de modo que cada descarga corre en un hilo (asyncio.to_thread) y el
+# bucle de eventos solo coordina.
+#
+#   python3 async_fetch.py                           # DXY y sus seis divisas
+#   python3 async_fetch.py EURUSD=X JPY=X --concurrencia 4 --reintentos 5
+import argparse
+import asyncio
+import random
+import sys
+import time
+from collections import namedtuple
+
+import columnar
+from bar_store import BarStore
+
+# DXY y las seis divisas que lo componen (cotizaciones de Yahoo Finance)
+TICKERS_DXY = ['DX-Y.NYB', 'EURUSD=X', 'JPY=X', 'GBPUSD=X', 'CAD=X', 'SEK=X', 'CHF=X']
+
+Resultado = namedtuple('Resultado', ['ticker', 'ok', 'filas', 'intentos', 'error', 'segundos'])
+
+
+def es_transitorio(error):
+    # Errores que merece la pena reintentar
+    import urllib.error
+
+    if isinstance(error, urllib.error.HTTPError):
+        return error.code >= 500 or error.code == 429
+    return isinstance(error, (OSError, TimeoutError))
+
+
+class BulkFetcher:
+
+    def __init__(self, store=None, concurrencia=8, reintentos=3, espera=0.5, espera_max=8.0):
+        self.store = store or BarStore()
+        self.reintentos = reintentos
+        self.espera = espera
+        self.espera_max = espera_max
+        self._semaforo = asyncio.Semaphore(concurrencia)
+        # Descargas en curso: {(ticker, inicio, fin, intervalo): tarea}
+        self._en_curso = {}
+        # Un ticker/intervalo comparte directorio en el almacén: una escritura a la vez
+        self._locks = {}
+
+    async def _descargar(self, ticker, start, end, interval):
+        t0 = time.perf_counter()
+        lock = self._locks.setdefault((ticker, interval), asyncio.Lock())
+        intentos = 0
+        while True:
+            intentos += 1
+            try:
+                async with lock, self._semaforo:
+                    barras = await asyncio.to_thread(self.store.get, ticker, start, end, interval)
+                if not len(barras):
+                    # Ticker inexistente o descarga fallida sin excepción (yfinance)
+                    return Resultado(ticker, False, 0, intentos, ValueError('sin barras en el rango'),
+                                     time.perf_counter() - t0)
+                return Resultado(ticker, True, len(barras), intentos, None, time.perf_counter() - t0)
+            except Exception as e:
+                if intentos > self.reintentos or not es_transitorio(e):
+                    return Resultado(ticker, False, 0, intentos, e, time.perf_counter() - t0)
+            # Espera exponencial con jitter para no sincronizar los reintentos
+            espera = min(self.espera_max, self.espera * 2 ** (intentos - 1))
+            await asyncio.sleep(espera * random.uniform(0.5, 1.0))
+
+    def fetch(self, ticker, start, end, interval='1d'):
+        # Tarea de descarga; si ya hay una igual en curso se devuelve esa
+        clave = (ticker, columnar.a_ns(start), columnar.a_ns(end), interval)
+        tarea = self._en_curso.get(clave)
+        if tarea is None:
+            tarea = asyncio.ensure_future(self._descargar(ticker, start, end, interval))
+            self._en_curso[clave] = tarea
+            tarea.add_done_callback(lambda _: self._en_curso.pop(clave, None))
+        return tarea
+
+    async def fetch_all(self, peticiones):
+        # peticiones: iterable de (ticker, start, end[, interval]).
+        # Devuelve {ticker: Resultado} (con varios rangos por ticker, el último).
+        tareas = [self.fetch(*peticion) for peticion in peticiones]
+        return {resultado.ticker: resultado for resultado in await asyncio.gather(*tareas)}
+
+
+def fetch_bulk(tickers, start, end, interval='1d', store=None, **opciones):
+    # Atajo síncrono: mismos rango e intervalo para todos los tickers
+    async def _lote():
+        fetcher = BulkFetcher(store, **opciones)
+        return await fetcher.fetch_all((ticker, start, end, interval) for ticker in tickers)
+
+    return asyncio.run(_lote())
+
+
+def imprimir_informe(resultados):
+    fallidos = [r for r in resultados.values() if not r.ok]
+    for r in resultados.values():
+        if r.ok:
+            print(f"✓ {r.ticker}: {r.filas} barras ({r.intentos} intento(s), {r.segundos:.2f} s)")
+        else:
+            print(f"✗ {r.ticker}: {type(r.error).__name__}: {r.error} ({r.intentos} intento(s))")
+    print(f"{len(resultados) - len(fallidos)}/{len(resultados)} tickers descargados")
+    return fallidos
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Descarga concurrente de tickers al almacén local')
+    parser.add_argument('tickers', nargs='*', default=TICKERS_DXY)
+    parser.add_argument('--inicio', default='2025-01-01')
+    parser.add_argument('--fin', default='2026-01-05')
+    parser.add_argument('--intervalo', default='1d')
+    parser.add_argument('--concurrencia', type=int, default=8)
+    parser.add_argument('--reintentos', type=int, default=3)
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    resultados = fetch_bulk(args.tickers, args.inicio, args.fin, args.intervalo,
+                            concurrencia=args.concurrencia, reintentos=args.reintentos)
+    fallidos = imprimir_informe(resultados)
+    print(f"Tiempo total: {time.perf_counter() - t0:.2f} s")
+    sys.exit(1 if fallidos else 0)
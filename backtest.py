@@ -0,0 +1,218 @@
+# Backtest de cruces de medias móviles sobre una rejilla de ventanas
+# Generaliza la señal de graph_ds.py (ALCISTA si MA_rápida > MA_lenta) a todos
+# los pares (rápida, lenta) con rápida < lenta. Todas las medias salen de una
+# única suma acumulada (mismo criterio que indicators.sma, min_periods=1) y,
+# para cada ventana rápida, las señales y rendimientos de todas las lentas se
+# calculan a la vez como arrays 2-D (lentas x barras). La posición decidida
+# al cierre de una barra se aplica al rendimiento de la siguiente.
+# Para varios tickers, los bloques de ventanas rápidas se reparten en un pool
+# de procesos. El resultado es una superficie de rendimiento total, máximo
+# drawdown, porcentaje de acierto y número de operaciones por par.
+#
+#   python3 backtest.py --csv dxy_datos_2025-01-01_2026-01-05.csv --rapidas 2 50 --lentas 5 120
+#   python3 backtest.py --sintetico 30 --workers 4 --png superficie.png   # ~30 años diarios
+import argparse
+import multiprocessing
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+Superficie = namedtuple('Superficie', ['rapidas', 'lentas', 'rendimiento', 'drawdown',
+                                       'acierto', 'operaciones'])
+
+MODOS = ('largo_corto', 'largo')
+
+
+def medias(close, ventanas):
+    # {ventana: media móvil centrada en close[0]} con una sola suma acumulada.
+    # Centrar no cambia las comparaciones entre medias y conserva precisión.
+    # Las ventanas más largas que la serie no tienen media y se omiten.
+    x = np.ascontiguousarray(close, dtype=np.float64)
+    acumulado = np.concatenate(([0.0], np.cumsum(x - x[0])))
+    n = len(x)
+    posiciones = np.arange(1, n + 1)
+    resultado = {}
+    for w in ventanas:
+        if w > n:
+            continue
+        suma = acumulado[1:].copy()
+        suma[w:] -= acumulado[1:n - w + 1]
+        resultado[w] = suma / np.minimum(posiciones, w)
+    return resultado
+
+
+def _bloque(close, rapidas, lentas, modo):
+    # Métricas de las filas `rapidas` de la superficie (todas las columnas `lentas`).
+    # Los pares con alguna ventana más larga que la serie quedan en NaN.
+    close = np.asarray(close, dtype=np.float64)
+    lentas = np.asarray(lentas)
+    mm = medias(close, sorted(set(rapidas) | set(lentas.tolist())))
+    usables = lentas <= len(close)
+    lentas_mm = np.stack([mm[w][:-1] for w in lentas[usables]]) if usables.any() else None
+
+    r = close[1:] / close[:-1] - 1.0
+    sube, baja = r > 0, r < 0
+    log_largo = np.log1p(r)
+    log_corto = np.log1p(-r) if modo == 'largo_corto' else np.zeros_like(r)
+
+    forma = (len(rapidas), len(lentas))
+    rendimiento, drawdown, acierto = np.full(forma, np.nan), np.full(forma, np.nan), np.full(forma, np.nan)
+    operaciones = np.zeros(forma, dtype=np.int64)
+    for i, f in enumerate(rapidas):
+        validas = usables & (lentas > f)
+        if not validas.any():
+            continue
+        # Posición al cierre de cada barra (salvo la última): True = largo
+        largo = mm[f][:-1] > lentas_mm[validas[usables]]
+        curva = np.cumsum(np.where(largo, log_largo, log_corto), axis=1)
+        rendimiento[i, validas] = np.expm1(curva[:, -1])
+        # Máximo histórico de la curva, contando el capital inicial (log = 0)
+        pico = np.maximum(np.maximum.accumulate(curva, axis=1), 0.0)
+        drawdown[i, validas] = np.expm1((curva - pico).min(axis=1))
+
+        if modo == 'largo_corto':
+            aciertos = np.where(largo, sube, baja).sum(axis=1)
+            expuestas = np.count_nonzero(r)
+        else:
+            aciertos = (largo & sube).sum(axis=1)
+            expuestas = (largo & (sube | baja)).sum(axis=1)
+        acierto[i, validas] = aciertos / np.maximum(expuestas, 1)
+        operaciones[i, validas] = np.count_nonzero(largo[:, 1:] != largo[:, :-1], axis=1)
+    return rendimiento, drawdown, acierto, operaciones
+
+
+def _trabajo(argumentos):
+    ticker, inicio, close, rapidas, lentas, modo = argumentos
+    return ticker, inicio, _bloque(close, rapidas, lentas, modo)
+
+
+def barrer(series, rapidas=range(2, 201), lentas=range(2, 401), modo='largo_corto',
+           workers=None, bloque=None):
+    # series: {ticker: cierres}. Devuelve {ticker: Superficie}.
+    if modo not in MODOS:
+        raise ValueError(f"Modo desconocido: {modo} (válidos: {', '.join(MODOS)})")
+    rapidas, lentas = np.asarray(list(rapidas)), np.asarray(list(lentas))
+    if workers is None:
+        workers = os.cpu_count() or 1
+    # Igual que render_farm.py: solo 'fork' (los scripts no tienen guarda __main__)
+    if 'fork' not in multiprocessing.get_all_start_methods():
+        workers = 1
+    if bloque is None:
+        # Unos cuantos bloques por worker para repartir bien la carga
+        bloque = max(1, -(-len(rapidas) * len(series) // (workers * 4)))
+
+    trabajos = [(ticker, inicio, np.asarray(close, dtype=np.float64),
+                 rapidas[inicio:inicio + bloque].tolist(), lentas, modo)
+                for ticker, close in series.items()
+                for inicio in range(0, len(rapidas), bloque)]
+
+    forma = (len(rapidas), len(lentas))
+    superficies = {ticker: Superficie(rapidas, lentas, np.full(forma, np.nan), np.full(forma, np.nan),
+                                      np.full(forma, np.nan), np.zeros(forma, dtype=np.int64))
+                   for ticker in series}
+
+    if workers <= 1:
+        resultados = map(_trabajo, trabajos)
+        return _reunir(superficies, resultados)
+
+    with ProcessPoolExecutor(max_workers=workers,
+                             mp_context=multiprocessing.get_context('fork')) as pool:
+        return _reunir(superficies, pool.map(_trabajo, trabajos))
+
+
+def _reunir(superficies, resultados):
+    for ticker, inicio, metricas in resultados:
+        superficie = superficies[ticker]
+        filas = slice(inicio, inicio + len(metricas[0]))
+        for destino, valores in zip(superficie[2:], metricas):
+            destino[filas] = valores
+    return superficies
+
+
+def mejores(superficie, n=5, metrica='rendimiento'):
+    # Los n mejores pares [(rápida, lenta, rendimiento, drawdown, acierto, operaciones)]
+    valores = getattr(superficie, metrica)
+    orden = np.argsort(np.where(np.isnan(valores), -np.inf, valores), axis=None)[::-1][:n]
+    filas, columnas = np.unravel_index(orden, valores.shape)
+    return [(int(superficie.rapidas[i]), int(superficie.lentas[j]),
+             float(superficie.rendimiento[i, j]), float(superficie.drawdown[i, j]),
+             float(superficie.acierto[i, j]), int(superficie.operaciones[i, j]))
+            for i, j in zip(filas, columnas)]
+
+
+def guardar(superficie, ruta):
+    np.savez_compressed(ruta, **superficie._asdict())
+
+
+def cargar(ruta):
+    with np.load(ruta) as datos:
+        return Superficie(**{campo: datos[campo] for campo in Superficie._fields})
+
+
+def _serie_sintetica(anos, semilla=42):
+    # ~252 barras por año a partir de los rendimientos reales del DXY
+    import sys
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks'))
+    from bench_indicators import serie_sintetica
+
+    return serie_sintetica(int(anos * 252), semilla)['Close'].to_numpy()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Rejilla de backtests de cruces de medias')
+    origen = parser.add_mutually_exclusive_group()
+    origen.add_argument('--csv', nargs='*', help='CSV con columna Close (uno por ticker)')
+    origen.add_argument('--tickers', nargs='*', help='tickers del almacén local (bar_store.py)')
+    origen.add_argument('--sintetico', type=float, help='años de datos diarios sintéticos')
+    parser.add_argument('--inicio', default='2025-01-01')
+    parser.add_argument('--fin', default='2026-01-05')
+    parser.add_argument('--rapidas', type=int, nargs=2, default=(2, 200), metavar=('MIN', 'MAX'))
+    parser.add_argument('--lentas', type=int, nargs=2, default=(2, 400), metavar=('MIN', 'MAX'))
+    parser.add_argument('--modo', choices=MODOS, default='largo_corto')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--npz', help='guarda la superficie (un archivo por ticker: {ticker})')
+    parser.add_argument('--png', help='mapa de calor de la superficie ({ticker} en el nombre si hay varios)')
+    args = parser.parse_args()
+
+    if args.tickers:
+        from bar_store import get_bars
+        series = {t: get_bars(t, args.inicio, args.fin)['Close'].to_numpy() for t in args.tickers}
+    elif args.sintetico:
+        series = {'SINTETICO': _serie_sintetica(args.sintetico)}
+    else:
+        import pandas as pd
+        rutas = args.csv or [os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                          'dxy_datos_2025-01-01_2026-01-05.csv')]
+        series = {os.path.splitext(os.path.basename(r))[0]: pd.read_csv(r)['Close'].to_numpy()
+                  for r in rutas}
+
+    rapidas = range(args.rapidas[0], args.rapidas[1] + 1)
+    lentas = range(args.lentas[0], args.lentas[1] + 1)
+    t0 = time.perf_counter()
+    superficies = barrer(series, rapidas, lentas, args.modo, args.workers)
+    segundos = time.perf_counter() - t0
+    pares = sum(int(np.count_nonzero(~np.isnan(s.rendimiento))) for s in superficies.values())
+    print(f"{pares:,} pares sobre {len(series)} serie(s) en {segundos:.2f} s")
+
+    for ticker, superficie in superficies.items():
+        print(f"\n{ticker} ({len(series[ticker])} barras) - mejores pares por rendimiento:")
+        print(f"{'rápida':>7}{'lenta':>7}{'rend.':>10}{'máx DD':>10}{'acierto':>9}{'oper.':>7}")
+        for f, s, rend, dd, hit, ops in mejores(superficie):
+            print(f"{f:>7}{s:>7}{rend:>+10.2%}{dd:>10.2%}{hit:>9.1%}{ops:>7}")
+        if args.npz:
+            guardar(superficie, args.npz.format(ticker=ticker))
+
+    if args.png:
+        os.environ.setdefault('DXY_HEADLESS', '1')
+        from render_farm import RenderJob, render_all
+
+        hechos, errores = render_all([RenderJob('superficie_backtest', (superficie, ticker),
+                                                args.png.format(ticker=ticker), dict(dpi=150))
+                                      for ticker, superficie in superficies.items()])
+        for ruta in hechos:
+            print(f"✓ {ruta}")
+        for ruta, error in errores.items():
+            print(f"✗ {ruta}: {error}")
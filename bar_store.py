@@ -0,0 +1,237 @@
+# Almacén local de barras OHLC en disco
+# Cada par (ticker, intervalo) tiene su propio directorio con las barras (en
+# formato columnar binario, ver columnar.py) y el rango de fechas que ya se ha
+# consultado. Al pedir un rango solo se descargan
+# los tramos que faltan al principio o al final; el resto se sirve desde disco.
+# pandas se importa al usarlo: columnas_cubiertas() solo necesita numpy.
+# Los agregados por día/semana/mes/trimestre (piramide.py) se actualizan al
+# guardar barras nuevas y get_resolucion() sirve el nivel adecuado a un ancho.
+import json
+import os
+
+import columnar
+import piramide
+from data_sources import get_provider
+from instrumentation import etapa
+
+CACHE_DIR = os.environ.get(
+    'DXY_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.dxy_cache'))
+
+COLUMNAS = columnar.COLUMNAS
+
+
+def _a_fecha(valor):
+    import pandas as pd
+
+    fecha = pd.Timestamp(valor)
+    if fecha.tzinfo is not None:
+        fecha = fecha.tz_convert('UTC').tz_localize(None)
+    return fecha
+
+
+def _normalizar(datos):
+    # Índice sin zona horaria (UTC) y solo columnas OHLCV, en orden fijo
+    import pandas as pd
+
+    if datos is None or len(datos) == 0:
+        return pd.DataFrame(columns=COLUMNAS, index=pd.DatetimeIndex([], name='Date'),
+                            dtype='float64')
+
+    datos = datos[[c for c in COLUMNAS if c in datos.columns]]
+    indice = pd.DatetimeIndex(datos.index)
+    if indice.tz is not None:
+        indice = indice.tz_convert('UTC').tz_localize(None)
+    datos = datos.set_axis(indice.rename('Date'), axis=0)
+    return datos.reindex(columns=COLUMNAS).astype('float64')
+
+
+def tramos_faltantes(cobertura, start, end):
+    # Devuelve los sub-rangos [a, b) de [start, end) que no están cubiertos.
+    # La cobertura es un único intervalo contiguo; si el rango pedido queda
+    # separado de ella se descarga también el hueco para mantenerla contigua.
+    if cobertura is None:
+        return [(start, end)]
+
+    cub_inicio, cub_fin = cobertura
+    tramos = []
+    if start < cub_inicio:
+        tramos.append((start, cub_inicio))
+    if end > cub_fin:
+        tramos.append((cub_fin, end))
+    return tramos
+
+
+class BarStore:
+
+    def __init__(self, root=CACHE_DIR, provider=None):
+        self.root = root
+        self.provider = get_provider(provider)
+
+    def directorio(self, ticker, interval='1d'):
+        nombre = f"{ticker}_{interval}".replace('/', '_').replace('^', '_')
+        return os.path.join(self.root, nombre)
+
+    def _ruta_meta(self, ticker, interval):
+        return os.path.join(self.directorio(ticker, interval), 'meta.json')
+
+    def _migrar_csv(self, ticker, interval):
+        # Almacenes antiguos guardaban las barras en bars.csv: se pasan a columnar
+        import pandas as pd
+
+        base = self.directorio(ticker, interval)
+        ruta_csv = os.path.join(base, 'bars.csv')
+        if os.path.exists(ruta_csv) and columnar.leer_cabecera(base) is None:
+            barras = _normalizar(pd.read_csv(ruta_csv, index_col=0, parse_dates=True))
+            columnar.escribir(base, barras)
+            os.remove(ruta_csv)
+
+    def cobertura(self, ticker, interval='1d'):
+        # Rango [inicio, fin) ya consultado, o None si no hay nada guardado
+        import pandas as pd
+
+        ruta_meta = self._ruta_meta(ticker, interval)
+        if not os.path.exists(ruta_meta):
+            return None
+        self._migrar_csv(ticker, interval)
+        with open(ruta_meta) as f:
+            meta = json.load(f)
+        return pd.Timestamp(meta['inicio']), pd.Timestamp(meta['fin'])
+
+    def archivo(self, ticker, interval='1d'):
+        # Barras guardadas como columnas memmap (columnar.BarFile), o None
+        base = self.directorio(ticker, interval)
+        if columnar.leer_cabecera(base) is None:
+            return None
+        return columnar.BarFile(base)
+
+    def cargar(self, ticker, interval='1d', start=None, end=None):
+        # Barras guardadas en [start, end) (todas por defecto) y su cobertura
+        cobertura = self.cobertura(ticker, interval)
+        archivo = self.archivo(ticker, interval)
+        if archivo is None:
+            return _normalizar(None), cobertura
+        return archivo.dataframe(start, end), cobertura
+
+    def columnas_cubiertas(self, ticker, start, end, interval='1d'):
+        # Vista rápida sin pandas: {columna: memmap} de [start, end) si el rango
+        # ya está cubierto en disco (lo mismo que get() serviría sin descargar),
+        # o None si habría que descargar algo
+        base = self.directorio(ticker, interval)
+        ruta_meta = self._ruta_meta(ticker, interval)
+        if not self.provider.cacheable or not os.path.exists(ruta_meta):
+            return None
+        if columnar.leer_cabecera(base) is None:
+            return None
+        with open(ruta_meta) as f:
+            meta = json.load(f)
+
+        start, end = columnar.a_ns(start), columnar.a_ns(end)
+        if start < columnar.a_ns(meta['inicio']) or end > columnar.a_ns(meta['fin']):
+            return None
+        return columnar.BarFile(base).columnas(start, end)
+
+    def _guardar_cobertura(self, ticker, interval, cobertura):
+        ruta_meta = self._ruta_meta(ticker, interval)
+        meta = {'ticker': ticker, 'interval': interval,
+                'inicio': str(cobertura[0]), 'fin': str(cobertura[1])}
+        with open(ruta_meta + '.tmp', 'w') as f:
+            json.dump(meta, f, indent=2)
+        os.replace(ruta_meta + '.tmp', ruta_meta)
+
+    def _guardar_barras(self, ticker, interval, nuevas):
+        import pandas as pd
+
+        base = self.directorio(ticker, interval)
+        archivo = self.archivo(ticker, interval)
+        if archivo is None or len(archivo) == 0:
+            columnar.escribir(base, nuevas)
+        elif nuevas.index[0] >= archivo.primera_fecha():
+            # Caso habitual (tramo final): solo se escriben las filas nuevas
+            columnar.anadir(base, nuevas)
+        else:
+            # Tramo inicial: se reescribe la serie completa
+            todas = pd.concat([nuevas, archivo.dataframe()])
+            todas = todas[~todas.index.duplicated(keep='first')].sort_index()
+            del archivo  # suelta los memmap antes de sustituir los archivos
+            columnar.escribir(base, todas)
+
+        # La pirámide, si ya se ha construido, se pone al día desde la primera barra nueva
+        if piramide.existe(base):
+            with etapa('piramide', ticker=ticker):
+                piramide.actualizar(base, interval, desde=nuevas.index[0])
+
+    def get(self, ticker, start, end, interval='1d'):
+        # Barras de [start, end) servidas desde disco, descargando solo lo que falte
+        start, end = _a_fecha(start), _a_fecha(end)
+
+        # Las fuentes locales (reproducción de CSV) no pasan por el almacén
+        if not self.provider.cacheable:
+            with etapa('descarga', ticker=ticker, proveedor=self.provider.nombre):
+                barras = _normalizar(self.provider.download(ticker, start, end, interval))
+            return barras.loc[(barras.index >= start) & (barras.index < end)]
+
+        self.completar(ticker, start, end, interval)
+        with etapa('almacen', ticker=ticker):
+            return self.cargar(ticker, interval, start, end)[0]
+
+    def completar(self, ticker, start, end, interval='1d'):
+        # Descarga y guarda los tramos de [start, end) que aún no estén en disco
+        import pandas as pd
+
+        if not self.provider.cacheable:
+            return
+        start, end = _a_fecha(start), _a_fecha(end)
+        cobertura = self.cobertura(ticker, interval)
+        tramos = tramos_faltantes(cobertura, start, end)
+        if not tramos:
+            return
+        os.makedirs(self.directorio(ticker, interval), exist_ok=True)
+        # Nunca se da por cubierto el día en curso: su barra aún puede cambiar
+        hoy = pd.Timestamp.today().normalize()
+        inicio_cub, fin_cub = cobertura if cobertura is not None else (None, None)
+        for inicio, fin in tramos:
+            with etapa('descarga', ticker=ticker, proveedor=self.provider.nombre):
+                nuevas = _normalizar(self.provider.download(ticker, inicio.strftime('%Y-%m-%d'),
+                                                            fin.strftime('%Y-%m-%d'), interval))
+            nuevas = nuevas[~nuevas.index.duplicated(keep='last')].sort_index()
+            # yfinance devuelve un DataFrame vacío ante errores de red: un tramo
+            # sin barras no se da por cubierto y se vuelve a pedir la próxima vez
+            if not len(nuevas):
+                continue
+            self._guardar_barras(ticker, interval, nuevas)
+            # Los tramos están a un lado u otro de la cobertura: la unión sigue
+            # siendo contigua
+            fin = min(fin, hoy)
+            if inicio_cub is None:
+                inicio_cub, fin_cub = inicio, fin
+            else:
+                inicio_cub, fin_cub = min(inicio, inicio_cub), max(fin, fin_cub)
+
+        if inicio_cub is not None and (inicio_cub, fin_cub) != cobertura:
+            self._guardar_cobertura(ticker, interval, (inicio_cub, max(fin_cub, inicio_cub)))
+
+    def get_resolucion(self, ticker, start, end, puntos, interval='1d', descargar=True):
+        # (intervalo, barras) para dibujar [start, end) en `puntos` píxeles de
+        # ancho: el nivel más grueso de la pirámide con al menos una barra por
+        # píxel, o las barras guardadas si ninguno llega.
+        # descargar=False: el llamador ya ha completado el rango
+        if not self.provider.cacheable:
+            return interval, self.get(ticker, start, end, interval)
+        if descargar:
+            self.completar(ticker, start, end, interval)
+        if not piramide.niveles(interval):
+            return interval, self.cargar(ticker, interval, start, end)[0]
+        base = self.directorio(ticker, interval)
+        if self.archivo(ticker, interval) is None:
+            return interval, _normalizar(None)
+        with etapa('piramide', ticker=ticker):
+            piramide.actualizar(base, interval)
+        with etapa('almacen', ticker=ticker):
+            nivel, archivo, filas = piramide.elegir(base, interval, start, end, puntos)
+            return nivel, piramide.dataframe(archivo, filas)
+
+
+def get_bars(ticker, start, end, interval='1d', store=None, provider=None):
+    # Atajo para los scripts: usa el almacén y el proveedor por defecto
+    return (store or BarStore(provider=provider)).get(ticker, start, end, interval)
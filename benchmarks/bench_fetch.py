@@ -0,0 +1,95 @@
+# Benchmark del descargador concurrente (async_fetch.py) contra el servidor
+# local de respuestas grabadas (stub_server.py), sin red.
+# Graba N tickers sintéticos a partir del CSV del DXY, inyecta latencia por
+# petición, fallos 503 recuperables en algunos tickers, uno que no se recupera
+# y otro sin grabación (404), y pide cada ticker dos veces para comprobar que
+# las peticiones repetidas se agrupan. Compara la descarga secuencial
+# (concurrencia 1) con la concurrente sobre almacenes vacíos.
+#
+#   python3 benchmarks/bench_fetch.py
+#   python3 benchmarks/bench_fetch.py --tickers 60 --latencia 0.1 --concurrencia 16
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from async_fetch import BulkFetcher, imprimir_informe  # noqa: E402
+from bar_store import BarStore  # noqa: E402
+from data_sources import HttpProvider  # noqa: E402
+from stub_server import StubServer, nombre_grabacion  # noqa: E402
+
+CSV_DXY = os.path.join(RAIZ, 'dxy_datos_2025-01-01_2026-01-05.csv')
+INICIO, FIN = '2025-01-01', '2026-01-05'
+
+
+def grabaciones(directorio, n):
+    # n tickers sintéticos (el DXY escalado) más los casos de fallo
+    base = pd.read_csv(CSV_DXY, index_col=0, parse_dates=True)
+    tickers = [f'SINT{i:03d}' for i in range(n)]
+    for i, ticker in enumerate(tickers):
+        escalado = base.copy()
+        escalado[['Open', 'High', 'Low', 'Close']] *= 1 + i / 100
+        escalado.to_csv(os.path.join(directorio, nombre_grabacion(ticker)))
+    return tickers
+
+
+def ejecutar(stub, tickers, concurrencia, reintentos):
+    with tempfile.TemporaryDirectory() as cache:
+        store = BarStore(cache, provider=HttpProvider(stub.url))
+
+        async def _lote():
+            fetcher = BulkFetcher(store, concurrencia=concurrencia, reintentos=reintentos,
+                                  espera=0.01, espera_max=0.05)
+            # Cada ticker se pide dos veces: la segunda se une a la primera
+            return await fetcher.fetch_all([(t, INICIO, FIN) for t in tickers] * 2)
+
+        t0 = time.perf_counter()
+        resultados = asyncio.run(_lote())
+        return resultados, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de async_fetch.py contra stub_server.py')
+    parser.add_argument('--tickers', type=int, default=40)
+    parser.add_argument('--latencia', type=float, default=0.05)
+    parser.add_argument('--concurrencia', type=int, default=8)
+    parser.add_argument('--reintentos', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        tickers = grabaciones(directorio, args.tickers)
+        recuperables = {tickers[0]: 2, tickers[1]: 1}
+        permanente = {tickers[2]: args.reintentos + 5}
+        pedidos = tickers + ['SIN-GRABACION']
+
+        for concurrencia in (1, args.concurrencia):
+            with StubServer(directorio, latencia=args.latencia,
+                            fallos={**recuperables, **permanente}) as stub:
+                resultados, segundos = ejecutar(stub, pedidos, concurrencia, args.reintentos)
+                peticiones = dict(stub.peticiones)
+
+            print(f"\n=== concurrencia {concurrencia}: {segundos:.2f} s "
+                  f"({len(pedidos) / segundos:.1f} tickers/s) ===")
+            fallidos = imprimir_informe({t: resultados[t] for t in pedidos[:3] + pedidos[-1:]})
+            ok = sum(r.ok for r in resultados.values())
+            print(f"Total: {ok}/{len(pedidos)} correctos")
+
+            # Comprobaciones: agrupación, reintentos y fallos parciales
+            esperadas = {t: 1 + recuperables.get(t, 0) for t in tickers}
+            esperadas[tickers[2]] = args.reintentos + 1
+            esperadas['SIN-GRABACION'] = 1
+            assert peticiones == esperadas, "peticiones HTTP inesperadas (¿agrupación o reintentos?)"
+            assert {r.ticker for r in fallidos} == {tickers[2], 'SIN-GRABACION'}
+            assert ok == len(pedidos) - 2
+            print("✓ Agrupación de duplicados, reintentos y fallos parciales correctos")
+
+
+if __name__ == '__main__':
+    main()
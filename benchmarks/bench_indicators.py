@@ -0,0 +1,134 @@
+# Micro-benchmark: indicadores NumPy (indicators.py) frente a las versiones pandas
+# Genera una serie sintética de N barras a partir de los rendimientos reales del
+# CSV del DXY, comprueba que ambas implementaciones coinciden dentro de la
+# tolerancia y muestra el tiempo de cada una.
+#
+#   python3 benchmarks/bench_indicators.py            # 10^6 barras
+#   python3 benchmarks/bench_indicators.py --bars 100000
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import indicators  # noqa: E402
+
+CSV_DXY = os.path.join(RAIZ, 'dxy_datos_2025-01-01_2026-01-05.csv')
+
+# Diferencia máxima admitida, relativa a la escala de cada indicador
+TOLERANCIA = 1e-6
+
+
+def serie_sintetica(n, semilla=42, banda=0.15):
+    # Remuestreo de los rendimientos diarios reales hasta tener n barras.
+    # Los log-rendimientos se centran y el camino se refleja dentro de una
+    # banda de ±15 % alrededor del primer cierre, para que la serie no derive
+    # hacia cero o infinito por mucho que crezca n.
+    reales = pd.read_csv(CSV_DXY, index_col=0, parse_dates=True)
+    rng = np.random.default_rng(semilla)
+    rend = np.log(reales['Close']).diff().dropna().to_numpy()
+    rango = ((reales['High'] - reales['Low']) / reales['Close']).to_numpy()
+
+    camino = np.cumsum(rng.choice(rend - rend.mean(), n))
+    camino = banda - np.abs(np.mod(camino + banda, 4 * banda) - 2 * banda)
+    close = reales['Close'].iloc[0] * np.exp(camino)
+    amplitud = close * rng.choice(rango, n)
+    high = close + amplitud * rng.random(n)
+    low = high - amplitud
+    indice = pd.date_range('1990-01-01', periods=n, freq='min')
+    return pd.DataFrame({'High': high, 'Low': low, 'Close': close}, index=indice)
+
+
+def pandas_indicadores(datos):
+    close = datos['Close']
+    resultado = {}
+    for ventana in (20, 50):
+        resultado[f'MA_{ventana}'] = close.rolling(window=ventana, min_periods=1).mean()
+        resultado[f'EMA_{ventana}'] = close.ewm(span=ventana, adjust=False).mean()
+
+    delta = close.diff()
+    gain = delta.where(delta > 0, 0)
+    loss = -delta.where(delta < 0, 0)
+    resultado['RSI'] = 100 - (100 / (1 + gain.rolling(window=14).mean() / loss.rolling(window=14).mean()))
+    wilder_gain = gain.ewm(alpha=1 / 14, adjust=False, min_periods=14).mean()
+    wilder_loss = loss.ewm(alpha=1 / 14, adjust=False, min_periods=14).mean()
+    resultado['RSI_Wilder'] = 100 - (100 / (1 + wilder_gain / wilder_loss))
+
+    cierre_previo = close.shift()
+    tr = pd.concat([datos['High'] - datos['Low'],
+                    (datos['High'] - cierre_previo).abs(),
+                    (datos['Low'] - cierre_previo).abs()], axis=1).max(axis=1)
+    resultado['ATR'] = tr.ewm(alpha=1 / 14, adjust=False, min_periods=14).mean()
+
+    media = close.rolling(window=20).mean()
+    desviacion = close.rolling(window=20).std()
+    resultado['BB_Media'] = media
+    resultado['BB_Superior'] = media + 2 * desviacion
+    resultado['BB_Inferior'] = media - 2 * desviacion
+    resultado['Volatilidad'] = close.pct_change().rolling(window=20).std() * 100
+    return resultado
+
+
+def numpy_indicadores(datos):
+    return indicators.compute_all(datos['High'].to_numpy(), datos['Low'].to_numpy(),
+                                  datos['Close'].to_numpy())
+
+
+def cronometrar(funcion, datos, repeticiones):
+    mejor = float('inf')
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion(datos)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor, resultado
+
+
+def comparar(esperado, obtenido):
+    errores = {}
+    for nombre, serie in esperado.items():
+        referencia = serie.to_numpy()
+        valor = obtenido[nombre]
+        if not np.array_equal(np.isnan(referencia), np.isnan(valor)):
+            errores[nombre] = float('inf')
+            continue
+        validos = ~np.isnan(referencia)
+        escala = max(1.0, np.abs(referencia[validos]).max()) if validos.any() else 1.0
+        errores[nombre] = float(np.abs(referencia[validos] - valor[validos]).max() / escala) if validos.any() else 0.0
+    return errores
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Indicadores NumPy (indicators.py) frente a pandas: equivalencia y tiempos')
+    parser.add_argument('--bars', type=int, default=10**6)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    datos = serie_sintetica(args.bars)
+    print(f"Serie sintética: {len(datos):,} barras")
+
+    t_pandas, esperado = cronometrar(pandas_indicadores, datos, args.repeat)
+    t_numpy, obtenido = cronometrar(numpy_indicadores, datos, args.repeat)
+
+    print(f"\n{'Indicador':<14}{'error relativo':>16}")
+    fallos = 0
+    for nombre, error in comparar(esperado, obtenido).items():
+        marca = '✓' if error <= TOLERANCIA else '✗'
+        fallos += error > TOLERANCIA
+        print(f"{nombre:<14}{error:>16.2e}  {marca}")
+
+    print(f"\npandas: {t_pandas * 1000:9.1f} ms")
+    print(f"numpy:  {t_numpy * 1000:9.1f} ms")
+    print(f"Mejora: x{t_pandas / t_numpy:.1f}")
+
+    if fallos:
+        print(f"\n{fallos} indicadores fuera de tolerancia ({TOLERANCIA:g})")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
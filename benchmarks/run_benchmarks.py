@@ -0,0 +1,236 @@
+# Suite de benchmarks del pipeline: obtención/normalización -> indicadores ->
+# estadísticas -> render, sobre el CSV del DXY incluido en el repo y sobre
+# series sintéticas escaladas a partir de él (10^4 a 10^7 barras).
+# Cada etapa se mide por separado (mejor tiempo y mediana de --repeat
+# repeticiones; la preparación de los datos no cuenta) y los resultados se
+# guardan en JSON junto con el commit y las versiones, para comparar entre
+# commits. Las etapas que escriben un archivo (savefig, perfiles de
+# perfiles.py) anotan también sus bytes:
+#
+#   python3 benchmarks/run_benchmarks.py                         # -> benchmarks/resultados/<commit>.json
+#   python3 benchmarks/run_benchmarks.py --tamanos 10000 100000 --dpi 100 300
+#   python3 benchmarks/run_benchmarks.py --comparar benchmarks/resultados/abc1234.json
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+
+import numpy as np
+import pandas as pd
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import matplotlib.pyplot as plt  # noqa: E402
+
+import bar_store  # noqa: E402
+import charts  # noqa: E402
+import columnar  # noqa: E402
+import indicators  # noqa: E402
+import perfiles  # noqa: E402
+from bench_indicators import CSV_DXY, serie_sintetica  # noqa: E402
+from data_sources import aplanar_columnas  # noqa: E402
+from dxy_cli import estadisticas  # noqa: E402
+
+TAMANOS = (10_000, 100_000, 1_000_000, 10_000_000)
+DPIS = (72, 150, 300)
+RESULTADOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'resultados')
+# Diferencia a partir de la cual --comparar marca una regresión
+UMBRAL_REGRESION = 0.10
+
+
+def datos_reales():
+    return bar_store._normalizar(pd.read_csv(CSV_DXY, index_col=0, parse_dates=True))
+
+
+def datos_sinteticos(n):
+    datos = serie_sintetica(n)
+    datos['Open'] = np.r_[datos['Close'].iloc[0], datos['Close'].to_numpy()[:-1]]
+    datos['Volume'] = 0.0
+    datos.index.name = 'Date'
+    return datos[bar_store.COLUMNAS]
+
+
+def con_multiindex(datos, ticker='DX-Y.NYB'):
+    # Columnas como las devuelve yf.download: ('Close', 'DX-Y.NYB'), ...
+    copia = datos.copy()
+    copia.columns = pd.MultiIndex.from_tuples([(c, ticker) for c in datos.columns])
+    return copia
+
+
+def con_indicadores(datos):
+    # MA 20/50, RSI y señal como en graph_ds.py
+    datos = datos.copy()
+    cierres = datos['Close'].to_numpy()
+    datos['MA_20'] = indicators.sma(cierres, 20, min_periods=1)
+    datos['MA_50'] = indicators.sma(cierres, 50, min_periods=1)
+    datos['RSI'] = indicators.rsi_simple(cierres, 14)
+    datos['Signal'] = np.where(datos['MA_20'] > datos['MA_50'], 'ALCISTA', 'BAJISTA')
+    return datos
+
+
+def medir(funcion, preparar, repeticiones):
+    # Tiempos de funcion(preparar()) sin contar la preparación, y lo que
+    # devolvió la última llamada
+    tiempos = []
+    for _ in range(repeticiones):
+        argumento = preparar()
+        t0 = time.perf_counter()
+        salida = funcion(argumento)
+        tiempos.append(time.perf_counter() - t0)
+    return tiempos, salida
+
+
+def etapas(datos, directorio, dpis):
+    # (nombre, parámetros, función, preparación) de cada etapa medida
+    completos = con_indicadores(datos)
+    ruta_columnar = os.path.join(directorio, 'barras')
+    columnar.escribir(ruta_columnar, datos)
+
+    def guardar(formato, dpi):
+        def _guardar(fig):
+            ruta = os.path.join(directorio, f'bench.{formato}')
+            try:
+                fig.savefig(ruta, dpi=dpi, bbox_inches='tight')
+            finally:
+                plt.close(fig)
+            return ruta
+        return _guardar
+
+    def guardar_perfil(perfil, formato):
+        def _guardar(fig):
+            ruta = os.path.join(directorio, f'bench_{perfil}.{formato}')
+            try:
+                perfiles.guardar(fig, ruta, perfil)
+            finally:
+                plt.close(fig)
+            return ruta
+        return _guardar
+
+    def construir():
+        return charts.grafico_tecnico(completos, '2025-01-01', '2026-01-05')
+
+    yield ('normalizar_multiindex', {}, lambda d: bar_store._normalizar(aplanar_columnas(d)),
+           lambda: con_multiindex(datos))
+    yield ('leer_columnar', {}, lambda ruta: columnar.BarFile(ruta).dataframe(), lambda: ruta_columnar)
+    yield ('indicadores', {}, con_indicadores, lambda: datos)
+    yield ('estadisticas_pandas', {}, charts.texto_estadisticas, lambda: completos)
+    yield ('estadisticas_numpy', {}, estadisticas,
+           lambda: {'Date': completos.index.as_unit('ns').asi8,
+                    **{c: completos[c].to_numpy() for c in bar_store.COLUMNAS}})
+    yield ('construir_figura', {}, lambda _: plt.close(construir()), lambda: None)
+    for dpi in dpis:
+        yield ('savefig', {'formato': 'png', 'dpi': dpi}, guardar('png', dpi), construir)
+    yield ('savefig', {'formato': 'pdf'}, guardar('pdf', None), construir)
+    for perfil, definicion in perfiles.PERFILES.items():
+        for formato in (definicion.formato, 'pdf'):
+            yield ('guardar_perfil', {'perfil': perfil, 'formato': formato}, guardar_perfil(perfil, formato),
+                   construir)
+
+
+def ejecutar(tamanos, dpis, repeticiones, incluir_real=True):
+    resultados = []
+    series = ([('real', datos_reales)] if incluir_real else []) + \
+             [(n, lambda n=n: datos_sinteticos(n)) for n in tamanos]
+    with tempfile.TemporaryDirectory() as directorio:
+        for tamano, generar in series:
+            datos = generar()
+            print(f"\n--- {len(datos):,} barras ({tamano}) ---")
+            for nombre, parametros, funcion, preparar in etapas(datos, directorio, dpis):
+                tiempos, salida = medir(funcion, preparar, repeticiones)
+                resultado = {'etapa': nombre, 'tamano': tamano, 'barras': len(datos),
+                             'parametros': parametros, 'min_s': min(tiempos),
+                             'mediana_s': statistics.median(tiempos), 'repeticiones': repeticiones}
+                if isinstance(salida, str) and os.path.isfile(salida):
+                    resultado['bytes'] = os.path.getsize(salida)
+                resultados.append(resultado)
+                extra = ' '.join(f'{k}={v}' for k, v in parametros.items())
+                tamano_archivo = f"{resultado['bytes'] / 1024:>10.0f} KB" if 'bytes' in resultado else ''
+                print(f"{nombre:<24}{extra:<30}{resultado['min_s'] * 1000:>12.2f} ms{tamano_archivo}")
+            del datos
+    return resultados
+
+
+def _git(*args):
+    try:
+        return subprocess.run(['git', *args], cwd=RAIZ, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def metadatos():
+    return {
+        'commit': _git('rev-parse', '--short', 'HEAD'),
+        'sucio': bool(_git('status', '--porcelain', '--untracked-files=no')),
+        'fecha': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'matplotlib': matplotlib.__version__,
+        'plataforma': platform.platform(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def _clave(resultado):
+    return (resultado['etapa'], str(resultado['tamano']),
+            json.dumps(resultado['parametros'], sort_keys=True))
+
+
+def comparar(base, actual, umbral=UMBRAL_REGRESION):
+    # Imprime la variación de cada etapa respecto a base; devuelve las regresiones
+    previos = {_clave(r): r for r in base['resultados']}
+    regresiones = []
+    print(f"\nComparación con {base['meta'].get('commit')} (umbral {umbral:.0%}):")
+    for r in actual['resultados']:
+        previo = previos.get(_clave(r))
+        if previo is None:
+            continue
+        cambio = r['min_s'] / previo['min_s'] - 1
+        marca = '✗' if cambio > umbral else ('✓' if cambio < -umbral else ' ')
+        extra = ' '.join(f'{k}={v}' for k, v in r['parametros'].items())
+        print(f"{marca} {r['etapa']:<24}{extra:<30}{str(r['tamano']):>10}  "
+              f"{previo['min_s'] * 1000:>10.2f} -> {r['min_s'] * 1000:>10.2f} ms ({cambio:+.1%})")
+        if cambio > umbral:
+            regresiones.append(r)
+    return regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks por etapa del pipeline DXY')
+    parser.add_argument('--tamanos', type=int, nargs='*', default=list(TAMANOS))
+    parser.add_argument('--dpi', type=int, nargs='*', default=list(DPIS))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--sin-real', action='store_true', help='omite el CSV real del DXY')
+    parser.add_argument('--salida', help='JSON de resultados (por defecto resultados/<commit>.json)')
+    parser.add_argument('--comparar', help='JSON de una ejecución anterior')
+    parser.add_argument('--umbral', type=float, default=UMBRAL_REGRESION)
+    args = parser.parse_args()
+
+    informe = {'meta': metadatos(),
+               'resultados': ejecutar(args.tamanos, args.dpi, args.repeat, not args.sin_real)}
+
+    salida = args.salida or os.path.join(RESULTADOS, f"{informe['meta']['commit'] or 'sin_git'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(salida)), exist_ok=True)
+    with open(salida, 'w') as f:
+        json.dump(informe, f, indent=2)
+    print(f"\n✓ Resultados guardados en {salida}")
+
+    if args.comparar:
+        with open(args.comparar) as f:
+            regresiones = comparar(json.load(f), informe, args.umbral)
+        sys.exit(1 if regresiones else 0)
+
+
+if __name__ == '__main__':
+    main()
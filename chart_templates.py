@@ -0,0 +1,145 @@
+# Plantillas de figuras reutilizables
+# La figura con todo su estilo (bordes, rejilla, ticks, textos, marcadores) se
+# construye una sola vez con los constructores de charts.py. Para cada serie
+# nueva solo se actualizan los datos de los artistas identificados por gid:
+# línea (set_data), polígono de sombra (set_verts), textos (set_text), puntos
+# de máximo/mínimo (set_offsets) y posición de las anotaciones.
+import matplotlib.dates as mdates
+import matplotlib.pyplot as plt
+import numpy as np
+
+import charts
+import perfiles
+
+
+def _artistas(ax):
+    # {gid: artista} para todos los artistas etiquetados del eje
+    return {a.get_gid(): a for a in ax.get_children() if a.get_gid()}
+
+
+def _sombra(x, y, base):
+    # Vértices del polígono que deja fill_between(x, y, base)
+    return np.concatenate([
+        [[x[0], base]],
+        np.column_stack([x, y]),
+        [[x[-1], base]],
+        np.column_stack([x[::-1], np.full(len(x), base)]),
+    ])
+
+
+class ChartTemplate:
+    # Base: construye la figura con `charts.<grafico>` y la reutiliza
+
+    grafico = None
+
+    def __init__(self, close_prices, **textos):
+        self.fig = getattr(charts, self.grafico)(close_prices, **textos)
+        self.ax = self.fig.axes[0]
+        self.artistas = _artistas(self.ax)
+
+    def actualizar(self, close_prices, **textos):
+        raise NotImplementedError
+
+    def _actualizar_serie(self, close_prices):
+        close_prices = charts.serie_para_dibujar(close_prices, self.fig)
+        x = mdates.date2num(close_prices.index.to_pydatetime())
+        y = close_prices.to_numpy(dtype=float)
+        self.artistas['linea'].set_data(x, y)
+        sombra = self.artistas['sombra']
+        if hasattr(sombra, 'set_data'):
+            # matplotlib >= 3.10: FillBetweenPolyCollection guarda sus propios datos
+            sombra.set_data(x, y, y.min() * 0.99)
+        else:
+            sombra.set_verts([_sombra(x, y, y.min() * 0.99)])
+        return x, y
+
+    def _reescalar_x(self):
+        # Eje X: mismo margen automático que al construir la figura. Se llama
+        # cuando todos los artistas ya tienen los datos nuevos.
+        self.ax.relim()
+        self.ax.autoscale_view(scaley=False)
+
+    def guardar(self, ruta, **opciones):
+        # Con perfil=... en las opciones, guardado según perfiles.py
+        perfiles.guardar(self.fig, ruta, **opciones)
+
+    def cerrar(self):
+        plt.close(self.fig)
+
+
+class InfografiaTemplate(ChartTemplate):
+    grafico = 'infografia'
+
+    def actualizar(self, close_prices, **textos):
+        x, y = self._actualizar_serie(close_prices)
+        a = self.artistas
+
+        for gid, texto in textos.items():
+            a[gid].set_text(texto)
+
+        primer_valor, ultimo_valor = y[0], y[-1]
+        cambio = ((ultimo_valor / primer_valor) - 1) * 100
+        a['valor'].set_text(f'{ultimo_valor:.1f}')
+        a['cambio'].set_text(f'{cambio:+.1f}%')
+        a['cambio'].set_color(charts.VERDE if cambio >= 0 else charts.ROJO)
+
+        # Máximo y mínimo del período (primera aparición, como idxmax/idxmin)
+        i_max, i_min = int(np.argmax(y)), int(np.argmin(y))
+        a['punto_max'].set_offsets([[x[i_max], y[i_max]]])
+        a['punto_min'].set_offsets([[x[i_min], y[i_min]]])
+        a['anot_max'].xy = (x[i_max], y[i_max])
+        a['anot_max'].set_text(f'Máx: {y[i_max]:.1f}')
+        a['anot_min'].xy = (x[i_min], y[i_min])
+        a['anot_min'].set_text(f'Mín: {y[i_min]:.1f}')
+        self._reescalar_x()
+
+        # Ajustar límites para que respire
+        y_min, y_max = y.min(), y.max()
+        y_range = y_max - y_min
+        self.ax.set_ylim(y_min - y_range * 0.05, y_max + y_range * 0.15)
+        return self
+
+
+class SocialTemplate(ChartTemplate):
+    grafico = 'infografia_social'
+
+    def actualizar(self, close_prices, **textos):
+        x, y = self._actualizar_serie(close_prices)
+        for gid, texto in textos.items():
+            self.artistas[gid].set_text(texto)
+
+        cambio = ((y[-1] / y[0]) - 1) * 100
+        self.artistas['valor'].set_text(f'{y[-1]:.1f}  |  {cambio:+.1f}%')
+        self._reescalar_x()
+
+        # Sin ejes visibles: el eje Y abarca la sombra (hasta min * 0.99) con el
+        # margen automático por defecto, como al construir la figura
+        base = y.min() * 0.99
+        margen = (y.max() - base) * self.ax.margins()[1]
+        self.ax.set_ylim(base - margen, y.max() + margen)
+        return self
+
+
+PLANTILLAS = {
+    'infografia': InfografiaTemplate,
+    'infografia_social': SocialTemplate,
+}
+
+
+def render_series(grafico, series, ruta, **opciones):
+    # Renderiza muchas series con una única figura.
+    # series: {nombre: close_prices}; ruta: patrón con {nombre}, p. ej. 'infografia_{nombre}.png'
+    plantilla = None
+    rutas = []
+    try:
+        for nombre, close_prices in series.items():
+            if plantilla is None:
+                plantilla = PLANTILLAS[grafico](close_prices)
+            else:
+                plantilla.actualizar(close_prices)
+            rutas.append(ruta.format(nombre=nombre))
+            plantilla.guardar(rutas[-1], **opciones)
+    finally:
+        if plantilla is not None:
+            plantilla.cerrar()
+    return rutas
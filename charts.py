@@ -0,0 +1,597 @@
+# Constructores de gráficos compartidos por los scripts
+# Cada función recibe los datos ya descargados y devuelve la figura montada,
+# sin guardarla ni mostrarla: así la misma figura puede renderizarse en
+# cualquier formato, en este proceso o en los procesos de render_farm.py.
+import matplotlib.pyplot as plt
+import matplotlib.dates as mdates
+import pandas as pd
+
+import downsample
+from instrumentation import etapa
+
+# Colores de las infografías (graph_simple.py)
+ROJO = '#e63946'
+VERDE = '#2a9d8f'
+NARANJA = '#ff9f1c'
+AZUL = '#457b9d'
+GRIS_TEXTO = '#6c757d'
+FONDO = '#f8f9fa'
+
+# Resolución de referencia (la de savefig) para decidir cuántos puntos dibujar
+DPI_OBJETIVO = 300
+
+# Nombre corto de los tickers en rótulos (el resto se muestra tal cual)
+NOMBRES = {'DX-Y.NYB': 'DXY'}
+MESES = ('Enero', 'Febrero', 'Marzo', 'Abril', 'Mayo', 'Junio', 'Julio', 'Agosto',
+         'Septiembre', 'Octubre', 'Noviembre', 'Diciembre')
+
+# Estilo de las anotaciones de eventos (el de graph.py)
+ESTILO_EVENTOS = {
+    'arrowprops': {'facecolor': 'black', 'shrink': 0.05, 'width': 1, 'headwidth': 6},
+    'fontsize': 9, 'ha': 'center', 'fontweight': 'bold',
+    'bbox': {'boxstyle': 'round,pad=0.3', 'fc': 'white', 'ec': 'gray', 'alpha': 0.8},
+}
+
+
+def etiquetas(ticker, inicio, fin):
+    # Rótulos de cada gráfico para un ticker y un rango (fin: fecha de la
+    # última barra), como argumentos con nombre de su constructor:
+    #   RenderJob(grafico, args, ruta, savefig, etiquetas(...)[grafico])
+    inicio, fin = pd.Timestamp(inicio), pd.Timestamp(fin)
+    nombre = NOMBRES.get(ticker, ticker)
+    desde, hasta = f'{MESES[inicio.month - 1]} {inicio.year}', f'{MESES[fin.month - 1]} {fin.year}'
+    periodo = desde if desde == hasta else f'{desde} a {hasta}'
+    anos = str(inicio.year) if inicio.year == fin.year else f'{inicio.year}-{fin.year}'
+    es_dxy = ticker == 'DX-Y.NYB'
+    return {
+        'grafico_tecnico': {'nombre': nombre,
+                            'titulo': f"{'Índice Dólar (DXY)' if es_dxy else nombre} - {periodo}"},
+        'infografia': {'titulo': 'DÓLAR AMERICANO' if es_dxy else nombre,
+                       'subtitulo': f"{'Índice DXY' if es_dxy else nombre} {anos}",
+                       'etiqueta_cambio': f'VARIACIÓN {anos}'},
+        'infografia_social': {'titulo': f'{nombre} {anos}'},
+        'grafico_simple': {'texto': f"{'USD' if es_dxy else nombre} {anos}"},
+    }
+
+
+def formatear_fechas(ax, inicio, fin):
+    # Marcas del eje de fechas según el tramo: un mes por marca (la de siempre,
+    # '%b %Y') desde unos tres meses, meses alternos o más en tramos de años y
+    # días o semanas en tramos cortos, para que nunca quede una sola marca
+    dias = (pd.Timestamp(fin) - pd.Timestamp(inicio)).days
+    if dias <= 14:
+        ax.xaxis.set_major_locator(mdates.DayLocator())
+        ax.xaxis.set_major_formatter(mdates.DateFormatter('%d %b'))
+    elif dias <= 75:
+        ax.xaxis.set_major_locator(mdates.WeekdayLocator(byweekday=mdates.MO))
+        ax.xaxis.set_major_formatter(mdates.DateFormatter('%d %b'))
+    else:
+        ax.xaxis.set_major_locator(mdates.MonthLocator(interval=max(1, -(-dias // 550))))
+        ax.xaxis.set_major_formatter(mdates.DateFormatter('%b %Y'))
+    plt.setp(ax.xaxis.get_majorticklabels(), rotation=45, ha='right')
+
+
+def serie_para_dibujar(serie, fig, metodo='lttb'):
+    # Series reducida al ancho en píxeles de la figura (conserva máximo y mínimo)
+    return downsample.reducir_serie(serie, downsample.puntos_objetivo(fig, DPI_OBJETIVO), metodo)
+
+
+def grafico_tecnico(dxy, fecha_inicio, fecha_fin, componentes=None, eventos=None,
+                    titulo='Índice Dólar (DXY) - Enero 2025 a Enero 2026', nombre='DXY'):
+    # Gráfico de análisis técnico de graph_ds.py: cierre, rango diario, MA 20/50,
+    # volumen (si lo hay) y cuadro de estadísticas. Requiere las columnas MA_20/MA_50.
+    # titulo y nombre (leyenda, eje y estadísticas): ver etiquetas().
+    # Con `componentes` (panel de dxy_components.py) añade debajo la variación
+    # acumulada del índice atribuida a cada divisa; con `eventos`
+    # (eventos.detectar), las anotaciones sobre el cierre, colocadas con los
+    # límites reales de los ejes y sin tapar los cuadros de texto fijos.
+    volumen_total = dxy['Volume'].sum()
+    tiene_volumen = volumen_total > 0
+    alturas = [3] + ([1] if tiene_volumen else []) + ([1.5] if componentes is not None else [])
+
+    # Crear figura - SOLO gráfico de precios (sin volumen si es 0)
+    if len(alturas) > 1:
+        fig, ejes = plt.subplots(len(alturas), 1, figsize=(14, 8 if len(alturas) == 2 else 10),
+                                 gridspec_kw={'height_ratios': alturas},
+                                 sharex=True)
+        ax1 = ejes[0]
+        ax2 = ejes[1] if tiene_volumen else None
+    else:
+        fig, ax1 = plt.subplots(1, 1, figsize=(14, 7))
+
+    # Series reducidas al ancho de la figura (sin efecto con datos diarios)
+    n_puntos = downsample.puntos_objetivo(fig, DPI_OBJETIVO)
+    cierre = serie_para_dibujar(dxy['Close'], fig)
+    fechas_banda, banda_low, banda_high = downsample.reducir_banda(dxy['Low'], dxy['High'], n_puntos)
+
+    # Gráfico de precios
+    ax1.plot(cierre.index, cierre,
+            color='#1f77b4',
+            linewidth=2.5,
+            label=f'{nombre} (Cierre)')
+
+    # Bandas de precio (High-Low)
+    ax1.fill_between(fechas_banda,
+                    banda_low,
+                    banda_high,
+                    alpha=0.15,
+                    color='lightblue',
+                    label='Rango diario')
+
+    # Medias móviles
+    ma_20 = serie_para_dibujar(dxy['MA_20'], fig)
+    ma_50 = serie_para_dibujar(dxy['MA_50'], fig)
+    ax1.plot(ma_20.index, ma_20,
+            color='red',
+            linestyle='--',
+            linewidth=1.5,
+            label='MA 20 días',
+            alpha=0.7)
+
+    ax1.plot(ma_50.index, ma_50,
+            color='orange',
+            linestyle='--',
+            linewidth=1.5,
+            label='MA 50 días',
+            alpha=0.7)
+
+    # Configurar gráfico de precios
+    ax1.set_title(titulo,
+                 fontsize=16,
+                 fontweight='bold',
+                 pad=20)
+    ax1.set_ylabel(f'Valor {nombre}', fontsize=12)
+    ax1.grid(True, alpha=0.3, linestyle='--')
+    ax1.legend(loc='best')
+
+    # Formatear fechas
+    formatear_fechas(ax1, dxy.index[0], dxy.index[-1])
+
+    # Cuadros de texto fijos: las etiquetas de eventos no los tapan
+    cuadros = []
+
+    # Gráfico de volumen (solo si hay datos)
+    if tiene_volumen:
+        fechas_vol, _, volumen = downsample.reducir_banda(dxy['Volume'], dxy['Volume'], n_puntos)
+        ax2.bar(fechas_vol, volumen,
+               color='lightgray',
+               alpha=0.7,
+               width=0.8)
+        ax2.set_ylabel('Volumen', fontsize=12)
+        ax2.grid(True, alpha=0.3, axis='y')
+        formatear_fechas(ax2, dxy.index[0], dxy.index[-1])
+    else:
+        # En lugar de volumen vacío, mostramos análisis técnico
+        cuadros.append(ax1.text(0.02, 0.98, "NOTA: Sin datos de volumen\nMostrando solo análisis de precios",
+                                transform=ax1.transAxes, fontsize=10,
+                                bbox=dict(boxstyle='round', facecolor='yellow', alpha=0.3),
+                                verticalalignment='top'))
+
+    cuadros.append(ax1.text(0.02, 0.02, texto_estadisticas(dxy, nombre), transform=ax1.transAxes, fontsize=9,
+                            bbox=dict(boxstyle='round', facecolor='white', alpha=0.9, edgecolor='gray'),
+                            verticalalignment='bottom', fontfamily='monospace'))
+
+    if componentes is not None:
+        panel_componentes(ejes[-1], componentes, fig)
+
+    with etapa('tight_layout'):
+        fig.tight_layout()
+    # Después de la composición: los ejes ya tienen su tamaño y sus límites
+    if eventos:
+        anotar_eventos(ax1, colocar_eventos(ax1, eventos, dxy['Close'], cuadros + [ax1.get_legend()]))
+    return fig
+
+
+def colocar_eventos(ax, eventos, serie, ocupados=(), fontsize=ESTILO_EVENTOS['fontsize']):
+    # eventos.colocar con los límites y el tamaño en pulgadas de `ax`; los
+    # artistas de `ocupados` (cuadros de texto fijos) reservan su sitio
+    from eventos import colocar
+
+    x0, x1 = (mdates.num2date(x).replace(tzinfo=None) for x in ax.get_xlim())
+    caja_ejes = ax.get_window_extent()
+    cajas = [artista.get_window_extent().transformed(ax.transAxes.inverted()) for artista in ocupados]
+    return colocar(eventos, serie, fontsize=fontsize, limites=(x0, x1, *ax.get_ylim()),
+                   ejes=(caja_ejes.width / ax.figure.dpi, caja_ejes.height / ax.figure.dpi),
+                   ocupadas=[(c.x0, c.y0, c.x1, c.y1) for c in cajas])
+
+
+# Colores de las divisas del DXY en el panel de contribuciones
+COLORES_DIVISAS = {'EUR': '#1f77b4', 'JPY': '#d62728', 'GBP': '#9467bd',
+                   'CAD': '#ff7f0e', 'SEK': '#2ca02c', 'CHF': '#8c564b'}
+
+
+def panel_componentes(ax, componentes, fig):
+    # Variación acumulada (%, log) del DXY desde el inicio atribuida a cada divisa;
+    # la suma de las líneas es la del índice reconstruido (línea negra)
+    from dxy_components import contribucion_acumulada
+
+    acumulada = contribucion_acumulada(componentes) * 100
+    for divisa, color in COLORES_DIVISAS.items():
+        serie = serie_para_dibujar(acumulada[divisa], fig)
+        ax.plot(serie.index, serie, color=color, linewidth=1.2, label=divisa)
+    total = serie_para_dibujar(acumulada.sum(axis=1), fig)
+    ax.plot(total.index, total, color='black', linewidth=1.5, linestyle='--', label='DXY')
+    ax.axhline(0, color='gray', linewidth=0.8)
+    ax.set_ylabel('Aporte acumulado (%)', fontsize=12)
+    ax.grid(True, alpha=0.3, linestyle='--')
+    ax.legend(loc='upper left', ncol=7, fontsize=8)
+    formatear_fechas(ax, acumulada.index[0], acumulada.index[-1])
+
+
+def texto_estadisticas(dxy, nombre='DXY'):
+    # Estadísticas detalladas
+    cambio_total = ((dxy['Close'].iloc[-1] / dxy['Close'].iloc[0]) - 1) * 100
+    volatilidad = dxy['Close'].pct_change().std() * 100
+
+    # Encontrar máximos y mínimos
+    max_idx = dxy['High'].idxmax()
+    min_idx = dxy['Low'].idxmin()
+
+    return f"""Estadísticas {nombre} ({dxy.index[0].date()} a {dxy.index[-1].date()}):
+• Días analizados: {len(dxy)}
+• Primer cierre: {dxy['Close'].iloc[0]:.2f}
+• Último cierre: {dxy['Close'].iloc[-1]:.2f}
+• Cambio total: {cambio_total:+.2f}%
+• Máximo: {dxy['High'].max():.2f} ({max_idx.date()})
+• Mínimo: {dxy['Low'].min():.2f} ({min_idx.date()})
+• Volatilidad diaria: {volatilidad:.2f}%
+• Media 20 días: {dxy['MA_20'].iloc[-1]:.2f}
+• Media 50 días: {dxy['MA_50'].iloc[-1]:.2f}"""
+
+
+def grafico_emergencia(close_prices, fecha_inicio, fecha_fin):
+    fig = plt.figure(figsize=(14, 7))
+    linea = serie_para_dibujar(close_prices, fig)
+    plt.plot(linea.index, linea.values, 'b-', linewidth=2)
+    plt.title(f'DXY - {fecha_inicio} a {fecha_fin}')
+    plt.ylabel('Valor DXY')
+    plt.grid(True, alpha=0.3)
+    plt.xticks(rotation=45)
+    return fig
+
+
+def infografia(close_prices, titulo='DÓLAR AMERICANO', subtitulo='Índice DXY 2025-2026',
+               etiqueta_cambio='VARIACIÓN 2025-2026'):
+    # Infografía horizontal de graph_simple.py (16x8). Los artistas que cambian
+    # con la serie llevan gid para que chart_templates.py pueda reutilizarlos.
+    fig, ax = plt.subplots(figsize=(16, 8), facecolor='white')
+
+    # Fondo degradado sutil
+    ax.set_facecolor(FONDO)
+
+    # LÍNEA PRINCIPAL - ROJO INTENSO Y GRUESA
+    line_color = ROJO
+    line_width = 4
+
+    linea = serie_para_dibujar(close_prices, fig)
+    ax.plot(linea.index,
+            linea.values,
+            color=line_color,
+            linewidth=line_width,
+            solid_capstyle='round',
+            gid='linea')
+
+    # Añadir sombra sutil debajo de la línea
+    ax.fill_between(linea.index,
+                   linea.values,
+                   close_prices.min() * 0.99,
+                   color=line_color,
+                   alpha=0.1,
+                   gid='sombra')
+
+    # REMOVER TODO LO NO ESENCIAL
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+    ax.spines['left'].set_linewidth(0.5)
+    ax.spines['bottom'].set_linewidth(0.5)
+
+    # Grid sutil solo horizontal
+    ax.yaxis.grid(True, linestyle='-', alpha=0.1, linewidth=0.5)
+    ax.xaxis.grid(False)
+
+    # Formatear eje X - minimalista
+    ax.xaxis.set_major_locator(mdates.MonthLocator())
+    ax.xaxis.set_major_formatter(mdates.DateFormatter('%b'))
+
+    # Rotar fechas ligeramente
+    plt.setp(ax.xaxis.get_majorticklabels(), rotation=0, ha='center', fontsize=10)
+
+    # Eje Y minimalista
+    ax.tick_params(axis='y', length=0, labelsize=11, pad=8)
+    ax.tick_params(axis='x', length=0, labelsize=11, pad=10)
+
+    # Título minimalista pero impactante
+    ax.text(0.02, 0.98, titulo,
+            gid='titulo',
+            transform=ax.transAxes,
+            fontsize=32,
+            fontweight='bold',
+            color='#2a2a2a',
+            verticalalignment='top',
+            fontfamily='sans-serif')
+
+    ax.text(0.02, 0.90, subtitulo,
+            gid='subtitulo',
+            transform=ax.transAxes,
+            fontsize=18,
+            color=GRIS_TEXTO,
+            verticalalignment='top',
+            fontfamily='sans-serif')
+
+    # Valores clave minimalistas
+    primer_valor = close_prices.iloc[0]
+    ultimo_valor = close_prices.iloc[-1]
+    cambio = ((ultimo_valor / primer_valor) - 1) * 100
+
+    # Valor actual - grande y destacado
+    ax.text(0.98, 0.15, f'{ultimo_valor:.1f}',
+            gid='valor',
+            transform=ax.transAxes,
+            fontsize=48,
+            fontweight='bold',
+            color=line_color,
+            verticalalignment='center',
+            horizontalalignment='right',
+            fontfamily='sans-serif')
+
+    ax.text(0.98, 0.08, 'VALOR ACTUAL',
+            transform=ax.transAxes,
+            fontsize=14,
+            color=GRIS_TEXTO,
+            verticalalignment='center',
+            horizontalalignment='right',
+            fontfamily='sans-serif')
+
+    # Cambio porcentual - color según si es positivo o negativo
+    cambio_color = VERDE if cambio >= 0 else ROJO  # Verde si sube, rojo si baja
+
+    ax.text(0.98, 0.25, f'{cambio:+.1f}%',
+            gid='cambio',
+            transform=ax.transAxes,
+            fontsize=24,
+            fontweight='bold',
+            color=cambio_color,
+            verticalalignment='center',
+            horizontalalignment='right',
+            fontfamily='sans-serif')
+
+    ax.text(0.98, 0.30, etiqueta_cambio,
+            gid='etiqueta_cambio',
+            transform=ax.transAxes,
+            fontsize=12,
+            color=GRIS_TEXTO,
+            verticalalignment='center',
+            horizontalalignment='right',
+            fontfamily='sans-serif')
+
+    # Puntos clave en el gráfico
+    # Máximo y mínimo del período
+    max_idx = close_prices.idxmax()
+    min_idx = close_prices.idxmin()
+
+    # Punto máximo
+    ax.scatter([max_idx], [close_prices.max()],
+              color=NARANJA, s=120, zorder=5, edgecolors='white', linewidth=2,
+              gid='punto_max')
+
+    ax.annotate(f'Máx: {close_prices.max():.1f}',
+               xy=(max_idx, close_prices.max()),
+               xytext=(0, 20),
+               textcoords='offset points',
+               ha='center',
+               fontsize=12,
+               fontweight='bold',
+               color=NARANJA,
+               gid='anot_max')
+
+    # Punto mínimo
+    ax.scatter([min_idx], [close_prices.min()],
+              color=AZUL, s=120, zorder=5, edgecolors='white', linewidth=2,
+              gid='punto_min')
+
+    ax.annotate(f'Mín: {close_prices.min():.1f}',
+               xy=(min_idx, close_prices.min()),
+               xytext=(0, -30),
+               textcoords='offset points',
+               ha='center',
+               fontsize=12,
+               fontweight='bold',
+               color=AZUL,
+               gid='anot_min')
+
+    # Ajustar límites para que respire
+    y_min, y_max = close_prices.min(), close_prices.max()
+    y_range = y_max - y_min
+    ax.set_ylim(y_min - y_range * 0.05, y_max + y_range * 0.15)
+
+    # Ajustar márgenes
+    fig.subplots_adjust(left=0.05, right=0.95, top=0.85, bottom=0.15)
+    return fig
+
+
+def infografia_social(close_prices, titulo='DXY 2025-2026'):
+    # Versión para redes sociales (formato cuadrado 8x8)
+    fig_social, ax_social = plt.subplots(figsize=(8, 8), facecolor='white')
+    ax_social.set_facecolor(FONDO)
+
+    ultimo_valor = close_prices.iloc[-1]
+    cambio = ((ultimo_valor / close_prices.iloc[0]) - 1) * 100
+
+    # Línea más gruesa para formato cuadrado
+    linea = serie_para_dibujar(close_prices, fig_social)
+    ax_social.plot(linea.index, linea.values,
+                  color=ROJO, linewidth=6, solid_capstyle='round', gid='linea')
+
+    # Relleno sutil
+    ax_social.fill_between(linea.index, linea.values,
+                          close_prices.min() * 0.99, color=ROJO, alpha=0.15, gid='sombra')
+
+    # Remover bordes
+    ax_social.spines['top'].set_visible(False)
+    ax_social.spines['right'].set_visible(False)
+    ax_social.spines['left'].set_visible(False)
+    ax_social.spines['bottom'].set_visible(False)
+
+    # Sin ejes
+    ax_social.set_xticks([])
+    ax_social.set_yticks([])
+
+    # Título para redes
+    ax_social.text(0.5, 0.93, titulo,
+                  gid='titulo',
+                  transform=ax_social.transAxes,
+                  fontsize=28,
+                  fontweight='bold',
+                  color='#2a2a2a',
+                  ha='center',
+                  fontfamily='sans-serif')
+
+    ax_social.text(0.5, 0.87, f'{ultimo_valor:.1f}  |  {cambio:+.1f}%',
+                  gid='valor',
+                  transform=ax_social.transAxes,
+                  fontsize=36,
+                  fontweight='bold',
+                  color=ROJO,
+                  ha='center',
+                  fontfamily='sans-serif')
+    return fig_social
+
+
+def infografia_emergencia(close_prices):
+    # Versión de emergencia ultra minimalista
+    fig, ax = plt.subplots(figsize=(16, 8), facecolor='white')
+    linea = serie_para_dibujar(close_prices, fig)
+    ax.plot(linea.index, linea.values, color=ROJO, linewidth=5)
+
+    # Remover todo
+    ax.set_xticks([])
+    ax.set_yticks([])
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+    ax.spines['left'].set_visible(False)
+    ax.spines['bottom'].set_visible(False)
+
+    # Solo el valor actual
+    ax.text(0.95, 0.95, f'{close_prices.iloc[-1]:.1f}',
+            transform=ax.transAxes,
+            fontsize=48,
+            fontweight='bold',
+            color=ROJO,
+            ha='right',
+            va='top')
+    return fig
+
+
+def grafico_simple(close_prices, texto='USD 2025-2026'):
+    # Gráfico ULTRA minimalista de graph_simple_v3.py (sin fuentes específicas)
+    fig, ax = plt.subplots(figsize=(16, 9), facecolor='white')
+    linea = serie_para_dibujar(close_prices, fig)
+    ax.plot(linea.index, linea.values, color=ROJO, linewidth=5)
+
+    # Texto simple (usará la fuente por defecto de matplotlib)
+    ax.text(0.5, 0.08, texto,
+            transform=ax.transAxes,
+            fontsize=40,
+            fontweight='bold',
+            color='#333333',
+            ha='center',
+            va='center')
+
+    # Remover todo lo demás
+    ax.set_xticks([])
+    ax.set_yticks([])
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+    ax.spines['left'].set_visible(False)
+    ax.spines['bottom'].set_visible(False)
+    return fig
+
+
+def anotar_eventos(ax, eventos, estilo=ESTILO_EVENTOS):
+    # eventos: [{fecha, texto, valor, desplazamiento}] (specs de escenarios/ o
+    # eventos.colocar); el texto se desplaza en vertical sobre el valor. Con
+    # fecha_texto (eventos.colocar) el texto se centra en ese punto.
+    for evento in eventos:
+        fecha = pd.to_datetime(evento['fecha'])
+        texto = dict(estilo)
+        if 'fecha_texto' in evento:
+            texto.update(ha='center', va='center')
+        ax.annotate(evento['texto'],
+                    xy=(fecha, evento['valor']),
+                    xytext=(pd.to_datetime(evento.get('fecha_texto', fecha)),
+                            evento['valor'] + evento.get('desplazamiento', 0)),
+                    **texto)
+
+
+def escenario(spec, datos):
+    # Escenario narrativo descrito por una spec (scenario_specs.py): líneas,
+    # banda de simulación, eventos anotados y fases sombreadas.
+    # datos: DataFrame por fecha con 'tendencia' y, si hay simulación,
+    # 'simulado' y las columnas de percentiles P5...P95
+    fig, ax = plt.subplots(figsize=tuple(spec.get('figsize', (12, 6))))
+
+    for linea in spec['lineas']:
+        ax.plot(datos.index, datos[linea['datos']], **linea.get('estilo', {}))
+
+    banda = spec.get('simulacion', {}).get('banda')
+    if banda:
+        ax.fill_between(datos.index, datos[banda['inferior']], datos[banda['superior']],
+                        **banda.get('estilo', {}))
+
+    # Anotaciones de eventos clave (texto desplazado en vertical sobre el valor)
+    anotar_eventos(ax, spec.get('eventos', []), spec.get('estilo_eventos', {}))
+
+    # Fases (colores de fondo) con su rótulo opcional
+    for fase in spec.get('fases', []):
+        ax.axvspan(pd.to_datetime(fase['inicio']), pd.to_datetime(fase['fin']),
+                   **fase.get('estilo', {}))
+        texto = fase.get('texto')
+        if texto:
+            ax.text(pd.to_datetime(texto['fecha']), texto['y'], texto['texto'],
+                    **texto.get('estilo', {}))
+
+    # Títulos y formato
+    titulo = dict(spec.get('titulo', {}))
+    if titulo:
+        ax.set_title(titulo.pop('texto'), **titulo)
+    ejes = dict(spec.get('ejes', {}))
+    tamano = ejes.pop('fontsize', None)
+    if 'ylabel' in ejes:
+        ax.set_ylabel(ejes['ylabel'], fontsize=tamano)
+    if 'xlabel' in ejes:
+        ax.set_xlabel(ejes['xlabel'], fontsize=tamano)
+    if 'rejilla' in spec:
+        ax.grid(True, **spec['rejilla'])
+
+    fechas = spec.get('fechas', {})
+    ax.xaxis.set_major_formatter(mdates.DateFormatter(fechas.get('formato', '%b %Y')))
+    if 'meses' in fechas:
+        ax.xaxis.set_major_locator(mdates.MonthLocator(interval=fechas['meses']))
+
+    if spec.get('leyenda'):
+        ax.legend(loc=spec['leyenda'])
+    with etapa('tight_layout'):
+        fig.tight_layout()
+    return fig
+
+
+def superficie_backtest(superficie, titulo='DXY'):
+    # Mapas de calor de la rejilla de backtest.py: rendimiento total, máximo
+    # drawdown y acierto por par (ventana rápida en Y, lenta en X)
+    fig, ejes = plt.subplots(1, 3, figsize=(18, 6), sharey=True)
+    extension = (superficie.lentas[0] - 0.5, superficie.lentas[-1] + 0.5,
+                 superficie.rapidas[0] - 0.5, superficie.rapidas[-1] + 0.5)
+    paneles = [('Rendimiento total (%)', superficie.rendimiento * 100, 'RdYlGn'),
+               ('Máximo drawdown (%)', superficie.drawdown * 100, 'Reds_r'),
+               ('Acierto (%)', superficie.acierto * 100, 'viridis')]
+    for ax, (nombre, valores, mapa) in zip(ejes, paneles):
+        imagen = ax.imshow(valores, origin='lower', aspect='auto', extent=extension,
+                           cmap=mapa, interpolation='nearest')
+        fig.colorbar(imagen, ax=ax, shrink=0.85)
+        ax.set_title(nombre, fontsize=12, fontweight='bold')
+        ax.set_xlabel('Media lenta (días)')
+    ejes[0].set_ylabel('Media rápida (días)')
+    fig.suptitle(f'Cruces de medias móviles - {titulo}', fontsize=14, fontweight='bold')
+    with etapa('tight_layout'):
+        fig.tight_layout()
+    return fig
@@ -0,0 +1,211 @@
+# Almacenamiento columnar binario de barras
+# Un directorio por serie con un archivo por columna y una cabecera pequeña:
+#   header.json   {"version": 1, "filas": N, "columnas": {"Date": "<i8", "Close": "<f8", ...}}
+#   Date.bin      int64, nanosegundos desde epoch (UTC), ordenados
+#   Open.bin ...  float64 o float32, mismo número de filas
+# La lectura abre cada columna con numpy.memmap, así que cortar por rango de
+# fechas es una búsqueda binaria y una vista, sin copiar ni cargar el resto.
+# Añadir barras al final solo escribe las filas nuevas; la cabecera se
+# actualiza la última, de modo que una escritura interrumpida no se ve.
+# Las columnas derivadas (MA_20, RSI...) no se guardan: se recalculan.
+# Leer columnas solo necesita numpy; pandas se importa al escribir o al pedir
+# un DataFrame (las consultas rápidas de dxy_cli.py no lo cargan).
+import json
+import os
+
+import numpy as np
+
+VERSION = 1
+CABECERA = 'header.json'
+COLUMNAS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+def _ruta_columna(directorio, nombre):
+    return os.path.join(directorio, f'{nombre}.bin')
+
+
+def leer_cabecera(directorio):
+    ruta = os.path.join(directorio, CABECERA)
+    if not os.path.exists(ruta):
+        return None
+    with open(ruta) as f:
+        return json.load(f)
+
+
+def _escribir_cabecera(directorio, cabecera):
+    ruta = os.path.join(directorio, CABECERA)
+    with open(ruta + '.tmp', 'w') as f:
+        json.dump(cabecera, f, indent=2)
+    os.replace(ruta + '.tmp', ruta)
+
+
+def a_ns(fecha):
+    # Fecha (texto, Timestamp, datetime64 o entero en ns) -> nanosegundos UTC.
+    # Los enteros y el texto 'AAAA-MM-DD[ HH:MM:SS]' no necesitan pandas.
+    if isinstance(fecha, (int, np.integer)):
+        return int(fecha)
+    if isinstance(fecha, str) and len(fecha) <= 19 and fecha[4:5] == '-':
+        try:
+            return int(np.datetime64(fecha, 'ns').astype(np.int64))
+        except ValueError:
+            pass
+    import pandas as pd
+
+    return pd.Timestamp(fecha).value
+
+
+def _arrays(barras, dtype):
+    import pandas as pd
+
+    indice = pd.DatetimeIndex(barras.index)
+    if indice.tz is not None:
+        indice = indice.tz_convert('UTC').tz_localize(None)
+    arrays = {'Date': indice.as_unit('ns').asi8.astype('<i8')}
+    for nombre in COLUMNAS:
+        arrays[nombre] = barras[nombre].to_numpy(dtype=dtype)
+    return arrays
+
+
+def escribir(directorio, barras, dtype='<f8'):
+    # Reescribe la serie completa (barras ordenadas por fecha, columnas OHLCV)
+    os.makedirs(directorio, exist_ok=True)
+    arrays = _arrays(barras, dtype)
+    for nombre, valores in arrays.items():
+        ruta = _ruta_columna(directorio, nombre)
+        valores.tofile(ruta + '.tmp')
+        os.replace(ruta + '.tmp', ruta)
+    _escribir_cabecera(directorio, {
+        'version': VERSION,
+        'filas': len(barras),
+        'columnas': {nombre: valores.dtype.str for nombre, valores in arrays.items()},
+    })
+
+
+def anadir(directorio, barras):
+    # Añade barras al final. Las filas guardadas con fecha >= la primera barra
+    # nueva se sustituyen (p. ej. la barra del día en curso, que puede cambiar).
+    cabecera = leer_cabecera(directorio)
+    if cabecera is None:
+        return escribir(directorio, barras)
+    if len(barras) == 0:
+        return
+
+    arrays = _arrays(barras, cabecera['columnas']['Close'])
+    filas = cabecera['filas']
+    if filas:
+        fechas = np.memmap(_ruta_columna(directorio, 'Date'), dtype=cabecera['columnas']['Date'],
+                           mode='r', shape=(filas,))
+        filas = int(np.searchsorted(fechas, arrays['Date'][0], 'left'))
+        del fechas
+
+    for nombre, valores in arrays.items():
+        dtype = np.dtype(cabecera['columnas'][nombre])
+        with open(_ruta_columna(directorio, nombre), 'r+b') as f:
+            # Descarta lo sustituido y restos de escrituras que no llegaron a la cabecera
+            f.truncate(filas * dtype.itemsize)
+            f.seek(0, os.SEEK_END)
+            f.write(valores.astype(dtype, copy=False).tobytes())
+    cabecera['filas'] = filas + len(barras)
+    _escribir_cabecera(directorio, cabecera)
+
+
+def anadir_columnas(directorio, arrays, reemplazar=False):
+    # Añade filas a una serie de columnas arbitrarias ({'Date': int64 ns, nombre:
+    # array, ...}; mismas columnas en cada llamada). Para resultados derivados
+    # que se generan por bloques; se leen con BarFile.columnas(nombres=...).
+    # Con reemplazar=True, como anadir(): las filas guardadas con fecha >= la
+    # primera nueva se sustituyen.
+    cabecera = leer_cabecera(directorio)
+    if cabecera is None:
+        os.makedirs(directorio, exist_ok=True)
+        cabecera = {'version': VERSION, 'filas': 0,
+                    'columnas': {nombre: np.asarray(valores).dtype.str for nombre, valores in arrays.items()}}
+    elif set(arrays) != set(cabecera['columnas']):
+        raise ValueError(f"Columnas distintas de las de {directorio}")
+
+    filas = cabecera['filas']
+    n = len(arrays['Date'])
+    if reemplazar and filas and n:
+        fechas = np.memmap(_ruta_columna(directorio, 'Date'), dtype=cabecera['columnas']['Date'],
+                           mode='r', shape=(filas,))
+        filas = int(np.searchsorted(fechas, arrays['Date'][0], 'left'))
+        del fechas
+    for nombre, valores in arrays.items():
+        dtype = np.dtype(cabecera['columnas'][nombre])
+        modo = 'r+b' if os.path.exists(_ruta_columna(directorio, nombre)) else 'wb'
+        with open(_ruta_columna(directorio, nombre), modo) as f:
+            f.truncate(filas * dtype.itemsize)
+            f.seek(0, os.SEEK_END)
+            f.write(np.asarray(valores).astype(dtype, copy=False).tobytes())
+    cabecera['filas'] = filas + n
+    _escribir_cabecera(directorio, cabecera)
+
+
+class BarFile:
+    # Vista de solo lectura sobre una serie columnar
+
+    def __init__(self, directorio):
+        self.directorio = directorio
+        self.cabecera = leer_cabecera(directorio)
+        if self.cabecera is None:
+            raise FileNotFoundError(f"No hay barras en {directorio}")
+        self.filas = self.cabecera['filas']
+        self._columnas = {}
+
+    def __len__(self):
+        return self.filas
+
+    def columna(self, nombre):
+        if nombre not in self._columnas:
+            dtype = np.dtype(self.cabecera['columnas'][nombre])
+            if self.filas == 0:
+                self._columnas[nombre] = np.empty(0, dtype=dtype)
+            else:
+                self._columnas[nombre] = np.memmap(_ruta_columna(self.directorio, nombre),
+                                                   dtype=dtype, mode='r', shape=(self.filas,))
+        return self._columnas[nombre]
+
+    @property
+    def fechas(self):
+        return self.columna('Date')
+
+    def posiciones(self, start=None, end=None):
+        # Filas [i, j) con fechas en [start, end)
+        fechas = self.fechas
+        i = 0 if start is None else int(np.searchsorted(fechas, a_ns(start), 'left'))
+        j = len(fechas) if end is None else int(np.searchsorted(fechas, a_ns(end), 'left'))
+        return i, max(i, j)
+
+    def columnas(self, start=None, end=None, nombres=None):
+        # {columna: vista memmap} del rango pedido, sin copiar
+        i, j = self.posiciones(start, end)
+        nombres = ['Date'] + COLUMNAS if nombres is None else nombres
+        return {nombre: self.columna(nombre)[i:j] for nombre in nombres}
+
+    def ultima_fecha(self):
+        import pandas as pd
+
+        if self.filas == 0:
+            return None
+        return pd.Timestamp(int(self.fechas[-1]))
+
+    def primera_fecha(self):
+        import pandas as pd
+
+        if self.filas == 0:
+            return None
+        return pd.Timestamp(int(self.fechas[0]))
+
+    def dataframe(self, start=None, end=None):
+        # DataFrame del rango (aquí sí se copian las filas pedidas, solo esas)
+        import pandas as pd
+
+        datos = self.columnas(start, end)
+        indice = pd.DatetimeIndex(np.asarray(datos.pop('Date')).astype('datetime64[ns]'), name='Date')
+        return pd.DataFrame({nombre: np.asarray(valores, dtype=np.float64)
+                             for nombre, valores in datos.items()}, index=indice)
+
+
+def exportar_csv(directorio, ruta_csv, start=None, end=None):
+    # El CSV sigue disponible como formato de exportación
+    BarFile(directorio).dataframe(start, end).to_csv(ruta_csv)
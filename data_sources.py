@@ -0,0 +1,136 @@
+# Capa de fuentes de datos
+# Todos los scripts piden barras a través de un proveedor. Hay tres:
+#   - YahooProvider: descarga de Yahoo Finance con yfinance (import perezoso)
+#   - CsvReplayProvider: reproduce CSV exportados sin red, a velocidad de
+#     disco; pensado para lotes y pruebas. Un directorio de grabaciones
+#     (<ticker>_<intervalo>.csv, como stub_server.py --dir) o un CSV suelto,
+#     que es la grabación de un solo ticker (el DXY salvo que se indique)
+#   - HttpProvider: pide las barras en CSV a un servicio HTTP propio, p. ej.
+#     el servidor de respuestas grabadas stub_server.py
+# El proveedor por defecto se elige con la variable de entorno DXY_DATA_SOURCE:
+#   DXY_DATA_SOURCE=yahoo                         (por defecto)
+#   DXY_DATA_SOURCE=replay:dxy_datos_2025-01-01_2026-01-05.csv
+#   DXY_DATA_SOURCE=replay:EURUSD=X=eurusd.csv
+#   DXY_DATA_SOURCE=replay:grabaciones/
+#   DXY_DATA_SOURCE=http://127.0.0.1:8765
+# pandas también se importa al usarlo, para que elegir proveedor no cueste nada.
+import os
+
+# Ticker de un CSV suelto en replay:<ruta> (los dxy_datos_*.csv de graph_ds.py)
+TICKER_REPLAY = 'DX-Y.NYB'
+
+
+def nombre_grabacion(ticker, interval='1d'):
+    # Archivo de un ticker/intervalo en un directorio de grabaciones
+    return f"{ticker}_{interval}".replace('/', '_').replace('^', '_') + '.csv'
+
+
+def aplanar_columnas(datos):
+    # Simplificar columnas MultiIndex de yfinance ('Close', 'DX-Y.NYB') -> 'Close'.
+    # Solo se sustituyen las etiquetas: los datos no se copian.
+    import pandas as pd
+
+    if isinstance(datos.columns, pd.MultiIndex):
+        datos.columns = [col[0] if col[0] else col[1] for col in datos.columns]
+    return datos
+
+
+class DataProvider:
+    nombre = 'base'
+    # Si False, el almacén local no guarda lo que devuelve (ya es local)
+    cacheable = True
+
+    def download(self, ticker, start, end, interval='1d'):
+        raise NotImplementedError
+
+
+class YahooProvider(DataProvider):
+    nombre = 'yahoo'
+
+    def download(self, ticker, start, end, interval='1d'):
+        # Import perezoso: yfinance solo se carga cuando hay que ir a la red
+        import yfinance as yf
+
+        datos = yf.download(ticker, start=start, end=end, interval=interval,
+                            progress=False)
+        return aplanar_columnas(datos)
+
+
+class CsvReplayProvider(DataProvider):
+    nombre = 'replay'
+    cacheable = False
+
+    def __init__(self, rutas):
+        # rutas: {ticker: CSV}, un directorio de grabaciones o un CSV suelto
+        # (grabación de TICKER_REPLAY). Un ticker sin grabación es un error:
+        # nunca se sirven las barras de otro
+        if isinstance(rutas, str) and not os.path.isdir(rutas):
+            rutas = {TICKER_REPLAY: rutas}
+        self.rutas = rutas
+        self._cargados = {}
+
+    def _ruta(self, ticker, interval):
+        if isinstance(self.rutas, dict):
+            if ticker not in self.rutas:
+                raise KeyError(f"Sin archivo de reproducción para {ticker} "
+                               f"(grabados: {', '.join(self.rutas)})")
+            return self.rutas[ticker]
+        ruta = os.path.join(self.rutas, nombre_grabacion(ticker, interval))
+        if not os.path.exists(ruta):
+            raise KeyError(f"Sin archivo de reproducción para {ticker} ({interval}) en {self.rutas}")
+        return ruta
+
+    def _leer(self, ruta):
+        if ruta not in self._cargados:
+            import pandas as pd
+
+            datos = pd.read_csv(ruta, index_col=0, parse_dates=True)
+            self._cargados[ruta] = aplanar_columnas(datos)
+        return self._cargados[ruta]
+
+    def download(self, ticker, start, end, interval='1d'):
+        import pandas as pd
+
+        datos = self._leer(self._ruta(ticker, interval))
+        mascara = (datos.index >= pd.Timestamp(start)) & (datos.index < pd.Timestamp(end))
+        return datos.loc[mascara]
+
+
+class HttpProvider(DataProvider):
+    # GET <base>/bars?ticker=...&start=...&end=...&interval=... -> CSV con
+    # columnas Date,Open,High,Low,Close,Volume. Los errores HTTP (404 ticker
+    # desconocido, 503...) se propagan como urllib.error.HTTPError.
+    nombre = 'http'
+
+    def __init__(self, base, timeout=30):
+        self.base = base.rstrip('/')
+        self.timeout = timeout
+
+    def download(self, ticker, start, end, interval='1d'):
+        import io
+        import urllib.parse
+        import urllib.request
+        import pandas as pd
+
+        consulta = urllib.parse.urlencode({'ticker': ticker, 'start': str(start),
+                                           'end': str(end), 'interval': interval})
+        with urllib.request.urlopen(f'{self.base}/bars?{consulta}', timeout=self.timeout) as r:
+            cuerpo = r.read()
+        return pd.read_csv(io.BytesIO(cuerpo), index_col=0, parse_dates=True)
+
+
+def get_provider(nombre=None):
+    nombre = nombre or os.environ.get('DXY_DATA_SOURCE', 'yahoo')
+    if isinstance(nombre, DataProvider):
+        return nombre
+    if nombre == 'yahoo':
+        return YahooProvider()
+    if nombre.startswith('replay:'):
+        # replay:<ruta> o replay:<ticker>=<ruta>[,<ticker>=<ruta>...]
+        ruta = nombre[len('replay:'):]
+        if '=' in ruta and not os.path.exists(ruta):
+            return CsvReplayProvider(dict(par.rsplit('=', 1) for par in ruta.split(',')))
+        return CsvReplayProvider(ruta)
+    if nombre.startswith(('http://', 'https://')):
+        return HttpProvider(nombre)
+    raise ValueError(f"Fuente de datos desconocida: {nombre}")
@@ -0,0 +1,95 @@
+# Reducción de puntos antes de dibujar (LTTB y mín/máx por píxel)
+# Con ~255 barras diarias no hace nada; con años de datos por minuto limita
+# los puntos que llegan a ax.plot / fill_between a unos pocos por píxel del
+# ancho de la figura, de modo que el tiempo de render y el tamaño del PDF no
+# dependen del número de barras. Los extremos globales (los que señalan las
+# anotaciones idxmax/idxmin) se conservan siempre.
+import numpy as np
+import pandas as pd
+
+# Puntos por píxel horizontal que se conservan
+PUNTOS_POR_PIXEL = 2
+
+
+def puntos_objetivo(fig, dpi, puntos_por_pixel=PUNTOS_POR_PIXEL):
+    # Número de puntos a dibujar según el ancho de la figura en píxeles
+    return int(fig.get_figwidth() * dpi * puntos_por_pixel)
+
+
+def _x_numerico(indice):
+    if isinstance(indice, pd.DatetimeIndex):
+        return indice.asi8.astype(np.float64)
+    return np.asarray(indice, dtype=np.float64)
+
+
+def _cubetas(n_total, n_cubetas):
+    return np.linspace(0, n_total, n_cubetas + 1).astype(np.int64)
+
+
+def lttb(x, y, n):
+    # Largest-Triangle-Three-Buckets: índices de n puntos que conservan la forma
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    total = len(x)
+    if n >= total or n < 3:
+        return np.arange(total)
+
+    # Primer y último punto fijos; n - 2 cubetas entre ambos
+    bordes = np.linspace(1, total - 1, n - 1).astype(np.int64)
+    indices = np.empty(n, dtype=np.int64)
+    indices[0], indices[-1] = 0, total - 1
+    anterior = 0
+    for i in range(n - 2):
+        inicio, fin = bordes[i], bordes[i + 1]
+        sig_inicio = bordes[i + 1]
+        sig_fin = bordes[i + 2] if i + 2 < len(bordes) else total
+        cx = x[sig_inicio:sig_fin].mean()
+        cy = y[sig_inicio:sig_fin].mean()
+        ax, ay = x[anterior], y[anterior]
+        area = np.abs((ax - cx) * (y[inicio:fin] - ay) - (ax - x[inicio:fin]) * (cy - ay))
+        anterior = inicio + int(np.argmax(area))
+        indices[i + 1] = anterior
+    return indices
+
+
+def _por_cubeta(valores, n_cubetas, funcion):
+    # Aplica argmin/argmax por cubeta; rellena con el último valor hasta múltiplo
+    total = len(valores)
+    tamano = -(-total // n_cubetas)
+    relleno = np.pad(valores, (0, tamano * n_cubetas - total), mode='edge')
+    posiciones = funcion(relleno.reshape(n_cubetas, tamano), axis=1)
+    return np.minimum(np.arange(n_cubetas) * tamano + posiciones, total - 1)
+
+
+def minmax(y, n):
+    # Índices del mínimo y máximo de cada una de n/2 cubetas (mín/máx por píxel)
+    y = np.asarray(y, dtype=np.float64)
+    if n >= len(y) or n < 2:
+        return np.arange(len(y))
+    n_cubetas = n // 2
+    return np.unique(np.concatenate([_por_cubeta(y, n_cubetas, np.argmin),
+                                     _por_cubeta(y, n_cubetas, np.argmax)]))
+
+
+def reducir_serie(serie, n, metodo='lttb'):
+    # Subconjunto de la Series con como mucho ~n puntos, incluidos máximo y mínimo
+    if len(serie) <= n:
+        return serie
+    y = serie.to_numpy(dtype=np.float64)
+    if metodo == 'lttb':
+        indices = lttb(_x_numerico(serie.index), y, n)
+    else:
+        indices = minmax(y, n)
+    indices = np.union1d(indices, [int(np.nanargmax(y)), int(np.nanargmin(y))])
+    return serie.iloc[indices]
+
+
+def reducir_banda(low, high, n):
+    # Banda High/Low para fill_between: mínimo de Low y máximo de High por
+    # cubeta, situados en la primera fecha de cada cubeta
+    if len(low) <= n:
+        return low.index, low.to_numpy(), high.to_numpy()
+    bordes = _cubetas(len(low), n)[:-1]
+    return (low.index[bordes],
+            np.minimum.reduceat(low.to_numpy(dtype=np.float64), bordes),
+            np.maximum.reduceat(high.to_numpy(dtype=np.float64), bordes))
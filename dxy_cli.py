@@ -0,0 +1,276 @@
+# Punto de entrada único por línea de comandos
+# Ticker, rango de fechas, salidas y estilo van como argumentos en lugar de
+# estar fijados en el cuerpo de un script. Los imports pesados se hacen solo
+# cuando hacen falta:
+#   - yfinance: solo si el almacén local no cubre el rango (data_sources.py)
+#   - pandas: solo si hay que descargar o generar salidas
+#   - matplotlib/pyplot: solo si se pide algún gráfico
+# Con --stats-only y el rango ya en caché solo se cargan numpy y las columnas
+# memmap del almacén, así que la ejecución tarda décimas de segundo.
+# El CSV se escribe por bloques desde el almacén (exportar.py).
+# Los gráficos se sirven del nivel más grueso de la pirámide de resoluciones
+# (piramide.py) que aún llena el ancho de la figura (--resolucion base para
+# dibujar siempre las barras guardadas). Con --perfil (perfiles.py) las
+# imágenes salen en el formato, resolución y codificación del perfil.
+#
+#   python3 dxy_cli.py --stats-only
+#   python3 dxy_cli.py --ticker DX-Y.NYB --inicio 2025-01-01 --fin 2026-01-05 \
+#       --salidas png,pdf,csv,infografia --out informes/ --estilo ggplot
+#   python3 dxy_cli.py --salidas png,infografia,social --perfil web --out web/
+import argparse
+import json
+import os
+import sys
+import time
+
+SALIDAS = ('png', 'pdf', 'csv', 'infografia', 'social', 'simple')
+# Resolución de las imágenes sin --perfil
+DPI = 300
+# Ancho en pulgadas de la figura más ancha (charts.grafico_tecnico)
+ANCHO_FIGURA = 14
+
+
+def argumentos(argv=None):
+    from perfiles import PERFILES
+
+    parser = argparse.ArgumentParser(description='Datos, estadísticas y gráficos del DXY')
+    parser.add_argument('--ticker', default='DX-Y.NYB')
+    parser.add_argument('--inicio', default='2025-01-01', help='fecha inicial (incluida)')
+    parser.add_argument('--fin', default='2026-01-05', help='fecha final (excluida)')
+    parser.add_argument('--intervalo', default='1d')
+    parser.add_argument('--salidas', default='png,pdf,csv',
+                        help=f"lista separada por comas: {','.join(SALIDAS)}")
+    parser.add_argument('--out', default='.', help='directorio de salida')
+    parser.add_argument('--prefijo', default='dxy', help='prefijo de los archivos generados')
+    parser.add_argument('--estilo', default=None, help='hoja de estilo de matplotlib (p. ej. ggplot)')
+    parser.add_argument('--dpi', type=float, default=None,
+                        help=f'resolución (por defecto la del perfil, o {DPI} sin perfil)')
+    parser.add_argument('--perfil', choices=PERFILES, default=None,
+                        help='perfil de salida (perfiles.py): las imágenes png, infografia, social y '
+                             'simple salen en su formato; el PDF rasteriza las capas pesadas')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--eventos', type=int, default=0, metavar='N',
+                        help='anota en el gráfico técnico los N eventos más relevantes (eventos.py)')
+    parser.add_argument('--resolucion', choices=('auto', 'base'), default='auto',
+                        help='auto: nivel de la pirámide según el ancho en píxeles; base: barras guardadas')
+    parser.add_argument('--stats-only', action='store_true',
+                        help='solo imprime las estadísticas, sin generar archivos')
+    parser.add_argument('--json', action='store_true', help='estadísticas en JSON (una línea)')
+    args = parser.parse_args(argv)
+
+    args.salidas = [s.strip() for s in args.salidas.split(',') if s.strip()]
+    if args.dpi is None:
+        args.dpi = PERFILES[args.perfil].dpi if args.perfil else DPI
+    desconocidas = set(args.salidas) - set(SALIDAS)
+    if desconocidas:
+        parser.error(f"salidas desconocidas: {', '.join(sorted(desconocidas))}")
+    return args
+
+
+def _fecha(ns):
+    import numpy as np
+
+    return str(np.datetime64(int(ns), 'ns'))[:10]
+
+
+def estadisticas(columnas):
+    # Estadísticas del período a partir de arrays (Date en ns y OHLCV), como
+    # charts.texto_estadisticas más RSI y señal de graph_ds.py
+    import numpy as np
+    import indicators
+
+    fechas = np.asarray(columnas['Date'])
+    close = np.asarray(columnas['Close'], dtype=np.float64)
+    high = np.asarray(columnas['High'], dtype=np.float64)
+    low = np.asarray(columnas['Low'], dtype=np.float64)
+    if len(close) == 0:
+        raise ValueError("No hay barras en el rango pedido")
+
+    ma_20 = indicators.sma(close, 20, min_periods=1)[-1]
+    ma_50 = indicators.sma(close, 50, min_periods=1)[-1]
+    i_max, i_min = int(np.nanargmax(high)), int(np.nanargmin(low))
+    return {
+        'desde': _fecha(fechas[0]),
+        'hasta': _fecha(fechas[-1]),
+        'dias': len(close),
+        'primer_cierre': round(float(close[0]), 4),
+        'ultimo_cierre': round(float(close[-1]), 4),
+        'cambio_pct': round(float((close[-1] / close[0] - 1) * 100), 4),
+        'maximo': round(float(high[i_max]), 4),
+        'fecha_maximo': _fecha(fechas[i_max]),
+        'minimo': round(float(low[i_min]), 4),
+        'fecha_minimo': _fecha(fechas[i_min]),
+        'volatilidad_diaria_pct': round(float(np.nanstd(indicators.rendimientos(close), ddof=1) * 100), 4),
+        'ma_20': round(float(ma_20), 4),
+        'ma_50': round(float(ma_50), 4),
+        'rsi_14': round(float(indicators.rsi_simple(close, 14)[-1]), 2),
+        'senal': 'ALCISTA' if ma_20 > ma_50 else 'BAJISTA',
+    }
+
+
+def imprimir_estadisticas(stats, ticker, como_json=False):
+    if como_json:
+        print(json.dumps({'ticker': ticker, **stats}, ensure_ascii=False))
+        return
+    print(f"Estadísticas {ticker} ({stats['desde']} a {stats['hasta']}):")
+    print(f"• Días analizados: {stats['dias']}")
+    print(f"• Primer cierre: {stats['primer_cierre']:.2f}")
+    print(f"• Último cierre: {stats['ultimo_cierre']:.2f}")
+    print(f"• Cambio total: {stats['cambio_pct']:+.2f}%")
+    print(f"• Máximo: {stats['maximo']:.2f} ({stats['fecha_maximo']})")
+    print(f"• Mínimo: {stats['minimo']:.2f} ({stats['fecha_minimo']})")
+    print(f"• Volatilidad diaria: {stats['volatilidad_diaria_pct']:.2f}%")
+    print(f"• Media 20 días: {stats['ma_20']:.2f}")
+    print(f"• Media 50 días: {stats['ma_50']:.2f}")
+    print(f"• RSI 14: {stats['rsi_14']:.1f}")
+    print(f"• Señal: {stats['senal']}")
+
+
+def _columnas_df(dxy):
+    return {'Date': dxy.index.as_unit('ns').asi8, **{c: dxy[c].to_numpy() for c in dxy.columns}}
+
+
+def con_medias(barras):
+    # Copia con las medias móviles de graph_ds.py
+    import indicators
+
+    barras = barras.copy()
+    cierres = barras['Close'].to_numpy()
+    barras['MA_20'] = indicators.sma(cierres, 20, min_periods=1)
+    barras['MA_50'] = indicators.sma(cierres, 50, min_periods=1)
+    return barras
+
+
+def trabajos_render(dxy, args, eventos=None):
+    # RenderJob por cada salida gráfica pedida, rotulados con el ticker y el
+    # rango real (de --inicio a la última barra)
+    # render_farm antes que charts: fija el backend (Agg con DXY_HEADLESS,
+    # que main ya ha puesto) antes de que charts cargue pyplot
+    from render_farm import RenderJob
+    from charts import etiquetas
+
+    base = os.path.join(args.out, f"{args.prefijo}_{{}}{args.inicio}_{args.fin}")
+    if args.perfil:
+        from perfiles import PERFILES
+
+        extension = '.' + PERFILES[args.perfil].formato
+        alta = vectorial = dict(perfil=args.perfil, dpi=args.dpi)
+    else:
+        extension = '.png'
+        alta, vectorial = dict(dpi=args.dpi, bbox_inches='tight'), dict(bbox_inches='tight')
+    infografia = dict(alta, facecolor='white', edgecolor='none')
+    close = dxy['Close']
+    tecnico = (dxy, args.inicio, args.fin)
+    rotulos = etiquetas(args.ticker, args.inicio, dxy.index[-1])
+    opciones = dict(rotulos['grafico_tecnico'], **({'eventos': eventos} if eventos else {}))
+
+    trabajos = []
+    if 'png' in args.salidas:
+        trabajos.append(RenderJob('grafico_tecnico', tecnico, base.format('') + extension, alta, opciones))
+    if 'pdf' in args.salidas:
+        trabajos.append(RenderJob('grafico_tecnico', tecnico, base.format('') + '.pdf', vectorial, opciones))
+    if 'infografia' in args.salidas:
+        trabajos.append(RenderJob('infografia', (close,), base.format('infografia_') + extension, infografia,
+                                  rotulos['infografia']))
+    if 'social' in args.salidas:
+        trabajos.append(RenderJob('infografia_social', (close,), base.format('social_') + extension,
+                                  infografia, rotulos['infografia_social']))
+    if 'simple' in args.salidas:
+        trabajos.append(RenderJob('grafico_simple', (close,), base.format('simple_') + extension, alta,
+                                  rotulos['grafico_simple']))
+    return trabajos
+
+
+def main(argv=None):
+    args = argumentos(argv)
+    t0 = time.perf_counter()
+    # La CLI nunca abre ventanas: render_farm lee DXY_HEADLESS al importarse,
+    # así que se fija antes de que nada cargue render_farm o charts
+    os.environ.setdefault('DXY_HEADLESS', '1')
+
+    # Camino rápido: estadísticas servidas desde el almacén sin pandas
+    from bar_store import BarStore
+
+    store = BarStore()
+    if args.stats_only:
+        columnas = store.columnas_cubiertas(args.ticker, args.inicio, args.fin, args.intervalo)
+        if columnas is not None:
+            imprimir_estadisticas(estadisticas(columnas), args.ticker, args.json)
+            return 0
+
+    # Rango no cubierto (o salidas pedidas): descarga lo que falte, una vez
+    store.completar(args.ticker, args.inicio, args.fin, args.intervalo)
+
+    def barras_guardadas():
+        if store.provider.cacheable:
+            return store.cargar(args.ticker, args.intervalo, args.inicio, args.fin)[0]
+        # Fuentes que no pasan por el almacén (reproducción de CSV)
+        return store.get(args.ticker, args.inicio, args.fin, args.intervalo)
+
+    columnas = store.columnas_cubiertas(args.ticker, args.inicio, args.fin, args.intervalo)
+    dxy = None
+    if columnas is None:
+        # Rango que llega al día en curso (nunca se da por cubierto) o sin almacén
+        dxy = barras_guardadas()
+        columnas = _columnas_df(dxy)
+    if len(columnas['Date']) == 0:
+        print(f"No hay datos de {args.ticker} entre {args.inicio} y {args.fin}", file=sys.stderr)
+        return 1
+    stats = estadisticas(columnas)
+    if args.stats_only:
+        imprimir_estadisticas(stats, args.ticker, args.json)
+        return 0
+    os.makedirs(args.out, exist_ok=True)
+
+    generados = []
+    if 'csv' in args.salidas:
+        ruta_csv = os.path.join(args.out, f"{args.prefijo}_datos_{args.inicio}_{args.fin}.csv")
+        if dxy is None and store.provider.cacheable:
+            # Por bloques desde el almacén, sin cargar la serie (exportar.py)
+            from exportar import exportar
+            exportar(store.directorio(args.ticker, args.intervalo), ruta_csv, args.inicio, args.fin,
+                     incremental=False)
+        else:
+            if dxy is None:
+                dxy = barras_guardadas()
+            con_medias(dxy).to_csv(ruta_csv)
+        generados.append(ruta_csv)
+
+    trabajos = []
+    if set(args.salidas) - {'csv'}:
+        # Barras para dibujar: el nivel de la pirámide que llena el ancho de la figura
+        if args.resolucion == 'auto':
+            nivel, barras = store.get_resolucion(args.ticker, args.inicio, args.fin,
+                                                 int(ANCHO_FIGURA * args.dpi), args.intervalo,
+                                                 descargar=False)
+            if nivel != args.intervalo:
+                print(f"Gráficos con barras {nivel} ({len(barras)} barras)", file=sys.stderr)
+        else:
+            barras = dxy if dxy is not None else barras_guardadas()
+        eventos = None
+        if args.eventos:
+            # Se colocan al dibujar, con los ejes reales (charts.grafico_tecnico)
+            from eventos import detectar
+            eventos = detectar(barras['Close'].dropna(), args.eventos)
+        trabajos = trabajos_render(con_medias(barras), args, eventos)
+    errores = {}
+    if trabajos:
+        from render_farm import render_all
+
+        if args.estilo:
+            import matplotlib.style
+            matplotlib.style.use(args.estilo)
+        hechos, errores = render_all(trabajos, workers=args.workers)
+        generados += hechos
+
+    for ruta in generados:
+        print(f"✓ {ruta}")
+    for ruta, error in errores.items():
+        print(f"✗ {ruta}: {error}", file=sys.stderr)
+    imprimir_estadisticas(stats, args.ticker, args.json)
+    print(f"Tiempo total: {time.perf_counter() - t0:.2f} s", file=sys.stderr)
+    return 1 if errores else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
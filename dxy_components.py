@@ -0,0 +1,249 @@
+# Reconstrucción del DXY a partir de sus seis divisas
+# El índice es una media geométrica ponderada de seis tipos de cambio:
+#   DXY = 50.14348112 · EURUSD^-0.576 · USDJPY^0.136 · GBPUSD^-0.119
+#                     · USDCAD^0.091 · USDSEK^0.042 · USDCHF^0.036
+# En logaritmos es una combinación lineal, de modo que la variación log del
+# índice entre dos barras se reparte exactamente entre las divisas
+# (contribución = exponente · variación log del par).
+# Sobre el calendario común de las seis series (barras presentes en todas) y
+# para cada ventana se calcula la matriz de covarianzas móvil de los
+# rendimientos (sumas acumuladas de productos cruzados, sin bucles por barra)
+# y de ella la correlación entre pares, la correlación de cada par con el
+# índice y la parte de la varianza del índice que aporta cada divisa.
+# Los datos de minuto se procesan por bloques de filas con memoria acotada:
+# de un bloque al siguiente solo se arrastran las barras que necesitan las
+# ventanas, y los resultados se añaden a un directorio columnar.
+#
+#   python3 dxy_components.py --inicio 2025-01-01 --fin 2026-01-05 --ventanas 20 60
+#   python3 dxy_components.py --intervalo 1m --ventanas 390 1950 --salida componentes_1m/
+import argparse
+import time
+from functools import reduce
+
+import numpy as np
+
+import columnar
+from instrumentation import etapa
+
+CONSTANTE = 50.14348112
+# (divisa, ticker de Yahoo, exponente): negativo si el dólar es la divisa cotizada
+COMPONENTES = [
+    ('EUR', 'EURUSD=X', -0.576),
+    ('JPY', 'JPY=X', 0.136),
+    ('GBP', 'GBPUSD=X', -0.119),
+    ('CAD', 'CAD=X', 0.091),
+    ('SEK', 'SEK=X', 0.042),
+    ('CHF', 'CHF=X', 0.036),
+]
+DIVISAS = [divisa for divisa, _, _ in COMPONENTES]
+TICKERS = [ticker for _, ticker, _ in COMPONENTES]
+EXPONENTES = np.array([exponente for _, _, exponente in COMPONENTES])
+
+# Filas por bloque al procesar datos de minuto (~150 MB de pico con dos ventanas)
+BLOQUE = 50_000
+
+
+def alinear(fechas, cierres):
+    # Calendario común: solo las barras presentes en las seis series.
+    # fechas/cierres: una lista de arrays por divisa (fechas en ns, ordenadas).
+    # Devuelve (fechas comunes, matriz n x 6 de cierres).
+    comunes = reduce(lambda a, b: np.intersect1d(a, b, assume_unique=True), fechas)
+    matriz = np.empty((len(comunes), len(cierres)))
+    for j, (f, c) in enumerate(zip(fechas, cierres)):
+        matriz[:, j] = np.asarray(c)[np.searchsorted(f, comunes)]
+    return comunes, matriz
+
+
+def reconstruir(precios):
+    # DXY a partir de la matriz de cierres (n x 6)
+    return CONSTANTE * np.exp(np.log(precios) @ EXPONENTES)
+
+
+def contribuciones(precios):
+    # Variación log del DXY atribuida a cada divisa ((n-1) x 6); cada fila suma
+    # exactamente la variación log del índice reconstruido
+    return np.diff(np.log(precios), axis=0) * EXPONENTES
+
+
+def covarianza_movil(r, ventana):
+    # Matriz de covarianzas (ddof=1) de las últimas `ventana` filas de r (n x k)
+    # para cada fila: n x k x k, NaN hasta completar la primera ventana
+    n, k = r.shape
+    salida = np.full((n, k, k), np.nan)
+    if n < ventana:
+        return salida
+    # Centrar no cambia la covarianza y evita perder precisión en las sumas
+    r = r - r.mean(axis=0)
+    s1 = np.zeros((n + 1, k))
+    np.cumsum(r, axis=0, out=s1[1:])
+    s2 = np.zeros((n + 1, k, k))
+    np.cumsum(np.einsum('ni,nj->nij', r, r), axis=0, out=s2[1:])
+    suma = s1[ventana:] - s1[:-ventana]
+    cruzados = s2[ventana:] - s2[:-ventana]
+    salida[ventana - 1:] = (cruzados - np.einsum('ni,nj->nij', suma, suma) / ventana) / (ventana - 1)
+    return salida
+
+
+def metricas_ventana(r, ventana):
+    # Métricas móviles de una ventana a partir de los rendimientos log (n x 6):
+    # correlaciones entre pares y con el índice, cuota de la varianza del índice
+    # (suma 1) y movimiento del índice atribuido a cada divisa en la ventana
+    cov = covarianza_movil(r, ventana)
+    cov_indice = cov @ EXPONENTES                          # cov(r_i, r_DXY)
+    var_indice = cov_indice @ EXPONENTES
+    desviacion = np.sqrt(np.diagonal(cov, axis1=1, axis2=2))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        correlacion = cov / (desviacion[:, :, None] * desviacion[:, None, :])
+        corr_indice = cov_indice / (desviacion * np.sqrt(var_indice)[:, None])
+        cuota = EXPONENTES * cov_indice / var_indice[:, None]
+
+    acumulado = np.zeros((len(r) + 1, r.shape[1]))
+    np.cumsum(r * EXPONENTES, axis=0, out=acumulado[1:])
+    movimiento = np.full(r.shape, np.nan)
+    movimiento[ventana - 1:] = acumulado[ventana:] - acumulado[:-ventana]
+
+    resultado = {}
+    for i, a in enumerate(DIVISAS):
+        for j in range(i + 1, len(DIVISAS)):
+            resultado[f'corr_{a}_{DIVISAS[j]}_{ventana}'] = correlacion[:, i, j]
+    for i, a in enumerate(DIVISAS):
+        resultado[f'corr_{a}_DXY_{ventana}'] = corr_indice[:, i]
+        resultado[f'cuota_{a}_{ventana}'] = cuota[:, i]
+        resultado[f'mov_{a}_{ventana}'] = movimiento[:, i]
+    return resultado
+
+
+def panel(fechas, precios, ventanas=(20, 60)):
+    # {columna: array} alineado con las filas de precios: DXY reconstruido,
+    # contribución de cada divisa a la variación de cada barra (NaN en la
+    # primera) y las métricas móviles de cada ventana
+    resultado = {'Date': np.asarray(fechas, dtype='<i8'), 'DXY': reconstruir(precios)}
+    aportes = contribuciones(precios)
+    r = aportes / EXPONENTES
+    for i, divisa in enumerate(DIVISAS):
+        resultado[f'contrib_{divisa}'] = np.r_[np.nan, aportes[:, i]]
+    for ventana in ventanas:
+        with etapa('ventana_componentes', ventana=ventana, filas=len(r)):
+            for nombre, valores in metricas_ventana(r, ventana).items():
+                resultado[nombre] = np.r_[np.nan, valores]
+    return resultado
+
+
+def procesar_por_bloques(archivos, ventanas=(20, 60), bloque=BLOQUE, start=None, end=None):
+    # Recorre las series columnares de las seis divisas (BarFile, en el orden
+    # de COMPONENTES) por tramos de `bloque` filas de la primera y devuelve el
+    # panel de cada tramo. Cada tramo solo lee sus filas (memmap) y arrastra
+    # las últimas max(ventanas) barras alineadas del anterior, así que el
+    # resultado es el mismo que con toda la serie en memoria.
+    arrastre = max(ventanas)
+    referencia = archivos[0].fechas
+    i, j = archivos[0].posiciones(start, end)
+    fin = np.iinfo(np.int64).max if end is None else columnar.a_ns(end)
+    previas_f, previas_p = np.empty(0, dtype=np.int64), np.empty((0, len(archivos)))
+
+    for inicio in range(i, j, bloque):
+        desde = int(referencia[inicio])
+        hasta = int(referencia[inicio + bloque]) if inicio + bloque < j else fin
+        with etapa('bloque_componentes', filas=min(bloque, j - inicio)):
+            fechas, cierres = [], []
+            for archivo in archivos:
+                a, b = archivo.posiciones(desde, hasta)
+                fechas.append(np.asarray(archivo.fechas[a:b]))
+                cierres.append(np.asarray(archivo.columna('Close')[a:b], dtype=np.float64))
+            nuevas_f, nuevas_p = alinear(fechas, cierres)
+            todas_f = np.concatenate([previas_f, nuevas_f])
+            todas_p = np.concatenate([previas_p, nuevas_p])
+            resultado = panel(todas_f, todas_p, ventanas)
+            omitir = len(previas_f)
+            previas_f, previas_p = todas_f[-arrastre:], todas_p[-arrastre:]
+        if len(nuevas_f):
+            yield {nombre: valores[omitir:] for nombre, valores in resultado.items()}
+
+
+def escribir_panel(directorio, bloques):
+    # Añade cada bloque a un directorio columnar (columnar.BarFile para leerlo)
+    filas = 0
+    for datos in bloques:
+        columnar.anadir_columnas(directorio, datos)
+        filas += len(datos['Date'])
+    return filas
+
+
+def panel_diario(start, end, ventanas=(20, 60), interval='1d', store=None):
+    # Panel como DataFrame (índice de fechas) descargando las divisas que
+    # falten en el almacén local; para gráficos y análisis interactivo
+    import pandas as pd
+    from bar_store import BarStore
+
+    store = store or BarStore()
+    fechas, cierres = [], []
+    for ticker in TICKERS:
+        barras = store.get(ticker, start, end, interval)
+        if barras.empty:
+            raise ValueError(f"Sin datos de {ticker} entre {start} y {end}")
+        fechas.append(barras.index.as_unit('ns').asi8)
+        cierres.append(barras['Close'].to_numpy())
+    datos = panel(*alinear(fechas, cierres), ventanas)
+    indice = pd.DatetimeIndex(datos.pop('Date').astype('datetime64[ns]'), name='Date')
+    return pd.DataFrame(datos, index=indice)
+
+
+def contribucion_acumulada(datos):
+    # Variación log acumulada del DXY desde la primera barra atribuida a cada
+    # divisa (columnas = DIVISAS); la suma por filas es la del índice
+    columnas = {divisa: datos[f'contrib_{divisa}'].fillna(0.0).cumsum() for divisa in DIVISAS}
+    return datos[[]].assign(**columnas)
+
+
+def imprimir_resumen(datos, ventanas, dxy=None):
+    total = contribucion_acumulada(datos).iloc[-1]
+    variacion = np.expm1(total.sum())
+    print(f"DXY reconstruido: {datos['DXY'].iloc[0]:.3f} -> {datos['DXY'].iloc[-1]:.3f} "
+          f"({variacion:+.2%}, {len(datos)} barras comunes)")
+    if dxy is not None:
+        comun = dxy.reindex(datos.index).dropna()
+        if len(comun):
+            error = (datos['DXY'].reindex(comun.index) / comun - 1).abs()
+            print(f"Diferencia con el DXY cotizado: media {error.mean():.4%}, máxima {error.max():.4%}")
+
+    print(f"\n{'divisa':<8}{'peso':>8}{'aporte':>10}" + ''.join(
+        f"{'corr ' + str(v):>11}{'cuota ' + str(v):>11}" for v in ventanas))
+    for divisa, _, exponente in COMPONENTES:
+        fila = f"{divisa:<8}{exponente:>+8.3f}{total[divisa] * 100:>+9.2f}%"
+        for v in ventanas:
+            fila += f"{datos[f'corr_{divisa}_DXY_{v}'].iloc[-1]:>11.2f}"
+            fila += f"{datos[f'cuota_{divisa}_{v}'].iloc[-1]:>11.1%}"
+        print(fila)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Reconstrucción del DXY y panel de contribuciones')
+    parser.add_argument('--inicio', default='2025-01-01')
+    parser.add_argument('--fin', default='2026-01-05')
+    parser.add_argument('--intervalo', default='1d')
+    parser.add_argument('--ventanas', type=int, nargs='+', default=[20, 60])
+    parser.add_argument('--salida', help='directorio columnar: procesa por bloques las series '
+                                         'del almacén (datos de minuto)')
+    parser.add_argument('--bloque', type=int, default=BLOQUE)
+    args = parser.parse_args()
+
+    from bar_store import BarStore
+
+    store = BarStore()
+    t0 = time.perf_counter()
+    if args.salida:
+        archivos = [store.archivo(ticker, args.intervalo) for ticker in TICKERS]
+        faltan = [t for t, a in zip(TICKERS, archivos) if a is None]
+        if faltan:
+            parser.error(f"Sin barras {args.intervalo} en el almacén para {', '.join(faltan)} "
+                         f"(descárgalas con async_fetch.py --intervalo {args.intervalo})")
+        filas = escribir_panel(args.salida, procesar_por_bloques(archivos, args.ventanas, args.bloque,
+                                                                 args.inicio, args.fin))
+        print(f"✓ {filas:,} barras escritas en {args.salida} ({time.perf_counter() - t0:.2f} s)")
+    else:
+        datos = panel_diario(args.inicio, args.fin, args.ventanas, args.intervalo, store)
+        try:
+            dxy = store.get('DX-Y.NYB', args.inicio, args.fin, args.intervalo)['Close']
+        except Exception:
+            dxy = None
+        imprimir_resumen(datos, args.ventanas, dxy)
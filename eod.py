@@ -0,0 +1,348 @@
+# Actualización de fin de día por grafo de dependencias
+# Para cada ticker configurado se monta el grafo
+#
+#   barras ─┬─ indicadores    (streaming_indicators.py: estado incremental)
+#           ├─ estadisticas   (JSON de dxy_cli.estadisticas)
+#           ├─ csv            (exportar.py: solo reescribe el último bloque)
+#           ├─ informe        (informes.py: meses, trimestres, años, ventana móvil)
+#           └─ png, pdf, infografia, social, simple   (un nodo por gráfico)
+#
+# Primero se descargan a la vez las barras nuevas de todos los tickers
+# (async_fetch.py). Cada nodo tiene una huella: la de los datos en las barras
+# y, en el resto, la de sus entradas y su configuración. Un nodo solo se
+# ejecuta si su huella cambió desde la última ejecución o falta alguna de sus
+# salidas; los demás se omiten y se informa de ello. Los nodos de un mismo
+# nivel son independientes y se reparten en un pool de procesos ('fork', como
+# render_farm.py).
+# La huella de las barras no relee el histórico: el almacén solo cambia por
+# el final (bar_store.py sustituye desde la primera barra nueva), así que
+# bastan el número de filas, la primera y la última fecha y las últimas
+# COLA barras. Un cierre sin barras nuevas cuesta la descarga y unos
+# milisegundos.
+#
+# Las salidas van a <out>/<ticker>/ con nombres fijos (el rango se amplía cada
+# día); el estado, a <out>/eod_estado.json.
+#
+#   python3 eod.py DX-Y.NYB EURUSD=X --inicio 2025-01-01 --out eod/
+#   python3 eod.py --salidas csv,estadisticas,png --workers 4
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import columnar
+import instrumentation
+from instrumentation import etapa
+
+# Versión de los nodos: al cambiar lo que producen, todos se rehacen una vez
+# (2: gráficos rotulados con el ticker y el rango real)
+VERSION = 2
+ESTADO = 'eod_estado.json'
+# Barras del final que entran en la huella de la serie
+COLA = 256
+# Salida -> (constructor de charts.py, archivo) de los nodos de gráfico
+GRAFICOS = {
+    'png': ('grafico_tecnico', 'grafico.png'),
+    'pdf': ('grafico_tecnico', 'grafico.pdf'),
+    'infografia': ('infografia', 'infografia.png'),
+    'social': ('infografia_social', 'social.png'),
+    'simple': ('grafico_simple', 'simple.png'),
+}
+DATOS = {
+    'indicadores': None,  # en el almacén, junto a las barras
+    'estadisticas': 'estadisticas.json',
+    'csv': 'datos.csv.gz',
+    'informe': 'informe.csv',
+}
+SALIDAS = tuple(DATOS) + tuple(GRAFICOS)
+
+Nodo = namedtuple('Nodo', ['nombre', 'ticker', 'tipo', 'entradas', 'salidas'])
+
+
+def manana():
+    return str(np.datetime64('today', 'D') + np.timedelta64(1, 'D'))
+
+
+def _directorio_ticker(out, ticker):
+    return os.path.join(out, ticker.replace('/', '_').replace('^', '_'))
+
+
+def grafo(tickers, salidas, config):
+    # {nombre: Nodo} en orden topológico (las barras primero)
+    from bar_store import BarStore
+    import streaming_indicators
+
+    store = BarStore()
+    nodos = {}
+    for ticker in tickers:
+        nodos[f'barras:{ticker}'] = Nodo(f'barras:{ticker}', ticker, 'barras', [], [])
+    for ticker in tickers:
+        base = _directorio_ticker(config['out'], ticker)
+        for tipo in salidas:
+            if tipo == 'indicadores':
+                archivos = [streaming_indicators.ruta_estado(store, ticker, config['intervalo'])]
+            else:
+                archivos = [os.path.join(base, DATOS[tipo] if tipo in DATOS else GRAFICOS[tipo][1])]
+            nodos[f'{tipo}:{ticker}'] = Nodo(f'{tipo}:{ticker}', ticker, tipo, [f'barras:{ticker}'], archivos)
+    return nodos
+
+
+def niveles(nodos):
+    # Listas de nodos que pueden ejecutarse a la vez (todas sus entradas en niveles anteriores)
+    nivel = {}
+    for nombre, nodo in nodos.items():
+        nivel[nombre] = 1 + max((nivel[e] for e in nodo.entradas), default=-1)
+    resultado = [[] for _ in range(max(nivel.values(), default=-1) + 1)]
+    for nombre, n in nivel.items():
+        resultado[n].append(nombre)
+    return resultado
+
+
+def huella_barras(store, ticker, intervalo, inicio):
+    # Huella de las barras del ticker desde `inicio` (ver COLA)
+    archivo = store.archivo(ticker, intervalo)
+    if archivo is None:
+        return None
+    i, j = archivo.posiciones(inicio, None)
+    h = hashlib.sha256(f'{j - i}'.encode())
+    if j > i:
+        h.update(f'{int(archivo.fechas[i])}:{int(archivo.fechas[j - 1])}'.encode())
+        for nombre in ['Date'] + columnar.COLUMNAS:
+            h.update(np.ascontiguousarray(archivo.columna(nombre)[max(i, j - COLA):j]).tobytes())
+    return h.hexdigest()
+
+
+def huella_nodo(nodo, huellas, config):
+    h = hashlib.sha256(f'{VERSION}:{nodo.tipo}:{json.dumps(config, sort_keys=True)}'.encode())
+    for entrada in nodo.entradas:
+        h.update(huellas[entrada].encode())
+    return h.hexdigest()
+
+
+# Nodos: cada uno lee del almacén lo que necesita y escribe sus salidas
+
+def nodo_indicadores(nodo, config):
+    from bar_store import BarStore
+    import streaming_indicators
+
+    streaming_indicators.actualizar_indicadores(BarStore(), nodo.ticker, config['intervalo'])
+
+
+def nodo_estadisticas(nodo, config):
+    from bar_store import BarStore
+    from dxy_cli import estadisticas
+
+    archivo = BarStore().archivo(nodo.ticker, config['intervalo'])
+    stats = {'ticker': nodo.ticker, **estadisticas(archivo.columnas(config['inicio']))}
+    with open(nodo.salidas[0] + '.tmp', 'w') as f:
+        json.dump(stats, f, ensure_ascii=False, indent=2)
+    os.replace(nodo.salidas[0] + '.tmp', nodo.salidas[0])
+
+
+def nodo_csv(nodo, config):
+    from bar_store import BarStore
+    from exportar import exportar
+
+    exportar(BarStore().directorio(nodo.ticker, config['intervalo']), nodo.salidas[0], config['inicio'])
+
+
+def nodo_informe(nodo, config):
+    from bar_store import BarStore
+    import informes
+
+    archivo = BarStore().archivo(nodo.ticker, config['intervalo'])
+    informes.guardar(informes.informe(archivo.columnas(config['inicio'])), nodo.salidas[0])
+
+
+def nodo_grafico(nodo, config):
+    # Como dxy_cli.trabajos_render, con las barras al nivel de la pirámide
+    # que llena el ancho de la figura
+    from bar_store import BarStore
+    from dxy_cli import ANCHO_FIGURA, con_medias
+    from render_farm import RenderJob, render_all
+    from charts import etiquetas
+
+    store = BarStore()
+    grafico, _ = GRAFICOS[nodo.tipo]
+    fin = manana()
+    _, barras = store.get_resolucion(nodo.ticker, config['inicio'], fin, int(ANCHO_FIGURA * config['dpi']),
+                                     config['intervalo'], descargar=False)
+    opciones = dict(bbox_inches='tight')
+    if nodo.tipo != 'pdf':
+        opciones['dpi'] = config['dpi']
+    if grafico == 'grafico_tecnico':
+        args = (con_medias(barras), config['inicio'], str(barras.index[-1].date()))
+    else:
+        args = (barras['Close'],)
+        if grafico != 'grafico_simple':
+            opciones.update(facecolor='white', edgecolor='none')
+    # Rótulos del rango real, que crece cada día (de inicio a la última barra)
+    rotulos = etiquetas(nodo.ticker, config['inicio'], barras.index[-1])[grafico]
+    # Sin caché de renders: el grafo ya decide qué está al día (y los nodos en
+    # paralelo no se pisan el manifiesto del directorio)
+    hechos, errores = render_all([RenderJob(grafico, args, nodo.salidas[0], opciones, rotulos)], workers=1,
+                                 cache=False)
+    if errores:
+        raise next(iter(errores.values()))
+
+
+FUNCIONES = {'indicadores': nodo_indicadores, 'estadisticas': nodo_estadisticas, 'csv': nodo_csv,
+             'informe': nodo_informe, **{tipo: nodo_grafico for tipo in GRAFICOS}}
+
+
+def _ejecutar(argumentos):
+    # Ejecuta un nodo; devuelve (nombre, segundos, error, eventos de traza)
+    nodo, config = argumentos
+    t0 = time.perf_counter()
+    try:
+        for ruta in nodo.salidas:
+            os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        with etapa('eod', nodo=nodo.nombre):
+            FUNCIONES[nodo.tipo](nodo, config)
+        error = None
+    except Exception as e:
+        error = f'{type(e).__name__}: {e}'
+    return nodo.nombre, time.perf_counter() - t0, error, instrumentation.extraer_eventos()
+
+
+def _leer_estado(out):
+    try:
+        with open(os.path.join(out, ESTADO)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _guardar_estado(out, estado):
+    ruta = os.path.join(out, ESTADO)
+    with open(ruta + '.tmp', 'w') as f:
+        json.dump(estado, f, indent=2, sort_keys=True)
+    os.replace(ruta + '.tmp', ruta)
+
+
+def actualizar(tickers, salidas=SALIDAS, inicio='2025-01-01', intervalo='1d', out='eod', dpi=150,
+               workers=None, descargar=True, forzar=False):
+    # Pone al día las salidas de los tickers. Devuelve {nodo: (estado, detalle)}
+    # con estado 'ejecutado', 'omitido' o 'error'.
+    from bar_store import BarStore
+
+    config = {'inicio': inicio, 'intervalo': intervalo, 'out': out, 'dpi': dpi}
+    nodos = grafo(tickers, salidas, config)
+    store = BarStore()
+    os.makedirs(out, exist_ok=True)
+    anterior = {} if forzar else _leer_estado(out)
+    estado = dict(anterior)
+    informe = {}
+
+    # Nivel 0: barras nuevas de todos los tickers a la vez
+    fallidos = {}
+    if descargar:
+        from async_fetch import fetch_bulk
+
+        with etapa('eod_descarga', tickers=len(tickers)):
+            resultados = fetch_bulk(tickers, inicio, manana(), intervalo, store=store)
+        fallidos = {r.ticker: f'{type(r.error).__name__}: {r.error}' for r in resultados.values() if not r.ok}
+
+    huellas = {}
+    for nivel in niveles(nodos):
+        pendientes = []
+        for nombre in nivel:
+            nodo = nodos[nombre]
+            if nodo.tipo == 'barras':
+                huella = huella_barras(store, nodo.ticker, intervalo, inicio)
+                if nodo.ticker in fallidos or huella is None:
+                    informe[nombre] = ('error', fallidos.get(nodo.ticker, 'sin barras en el almacén'))
+                    continue
+                huellas[nombre] = huella
+                cambio = anterior.get(nombre) != huella
+                informe[nombre] = ('ejecutado' if cambio else 'omitido',
+                                   'barras nuevas' if cambio else 'sin barras nuevas')
+                estado[nombre] = huella
+                continue
+            fallida = [e for e in nodo.entradas if e not in huellas]
+            if fallida:
+                informe[nombre] = ('error', f'falta {fallida[0]}')
+                continue
+            huellas[nombre] = huella_nodo(nodo, huellas, config)
+            faltan = [ruta for ruta in nodo.salidas if not os.path.exists(ruta)]
+            if anterior.get(nombre) == huellas[nombre] and not faltan:
+                informe[nombre] = ('omitido', 'entradas sin cambios')
+            else:
+                pendientes.append(nodo)
+
+        with etapa('eod_nivel', nodos=len(pendientes)):
+            for nombre, segundos, error, eventos in _repartir(pendientes, config, workers):
+                instrumentation.incorporar(eventos)
+                if error is None:
+                    informe[nombre] = ('ejecutado', f'{segundos:.2f} s')
+                    estado[nombre] = huellas[nombre]
+                else:
+                    informe[nombre] = ('error', error)
+                    estado.pop(nombre, None)
+                    del huellas[nombre]
+
+    _guardar_estado(out, estado)
+    return {nombre: informe[nombre] for nombre in nodos if nombre in informe}
+
+
+def _repartir(pendientes, config, workers):
+    trabajos = [(nodo, config) for nodo in pendientes]
+    if workers is None:
+        workers = min(len(trabajos), os.cpu_count() or 1)
+    if 'fork' not in multiprocessing.get_all_start_methods():
+        workers = 1
+    if workers <= 1:
+        return list(map(_ejecutar, trabajos))
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('fork')) as pool:
+        return list(pool.map(_ejecutar, trabajos))
+
+
+def imprimir_informe(informe):
+    simbolos = {'ejecutado': '✓', 'omitido': '·', 'error': '✗'}
+    for nombre, (estado, detalle) in informe.items():
+        print(f"{simbolos[estado]} {nombre:<28} {estado:<10} {detalle}")
+    cuenta = {estado: sum(1 for e, _ in informe.values() if e == estado) for estado in simbolos}
+    print(f"{cuenta['ejecutado']} ejecutados, {cuenta['omitido']} omitidos, {cuenta['error']} con error")
+    return cuenta['error']
+
+
+if __name__ == '__main__':
+    from async_fetch import TICKERS_DXY
+
+    parser = argparse.ArgumentParser(description='Actualización de fin de día: solo lo afectado por barras nuevas')
+    parser.add_argument('tickers', nargs='*', default=TICKERS_DXY[:1])
+    parser.add_argument('--inicio', default='2025-01-01')
+    parser.add_argument('--intervalo', default='1d')
+    parser.add_argument('--salidas', default=','.join(SALIDAS),
+                        help=f"lista separada por comas: {','.join(SALIDAS)}")
+    parser.add_argument('--out', default='eod', help='directorio de salida')
+    parser.add_argument('--dpi', type=float, default=150)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--sin-descarga', action='store_true', help='usa solo las barras ya guardadas')
+    parser.add_argument('--forzar', action='store_true', help='ejecuta todos los nodos')
+    args = parser.parse_args()
+
+    salidas = [s.strip() for s in args.salidas.split(',') if s.strip()]
+    desconocidas = set(salidas) - set(SALIDAS)
+    if desconocidas:
+        parser.error(f"salidas desconocidas: {', '.join(sorted(desconocidas))}")
+    from bar_store import BarStore
+
+    # Todos los nodos leen las barras del almacén
+    store = BarStore()
+    if not store.provider.cacheable:
+        parser.exit(1, f"La fuente {store.provider.nombre} no usa el almacén local: no hay nada que actualizar\n")
+
+    t0 = time.perf_counter()
+    informe = actualizar(args.tickers, salidas, args.inicio, args.intervalo, args.out, args.dpi,
+                         args.workers, not args.sin_descarga, args.forzar)
+    errores = imprimir_informe(informe)
+    print(f"Tiempo total: {time.perf_counter() - t0:.2f} s")
+    sys.exit(1 if errores else 0)
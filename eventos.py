@@ -0,0 +1,295 @@
+# Detección automática de eventos para anotar gráficos
+# En lugar de escribir a mano la lista de eventos de cada gráfico, se buscan
+# en las barras tres tipos de candidatos y se ordenan por relevancia:
+#   - cambios de régimen: segmentación binaria de los rendimientos log (cambio
+#     de la tendencia media). Cada tramo evalúa todos sus cortes a la vez con
+#     sumas acumuladas, así que el total es O(n log n).
+#   - picos de volatilidad: |rendimiento| > k·σ, con σ una media exponencial
+#     de los rendimientos al cuadrado hasta la barra anterior (una pasada).
+#   - extremos locales: zigzag con un umbral de reversión proporcional a la
+#     volatilidad (una pasada; solo se cuentan los extremos confirmados).
+# Las puntuaciones de los tres tipos están en desviaciones típicas, de modo
+# que se pueden ordenar juntas. De cada grupo de candidatos cercanos solo
+# queda el más relevante.
+# colocar() sitúa las etiquetas sin que se solapen: en orden de relevancia,
+# cada etiqueta prueba unas pocas alturas y se queda en la primera libre; las
+# ya colocadas no se mueven, así que no hay que resolver toda la disposición.
+# Las cajas se mantienen dentro de los ejes y lejos de las zonas ocupadas
+# (los cuadros de texto fijos del gráfico). charts.grafico_tecnico coloca los
+# eventos con los límites y el tamaño reales de sus ejes.
+# El resultado tiene el formato de "eventos" de las specs de escenarios/
+# ({fecha, texto, valor, desplazamiento}) más la fecha del centro del texto.
+#
+#   python3 eventos.py DX-Y.NYB EURUSD=X --max 6
+#   python3 eventos.py DX-Y.NYB --json > eventos_dxy.json
+import argparse
+import heapq
+import json
+import sys
+from collections import namedtuple
+
+import numpy as np
+
+import indicators
+
+Evento = namedtuple('Evento', ['fecha', 'tipo', 'valor', 'puntuacion', 'texto'])
+
+# Alturas (fracción del rango vertical) que prueba cada etiqueta, por orden
+ALTURAS = (0.12, 0.22, 0.32, 0.42)
+
+
+def cambios_regimen(close, tamano_min=20, umbral=2.0, max_cortes=8):
+    # [(índice de la barra, puntuación, subida)]: la barra es la última del
+    # régimen anterior; subida indica si la tendencia posterior es mayor
+    r = np.diff(np.log(np.asarray(close, dtype=np.float64)))
+    if len(r) < 2 * tamano_min:
+        return []
+    sigma = np.std(r, ddof=1)
+    if not sigma > 0:
+        return []
+
+    def mejor_corte(a, b):
+        # Estadístico t de la diferencia de medias para cada corte de r[a:b]
+        largo = b - a
+        if largo < 2 * tamano_min:
+            return None
+        suma = np.cumsum(r[a:b])
+        k = np.arange(tamano_min, largo - tamano_min + 1)
+        izquierda = suma[k - 1] / k
+        derecha = (suma[-1] - suma[k - 1]) / (largo - k)
+        t = np.abs(izquierda - derecha) / (sigma * np.sqrt(1.0 / k + 1.0 / (largo - k)))
+        i = int(np.argmax(t))
+        return t[i], a + int(k[i]), derecha[i] > izquierda[i]
+
+    cortes = []
+    pendientes = []
+    candidato = mejor_corte(0, len(r))
+    if candidato:
+        heapq.heappush(pendientes, (-candidato[0], candidato[1], candidato[2], 0, len(r)))
+    while pendientes and len(cortes) < max_cortes:
+        t, corte, subida, a, b = heapq.heappop(pendientes)
+        if -t < umbral:
+            break
+        cortes.append((corte, -t, subida))
+        for tramo in ((a, corte), (corte, b)):
+            candidato = mejor_corte(*tramo)
+            if candidato:
+                heapq.heappush(pendientes, (-candidato[0], candidato[1], candidato[2], *tramo))
+    return cortes
+
+
+def picos_volatilidad(close, k=3.0, span=30, calentamiento=20, separacion=5):
+    # [(índice, puntuación, rendimiento)] de las barras con |r| > k·σ previa;
+    # de cada racha (picos a menos de `separacion` barras) queda el mayor
+    r = np.diff(np.log(np.asarray(close, dtype=np.float64)))
+    if len(r) <= calentamiento:
+        return []
+    varianza = indicators.ema(r * r, span)
+    sigma = np.sqrt(np.r_[np.nan, varianza[:-1]])
+    sigma[:calentamiento] = np.nan
+    with np.errstate(invalid='ignore', divide='ignore'):
+        z = np.abs(r) / sigma
+    indices = np.flatnonzero(z > k)
+    picos = []
+    for i in indices:
+        if picos and i - picos[-1][0] <= separacion:
+            if z[i] > z[picos[-1][0]]:
+                picos[-1] = (i, z[i])
+            continue
+        picos.append((i, z[i]))
+    return [(i + 1, float(puntuacion), float(np.expm1(r[i]))) for i, puntuacion in picos]
+
+
+def extremos(close, umbral=1.5, tamano_min=20):
+    # Zigzag: [(índice, puntuación, es_maximo)] de los extremos confirmados por
+    # una reversión de al menos umbral·σ·√tamano_min (en log). La puntuación es
+    # la reversión en desviaciones típicas de su duración.
+    x = np.log(np.asarray(close, dtype=np.float64))
+    r = np.diff(x)
+    if len(r) < 2:
+        return []
+    sigma = np.std(r, ddof=1)
+    if not sigma > 0:
+        return []
+    h = umbral * sigma * np.sqrt(tamano_min)
+
+    pivotes = []
+    # Dirección aún desconocida: se sigue el máximo y el mínimo desde el principio
+    i_max = i_min = 0
+    direccion = 0
+    for i in range(1, len(x)):
+        if direccion >= 0 and x[i] > x[i_max]:
+            i_max = i
+        if direccion <= 0 and x[i] < x[i_min]:
+            i_min = i
+        if direccion >= 0 and x[i_max] - x[i] >= h:
+            pivotes.append((i_max, True))
+            direccion, i_min = -1, i
+        elif direccion <= 0 and x[i] - x[i_min] >= h:
+            pivotes.append((i_min, False))
+            direccion, i_max = 1, i
+
+    resultado = []
+    for n, (i, es_maximo) in enumerate(pivotes):
+        # Reversión hasta el siguiente extremo (o hasta el final si es el último)
+        fin = pivotes[n + 1][0] if n + 1 < len(pivotes) else (
+            int(np.argmin(x[i:])) + i if es_maximo else int(np.argmax(x[i:])) + i)
+        movimiento = abs(x[fin] - x[i])
+        resultado.append((i, float(movimiento / (sigma * np.sqrt(max(fin - i, 1)))), es_maximo))
+    return resultado
+
+
+def detectar(close, max_eventos=6, separacion=None, tipos=('regimen', 'volatilidad', 'extremo')):
+    # Candidatos ordenados por puntuación (Evento) sobre una Series de cierres
+    # con índice de fechas; dos eventos quedan al menos a `separacion` barras
+    valores = close.to_numpy(dtype=np.float64)
+    fechas = close.index
+    n = len(valores)
+    if separacion is None:
+        separacion = max(1, n // (3 * max(max_eventos, 1)))
+    i_max, i_min = int(np.nanargmax(valores)), int(np.nanargmin(valores))
+
+    # (puntuación, índice, tipo, texto); los Evento solo se crean para los elegidos
+    candidatos = []
+    if 'regimen' in tipos:
+        for i, puntuacion, subida in cambios_regimen(valores):
+            texto = 'Giro alcista' if subida else 'Giro bajista'
+            candidatos.append((puntuacion, i, 'regimen', f'{texto}\n({valores[i]:.2f})'))
+    if 'volatilidad' in tipos:
+        for i, puntuacion, rendimiento in picos_volatilidad(valores):
+            candidatos.append((puntuacion, i, 'volatilidad',
+                               f'Pico de volatilidad\n({rendimiento:+.1%} en una barra)'))
+    if 'extremo' in tipos:
+        for i, puntuacion, es_maximo in extremos(valores):
+            if i in (i_max, i_min):
+                texto = 'Máximo del periodo' if es_maximo else 'Mínimo del periodo'
+            else:
+                texto = 'Máximo local' if es_maximo else 'Mínimo local'
+            candidatos.append((puntuacion, i, 'extremo', f'{texto}\n({valores[i]:.2f})'))
+
+    # De mayor a menor puntuación, descartando los cercanos a uno ya elegido
+    elegidos = []
+    for puntuacion, i, tipo, texto in sorted(candidatos, key=lambda c: -c[0]):
+        if all(abs(i - otro) >= separacion for _, otro, _, _ in elegidos):
+            elegidos.append((puntuacion, i, tipo, texto))
+            if len(elegidos) == max_eventos:
+                break
+    return [Evento(fechas[i], tipo, valores[i], puntuacion, texto)
+            for puntuacion, i, tipo, texto in elegidos]
+
+
+def _caja(evento, ejes, fontsize):
+    # Ancho y alto aproximados de la etiqueta en fracción de los ejes
+    # (ejes: ancho y alto en pulgadas)
+    lineas = evento.texto.split('\n')
+    ancho = max(len(linea) for linea in lineas) * fontsize * 0.6 / (ejes[0] * 72)
+    alto = len(lineas) * fontsize * 1.4 / (ejes[1] * 72)
+    return ancho, alto
+
+
+def colocar(eventos, serie, figsize=(14, 7), fontsize=9, margen=0.05, limites=None, ejes=None,
+            ocupadas=()):
+    # [{fecha, texto, valor, desplazamiento, fecha_texto}] con las etiquetas
+    # repartidas sin solaparse entre sí ni salir de los ejes; fecha_texto y
+    # valor + desplazamiento son el centro de la caja. Los máximos prefieren ir
+    # encima y los mínimos debajo; el resto, hacia donde hay más sitio.
+    # limites: (x0, x1, y0, y1) de los ejes, con x en fechas (por defecto, los
+    # de la serie con el margen de matplotlib); ejes: tamaño de los ejes en
+    # pulgadas (por defecto ~80% x 75% de figsize); ocupadas: cajas
+    # (x0, y0, x1, y1) en fracción de los ejes que ninguna etiqueta debe tapar.
+    import pandas as pd
+
+    if limites is None:
+        y0, y1 = float(serie.min()), float(serie.max())
+        # Mismo margen vertical que aplica matplotlib (axes.ymargin = 0.05)
+        limites = (serie.index[0], serie.index[-1], y0 - (y1 - y0) * margen, y1 + (y1 - y0) * margen)
+    x0, x1 = pd.Timestamp(limites[0]).value, pd.Timestamp(limites[1]).value
+    y0, y1 = limites[2], limites[3]
+    ancho_x, alto_y = max(x1 - x0, 1), max(y1 - y0, 1e-12)
+    if ejes is None:
+        ejes = (figsize[0] * 0.8, figsize[1] * 0.75)
+
+    colocadas = list(ocupadas)
+    resultado = []
+    for evento in eventos:
+        xf = (evento.fecha.value - x0) / ancho_x
+        yf = (evento.valor - y0) / alto_y
+        ancho, alto = _caja(evento, ejes, fontsize)
+        arriba = evento.texto.startswith('Máximo') or (
+            not evento.texto.startswith('Mínimo') and yf < 0.5)
+        opciones = [s * d for d in ALTURAS for s in ((1, -1) if arriba else (-1, 1))]
+
+        def solape(d):
+            # Área solapada con las etiquetas ya colocadas y las zonas ocupadas.
+            # La caja se desplaza hasta quedar dentro de los ejes; si para eso
+            # tiene que tapar el punto anotado, cuenta como solape
+            cx = min(max(xf, ancho / 2), 1 - ancho / 2)
+            cy = min(max(yf + d, alto / 2), 1 - alto / 2)
+            caja = (cx - ancho / 2, cy - alto / 2, cx + ancho / 2, cy + alto / 2)
+            total = 0.0
+            if caja[0] <= xf <= caja[2] and caja[1] <= yf <= caja[3]:
+                total += ancho * alto
+            for otra in colocadas:
+                dx = min(caja[2], otra[2]) - max(caja[0], otra[0])
+                dy = min(caja[3], otra[3]) - max(caja[1], otra[1])
+                if dx > 0 and dy > 0:
+                    total += dx * dy
+            return total, caja
+
+        # Primera altura libre; si ninguna lo está, la que menos solapa
+        mejor = None
+        for d in opciones:
+            area, caja = solape(d)
+            if mejor is None or area < mejor[0]:
+                mejor = (area, caja)
+            if area == 0:
+                break
+        _, caja = mejor
+        colocadas.append(caja)
+        centro_x = x0 + (caja[0] + caja[2]) / 2 * ancho_x
+        centro_y = y0 + (caja[1] + caja[3]) / 2 * alto_y
+        resultado.append({'fecha': evento.fecha.strftime('%Y-%m-%d'), 'texto': evento.texto,
+                          'valor': round(float(evento.valor), 4),
+                          'desplazamiento': round(centro_y - float(evento.valor), 4),
+                          'fecha_texto': str(pd.Timestamp(int(centro_x)))})
+    return resultado
+
+
+def anotaciones(close, max_eventos=6, figsize=(14, 7), fontsize=9, **opciones):
+    # Atajo: detección y colocación estimando los ejes a partir de figsize
+    return colocar(detectar(close, max_eventos, **opciones), close, figsize, fontsize)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Detección automática de eventos para anotar gráficos')
+    parser.add_argument('tickers', nargs='*', default=['DX-Y.NYB'])
+    parser.add_argument('--inicio', default='2025-01-01')
+    parser.add_argument('--fin', default='2026-01-05')
+    parser.add_argument('--intervalo', default='1d')
+    parser.add_argument('--max', type=int, default=6, help='eventos por ticker')
+    parser.add_argument('--json', action='store_true',
+                        help='{ticker: eventos} con el formato de las specs de escenarios/')
+    args = parser.parse_args()
+
+    from bar_store import BarStore
+
+    store = BarStore()
+    salida = {}
+    for ticker in args.tickers:
+        try:
+            close = store.get(ticker, args.inicio, args.fin, args.intervalo)['Close'].dropna()
+        except Exception as e:
+            print(f"✗ {ticker}: {e}", file=sys.stderr)
+            continue
+        if len(close) < 3:
+            print(f"✗ {ticker}: sin barras suficientes", file=sys.stderr)
+            continue
+        eventos = detectar(close, args.max)
+        salida[ticker] = colocar(eventos, close)
+        if not args.json:
+            print(f"\n{ticker} ({len(close)} barras):")
+            for evento in eventos:
+                texto = evento.texto.replace('\n', ' ')
+                print(f"  {evento.fecha:%Y-%m-%d}  {evento.tipo:<12}{evento.puntuacion:>6.1f}σ  {texto}")
+    if args.json:
+        print(json.dumps(salida, ensure_ascii=False, indent=2))
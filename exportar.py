@@ -0,0 +1,288 @@
+# Exportación por bloques de las barras guardadas y sus columnas derivadas
+# Las barras se leen del almacén columnar (memmap) en bloques de tamaño fijo;
+# cada bloque se completa con MA_20/MA_50 (las columnas del CSV de
+# graph_ds.py, calculadas con las barras anteriores que hagan falta), se
+# formatea y se escribe. Nunca hay más de un bloque en memoria, así que
+# exportar décadas de barras de minuto de cientos de tickers cabe en un
+# presupuesto fijo (--bloque filas).
+# Formatos, según la extensión de la salida:
+#   .csv          texto plano
+#   .csv.gz       gzip, un miembro por bloque
+#   .csv.zst      zstd (paquete zstandard), un frame por bloque
+#   .parquet      directorio con un archivo por bloque (pyarrow)
+# Concatenar miembros gzip o frames zstd da un archivo válido, de modo que
+# las actualizaciones solo añaden por el final. Junto a la salida se guarda
+# <salida>.estado.json con dónde empieza el último bloque: al actualizar se
+# reescribe ese bloque (puede estar incompleto o su última barra haber
+# cambiado) y se añaden las barras nuevas. Si la serie cambió antes, se
+# exporta de nuevo entera.
+#
+#   python3 exportar.py DX-Y.NYB EURUSD=X --inicio 2015-01-01 --formato csv.gz --out exportados/
+#   python3 exportar.py DX-Y.NYB --intervalo 1m --formato parquet --bloque 200000
+import argparse
+import gzip
+import io
+import json
+import os
+import shutil
+import sys
+import time
+
+import numpy as np
+
+import columnar
+import indicators
+
+VERSION = 1
+BLOQUE = 100_000
+FORMATOS = ('csv', 'csv.gz', 'csv.zst', 'parquet')
+# Columnas derivadas del CSV de graph_ds.py: {nombre: ventana de la media}
+DERIVADAS = {'MA_20': 20, 'MA_50': 50}
+
+
+def formato_de(ruta):
+    for formato in sorted(FORMATOS, key=len, reverse=True):
+        if ruta.endswith('.' + formato):
+            return formato
+    raise ValueError(f"Formato desconocido para {ruta} (válidos: {', '.join(FORMATOS)})")
+
+
+class MediasMoviles:
+    # Las medias de DERIVADAS bloque a bloque con las mismas operaciones que
+    # indicators.sma(min_periods=1) sobre toda la serie, así que el resultado
+    # es idéntico bit a bit: se arrastra la base, la suma acumulada de las
+    # últimas barras y cuántas se llevan. El estado cabe en JSON.
+    VENTANA = max(DERIVADAS.values())
+
+    def __init__(self, base=None, acumulado=(), filas=0):
+        self.base = base
+        self.acumulado = np.asarray(acumulado, dtype=np.float64)
+        self.filas = filas
+
+    def bloque(self, close):
+        x = np.asarray(close, dtype=np.float64)
+        n = len(x)
+        if n == 0:
+            return {nombre: np.empty(0) for nombre in DERIVADAS}
+        if self.base is None:
+            self.base = float(x[0])
+        previo = self.acumulado[-1] if len(self.acumulado) else 0.0
+        acumulado = np.cumsum(np.concatenate(([previo], x - self.base)))[1:]
+        extendido = np.concatenate((self.acumulado, acumulado))
+        posiciones = self.filas + np.arange(n)
+        medias = {}
+        for nombre, ventana in DERIVADAS.items():
+            suma = acumulado.copy()
+            restar = posiciones >= ventana
+            suma[restar] -= extendido[len(self.acumulado) + np.flatnonzero(restar) - ventana]
+            cuenta = np.minimum(posiciones + 1, ventana)
+            medias[nombre] = (suma + self.base * cuenta) / cuenta
+        self.acumulado = extendido[-self.VENTANA:]
+        self.filas += n
+        return medias
+
+    def estado(self):
+        return {'base': self.base, 'acumulado': self.acumulado.tolist(), 'filas': self.filas}
+
+
+def _barras(archivo, i, j):
+    # Filas [i, j) del BarFile como DataFrame OHLCV
+    import pandas as pd
+
+    indice = pd.DatetimeIndex(np.asarray(archivo.fechas[i:j]).astype('datetime64[ns]'), name='Date')
+    return pd.DataFrame({nombre: np.asarray(archivo.columna(nombre)[i:j], dtype=np.float64)
+                         for nombre in columnar.COLUMNAS}, index=indice)
+
+
+def bloques(archivo, i, j, bloque=BLOQUE, medias=None):
+    # (fila, DataFrame con columnas derivadas) de `bloque` filas que cubren [i, j).
+    # `medias` (MediasMoviles) trae el estado de las filas anteriores a i.
+    medias = MediasMoviles() if medias is None else medias
+    for inicio in range(i, j, bloque):
+        df = _barras(archivo, inicio, min(j, inicio + bloque))
+        for nombre, valores in medias.bloque(df['Close'].to_numpy()).items():
+            df[nombre] = valores
+        yield inicio, df
+
+
+def _comprimir(texto, formato):
+    datos = texto.encode('utf-8')
+    if formato == 'csv.gz':
+        return gzip.compress(datos, compresslevel=6, mtime=0)
+    if formato == 'csv.zst':
+        try:
+            import zstandard
+        except ImportError as e:
+            raise RuntimeError("La salida .csv.zst necesita el paquete zstandard (pip install zstandard)") from e
+        return zstandard.ZstdCompressor(level=3).compress(datos)
+    return datos
+
+
+def _escribir_bloque(ruta, formato, df, cabecera, parte):
+    # Escribe un bloque al final de la salida; devuelve dónde empieza
+    # (byte en los CSV, número de archivo en Parquet)
+    if formato == 'parquet':
+        try:
+            df.to_parquet(os.path.join(ruta, f'parte-{parte:05d}.parquet'))
+        except ImportError as e:
+            raise RuntimeError(f"Parquet necesita pyarrow o fastparquet ({e})") from e
+        return parte
+    texto = io.StringIO()
+    df.to_csv(texto, header=cabecera)
+    with open(ruta, 'ab') as f:
+        posicion = f.tell()
+        f.write(_comprimir(texto.getvalue(), formato))
+    return posicion
+
+
+def _truncar(ruta, formato, posicion):
+    # Descarta la salida desde `posicion` (byte o número de archivo)
+    if formato == 'parquet':
+        for nombre in os.listdir(ruta):
+            if nombre.startswith('parte-') and int(nombre[6:11]) >= posicion:
+                os.remove(os.path.join(ruta, nombre))
+    else:
+        with open(ruta, 'r+b') as f:
+            f.truncate(posicion)
+
+
+def _borrar(ruta, formato):
+    if formato == 'parquet':
+        shutil.rmtree(ruta, ignore_errors=True)
+        os.makedirs(ruta)
+    else:
+        open(ruta, 'wb').close()
+
+
+def _ruta_estado(ruta):
+    return ruta.rstrip(os.sep) + '.estado.json'
+
+
+def _leer_estado(ruta):
+    try:
+        with open(_ruta_estado(ruta)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _guardar_estado(ruta, estado):
+    destino = _ruta_estado(ruta)
+    with open(destino + '.tmp', 'w') as f:
+        json.dump(estado, f, indent=2)
+    os.replace(destino + '.tmp', destino)
+
+
+def exportar(origen, ruta, start=None, end=None, bloque=BLOQUE, incremental=True):
+    # Exporta las barras [start, end) del directorio columnar `origen` a `ruta`.
+    # Con incremental=True (y estado de una exportación anterior del mismo
+    # rango) solo se reescribe el último bloque y se añaden las barras nuevas.
+    # Devuelve (filas totales, filas escritas en esta llamada).
+    formato = formato_de(ruta)
+    archivo = columnar.BarFile(origen)
+    i, j = archivo.posiciones(start, end)
+    primera = int(archivo.fechas[i]) if j > i else None
+    rango = [None if start is None else columnar.a_ns(start), None if end is None else columnar.a_ns(end)]
+
+    estado = _leer_estado(ruta) if incremental else None
+    if (estado is None or not os.path.exists(ruta) or estado['version'] != VERSION or estado['formato'] != formato
+            or estado['rango'] != rango or estado['primera'] != primera
+            or estado['fila_ultimo'] >= max(j - i, 1)
+            or int(archivo.fechas[i + estado['fila_ultimo']]) != estado['desde_ultimo']):
+        # Primera vez, otro rango o la serie cambió antes del último bloque
+        _borrar(ruta, formato)
+        desde, posicion, parte = i, 0, 0
+        medias = MediasMoviles()
+    else:
+        desde = i + estado['fila_ultimo']
+        posicion, parte = estado['posicion_ultimo'], estado['parte_ultimo']
+        medias = MediasMoviles(**estado['medias'])
+        _truncar(ruta, formato, posicion)
+    ultimo = {'fila_ultimo': desde - i, 'posicion_ultimo': posicion, 'parte_ultimo': parte,
+              'medias': medias.estado()}
+    previo = medias.estado()
+    for inicio, df in bloques(archivo, desde, j, bloque, medias):
+        posicion = _escribir_bloque(ruta, formato, df, inicio == i, parte)
+        ultimo = {'fila_ultimo': inicio - i, 'posicion_ultimo': posicion, 'parte_ultimo': parte,
+                  'medias': previo}
+        previo = medias.estado()
+        parte += 1
+    if incremental:
+        _guardar_estado(ruta, {
+            'version': VERSION, 'formato': formato, 'rango': rango, 'primera': primera, 'filas': j - i,
+            'desde_ultimo': int(archivo.fechas[i + ultimo['fila_ultimo']]) if j > i else None,
+            **ultimo,
+        })
+    elif os.path.exists(_ruta_estado(ruta)):
+        os.remove(_ruta_estado(ruta))
+    return j - i, j - desde
+
+
+def vista_previa(origen, start=None, end=None, n=3):
+    # (filas, columnas, primeras n, últimas n) de lo que exportar() escribe,
+    # leyendo solo las barras del principio y del final (las medias de la
+    # cola, con las barras anteriores que necesitan)
+    archivo = columnar.BarFile(origen)
+    i, j = archivo.posiciones(start, end)
+    cabeza = next(bloques(archivo, i, min(j, i + n)), (i, _barras(archivo, i, i)))[1]
+    cola = _barras(archivo, max(i, j - n - MediasMoviles.VENTANA + 1), j)
+    for nombre, ventana in DERIVADAS.items():
+        cola[nombre] = indicators.sma(cola['Close'].to_numpy(), ventana, min_periods=1)
+    cola = cola.iloc[-n:]
+    return j - i, list(cabeza.columns), cabeza, cola
+
+
+def imprimir_vista_previa(origen, start=None, end=None, n=3):
+    # El resumen del CSV de graph_ds.py, sin cargar la serie
+    filas, columnas, cabeza, cola = vista_previa(origen, start, end, n)
+    print(f"• Filas: {filas}")
+    print(f"• Columnas: {len(columnas)}")
+    print(f"• Columnas disponibles:")
+    for k, col in enumerate(columnas, 1):
+        print(f"  {k}. {col}")
+    print(f"\nPrimeras {n} filas:")
+    print(cabeza.to_string())
+    print(f"\nÚltimas {n} filas:")
+    print(cola.to_string())
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Exporta barras y medias del almacén por bloques')
+    parser.add_argument('tickers', nargs='+')
+    parser.add_argument('--inicio', default='2025-01-01')
+    parser.add_argument('--fin', default='2026-01-05')
+    parser.add_argument('--intervalo', default='1d')
+    parser.add_argument('--formato', choices=FORMATOS, default='csv.gz')
+    parser.add_argument('--out', default='exportados', help='directorio de salida')
+    parser.add_argument('--bloque', type=int, default=BLOQUE, help='filas por bloque (memoria máxima)')
+    parser.add_argument('--completa', action='store_true', help='reescribe la salida aunque haya estado')
+    parser.add_argument('--sin-descarga', action='store_true', help='exporta solo lo que ya está guardado')
+    parser.add_argument('--vista', action='store_true', help='muestra primeras y últimas filas')
+    args = parser.parse_args()
+
+    from bar_store import BarStore
+
+    store = BarStore()
+    if not store.provider.cacheable:
+        parser.exit(1, f"La fuente {store.provider.nombre} no usa el almacén local: no hay nada que exportar\n")
+    os.makedirs(args.out, exist_ok=True)
+    errores = 0
+    for ticker in args.tickers:
+        t0 = time.perf_counter()
+        if not args.sin_descarga:
+            store.completar(ticker, args.inicio, args.fin, args.intervalo)
+        origen = store.directorio(ticker, args.intervalo)
+        nombre = os.path.basename(origen)
+        ruta = os.path.join(args.out, f"{nombre}_{args.inicio}_{args.fin}.{args.formato}")
+        try:
+            if args.completa and os.path.exists(_ruta_estado(ruta)):
+                os.remove(_ruta_estado(ruta))
+            filas, escritas = exportar(origen, ruta, args.inicio, args.fin, args.bloque)
+        except (FileNotFoundError, RuntimeError) as e:
+            print(f"✗ {ticker}: {e}", file=sys.stderr)
+            errores += 1
+            continue
+        print(f"✓ {ruta}: {filas:,} filas ({escritas:,} escritas) en {time.perf_counter() - t0:.2f} s")
+        if args.vista:
+            imprimir_vista_previa(origen, args.inicio, args.fin)
+    sys.exit(1 if errores else 0)
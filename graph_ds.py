@@ -1,10 +1,10 @@
-import yfinance as yf
-import pandas as pd
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
+import os
 import numpy as np
 import warnings
-from datetime import datetime
+from bar_store import get_bars
+from render_farm import RenderJob, render_all, mostrar
+import indicators
+from instrumentation import etapa
 warnings.filterwarnings('ignore')
 
 # Configuración de fechas
@@ -13,26 +13,16 @@ fecha_fin = "2026-01-05"
 
 print(f"Obteniendo datos REALES del DXY desde {fecha_inicio} hasta {fecha_fin}...")
 
+# Una sola obtención de datos por ejecución, compartida con la versión de emergencia
+dxy = None
+
 try:
-    # Descargar datos reales
-    dxy = yf.download("DX-Y.NYB",
-                     start=fecha_inicio,
-                     end=fecha_fin,
-                     progress=False)
+    # Datos reales (desde el almacén local; solo se descarga lo que falte)
+    dxy = get_bars("DX-Y.NYB", fecha_inicio, fecha_fin)
 
     print(f"Datos obtenidos: {len(dxy)} registros")
     print(f"Período cubierto: {dxy.index[0].date()} a {dxy.index[-1].date()}")
 
-    # Simplificar columnas MultiIndex
-    if isinstance(dxy.columns, pd.MultiIndex):
-        new_columns = []
-        for col in dxy.columns:
-            if col[0]:  # Si el primer nivel no está vacío
-                new_columns.append(col[0])
-            else:
-                new_columns.append(col[1])
-        dxy.columns = new_columns
-
     print(f"\nColumnas disponibles: {dxy.columns.tolist()}")
     print(f"\nMuestra de datos de volumen (primeros 5 días):")
     print(dxy['Volume'].head())
@@ -41,121 +31,45 @@ try:
     volumen_total = dxy['Volume'].sum()
     print(f"\nVolumen total del período: {volumen_total:,.0f}")
 
-    # Crear figura - SOLO gráfico de precios (sin volumen si es 0)
-    if volumen_total > 0:
-        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(14, 8),
-                                       gridspec_kw={'height_ratios': [3, 1]},
-                                       sharex=True)
-        tiene_volumen = True
-    else:
-        fig, ax1 = plt.subplots(1, 1, figsize=(14, 7))
-        tiene_volumen = False
+    if volumen_total <= 0:
         print("NOTA: No hay datos de volumen disponibles. Mostrando solo gráfico de precios.")
 
-    # Gráfico de precios
-    ax1.plot(dxy.index, dxy['Close'],
-            color='#1f77b4',
-            linewidth=2.5,
-            label='DXY (Cierre)')
-
-    # Bandas de precio (High-Low)
-    ax1.fill_between(dxy.index,
-                    dxy['Low'],
-                    dxy['High'],
-                    alpha=0.15,
-                    color='lightblue',
-                    label='Rango diario')
-
     # Medias móviles
-    dxy['MA_20'] = dxy['Close'].rolling(window=20, min_periods=1).mean()
-    dxy['MA_50'] = dxy['Close'].rolling(window=50, min_periods=1).mean()
-
-    ax1.plot(dxy.index, dxy['MA_20'],
-            color='red',
-            linestyle='--',
-            linewidth=1.5,
-            label='MA 20 días',
-            alpha=0.7)
-
-    ax1.plot(dxy.index, dxy['MA_50'],
-            color='orange',
-            linestyle='--',
-            linewidth=1.5,
-            label='MA 50 días',
-            alpha=0.7)
-
-    # Configurar gráfico de precios
-    ax1.set_title(f'Índice Dólar (DXY) - Enero 2025 a Enero 2026',
-                 fontsize=16,
-                 fontweight='bold',
-                 pad=20)
-    ax1.set_ylabel('Valor DXY', fontsize=12)
-    ax1.grid(True, alpha=0.3, linestyle='--')
-    ax1.legend(loc='best')
-
-    # Formatear fechas
-    ax1.xaxis.set_major_locator(mdates.MonthLocator())
-    ax1.xaxis.set_major_formatter(mdates.DateFormatter('%b %Y'))
-    plt.setp(ax1.xaxis.get_majorticklabels(), rotation=45, ha='right')
-
-    # Gráfico de volumen (solo si hay datos)
-    if tiene_volumen:
-        ax2.bar(dxy.index, dxy['Volume'],
-               color='lightgray',
-               alpha=0.7,
-               width=0.8)
-        ax2.set_ylabel('Volumen', fontsize=12)
-        ax2.grid(True, alpha=0.3, axis='y')
-        ax2.xaxis.set_major_locator(mdates.MonthLocator())
-        ax2.xaxis.set_major_formatter(mdates.DateFormatter('%b %Y'))
-        plt.setp(ax2.xaxis.get_majorticklabels(), rotation=45, ha='right')
-    else:
-        # En lugar de volumen vacío, mostramos análisis técnico
-        ax1.text(0.02, 0.98, "NOTA: Sin datos de volumen\nMostrando solo análisis de precios",
-                transform=ax1.transAxes, fontsize=10,
-                bbox=dict(boxstyle='round', facecolor='yellow', alpha=0.3),
-                verticalalignment='top')
-
-    # Estadísticas detalladas
-    cambio_total = ((dxy['Close'].iloc[-1] / dxy['Close'].iloc[0]) - 1) * 100
-    volatilidad = dxy['Close'].pct_change().std() * 100
-
-    # Encontrar máximos y mínimos
-    max_idx = dxy['High'].idxmax()
-    min_idx = dxy['Low'].idxmin()
-
-    stats_text = f"""Estadísticas DXY ({dxy.index[0].date()} a {dxy.index[-1].date()}):
-• Días analizados: {len(dxy)}
-• Primer cierre: {dxy['Close'].iloc[0]:.2f}
-• Último cierre: {dxy['Close'].iloc[-1]:.2f}
-• Cambio total: {cambio_total:+.2f}%
-• Máximo: {dxy['High'].max():.2f} ({max_idx.date()})
-• Mínimo: {dxy['Low'].min():.2f} ({min_idx.date()})
-• Volatilidad diaria: {volatilidad:.2f}%
-• Media 20 días: {dxy['MA_20'].iloc[-1]:.2f}
-• Media 50 días: {dxy['MA_50'].iloc[-1]:.2f}"""
-
-    ax1.text(0.02, 0.02, stats_text, transform=ax1.transAxes, fontsize=9,
-             bbox=dict(boxstyle='round', facecolor='white', alpha=0.9, edgecolor='gray'),
-             verticalalignment='bottom', fontfamily='monospace')
-
-    plt.tight_layout()
-
-    # GUARDAR IMAGEN
+    with etapa('indicadores'):
+        cierres = dxy['Close'].to_numpy()
+        dxy['MA_20'] = indicators.sma(cierres, 20, min_periods=1)
+        dxy['MA_50'] = indicators.sma(cierres, 50, min_periods=1)
+
+    # Panel opcional con el aporte de cada divisa del índice (DXY_PANEL_COMPONENTES=1)
+    opciones_grafico = {}
+    if os.environ.get('DXY_PANEL_COMPONENTES', '0') not in ('', '0', 'false', 'no'):
+        try:
+            from dxy_components import panel_diario
+            with etapa('componentes'):
+                opciones_grafico['componentes'] = panel_diario(fecha_inicio, fecha_fin)
+        except Exception as e:
+            print(f"NOTA: No se pudo reconstruir el DXY por divisas ({e}). Gráfico sin panel de componentes.")
+
+    # GUARDAR IMAGEN Y PDF (vectorial, mejor calidad) en paralelo
     nombre_imagen = f"dxy_{fecha_inicio}_{fecha_fin}.png"
-    plt.savefig(nombre_imagen, dpi=300, bbox_inches='tight')
-    print(f"\n✓ Gráfico guardado como: {nombre_imagen}")
-
-    # También guardar como PDF (vectorial, mejor calidad)
     nombre_pdf = f"dxy_{fecha_inicio}_{fecha_fin}.pdf"
-    plt.savefig(nombre_pdf, bbox_inches='tight')
+    args_grafico = (dxy, fecha_inicio, fecha_fin)
+    hechos, errores = render_all([
+        RenderJob('grafico_tecnico', args_grafico, nombre_imagen, dict(dpi=300, bbox_inches='tight'),
+                  opciones_grafico),
+        RenderJob('grafico_tecnico', args_grafico, nombre_pdf, dict(bbox_inches='tight'), opciones_grafico),
+    ])
+    if errores:
+        raise next(iter(errores.values()))
+    print(f"\n✓ Gráfico guardado como: {nombre_imagen}")
     print(f"✓ Gráfico guardado como PDF: {nombre_pdf}")
 
-    plt.show()
+    mostrar('grafico_tecnico', *args_grafico, **opciones_grafico)
 
     # GUARDAR DATOS CSV Y MOSTRAR CÓMO VISUALIZARLOS
     nombre_csv = f"dxy_datos_{fecha_inicio}_{fecha_fin}.csv"
-    dxy.to_csv(nombre_csv)
+    with etapa('csv'):
+        dxy.to_csv(nombre_csv)
     print(f"\n✓ Datos guardados en CSV: {nombre_csv}")
 
     # Mostrar cómo visualizar el CSV
@@ -202,7 +116,9 @@ try:
     print("="*70)
 
     # Señales de trading simples
-    dxy['Signal'] = np.where(dxy['MA_20'] > dxy['MA_50'], 'ALCISTA', 'BAJISTA')
+    with etapa('senales'):
+        dxy['Signal'] = np.where(dxy['MA_20'] > dxy['MA_50'], 'ALCISTA', 'BAJISTA')
+        rsi = indicators.rsi_simple(cierres, 14)
 
     # Contar días de cada señal
     dias_alcistas = (dxy['Signal'] == 'ALCISTA').sum()
@@ -212,17 +128,11 @@ try:
     print(f"- Días con tendencia alcista (MA20 > MA50): {dias_alcistas} días ({dias_alcistas/len(dxy)*100:.1f}%)")
     print(f"- Días con tendencia bajista (MA20 < MA50): {dias_bajistas} días ({dias_bajistas/len(dxy)*100:.1f}%)")
 
-    # Calcular RSI simplificado
-    delta = dxy['Close'].diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-    rs = gain / loss
-    rsi = 100 - (100 / (1 + rs))
-
-    print(f"\nAnálisis RSI (último valor): {rsi.iloc[-1]:.1f}")
-    if rsi.iloc[-1] > 70:
+    # RSI simplificado (calculado junto a las señales)
+    print(f"\nAnálisis RSI (último valor): {rsi[-1]:.1f}")
+    if rsi[-1] > 70:
         print("  → SOBRECOMPRADO (posible corrección)")
-    elif rsi.iloc[-1] < 30:
+    elif rsi[-1] < 30:
         print("  → SOBREVENDIDO (posible rebote)")
     else:
         print("  → ZONA NEUTRA")
@@ -249,19 +159,19 @@ except Exception as e:
     print("="*70)
 
     try:
-        dxy_simple = yf.download("DX-Y.NYB", start=fecha_inicio, end=fecha_fin, progress=False)
-        close_prices = dxy_simple[('Close', 'DX-Y.NYB')]
-
-        plt.figure(figsize=(14, 7))
-        plt.plot(close_prices.index, close_prices.values, 'b-', linewidth=2)
-        plt.title(f'DXY - {fecha_inicio} a {fecha_fin}')
-        plt.ylabel('Valor DXY')
-        plt.grid(True, alpha=0.3)
-        plt.xticks(rotation=45)
+        # Se reutilizan los datos ya obtenidos: no se vuelve a descargar
+        if dxy is None:
+            raise RuntimeError("no se pudieron obtener datos del DXY")
+        close_prices = dxy['Close']
 
         # Guardar imagen de emergencia
-        plt.savefig(f'dxy_emergencia_{fecha_inicio}_{fecha_fin}.png', dpi=300, bbox_inches='tight')
-        plt.show()
+        nombre_emergencia = f'dxy_emergencia_{fecha_inicio}_{fecha_fin}.png'
+        args_emergencia = (close_prices, fecha_inicio, fecha_fin)
+        hechos, errores = render_all([RenderJob('grafico_emergencia', args_emergencia, nombre_emergencia,
+                                                dict(dpi=300, bbox_inches='tight'))])
+        if errores:
+            raise next(iter(errores.values()))
+        mostrar('grafico_emergencia', *args_emergencia)
 
         print(f"✓ Gráfico de emergencia guardado")
 
@@ -0,0 +1,182 @@
+# Indicadores técnicos vectorizados con NumPy
+# Trabajan sobre arrays float64 contiguos (columnas High/Low/Close) sin crear
+# Series intermedias. Cada función reproduce la versión pandas equivalente:
+#   sma            -> Series.rolling(window, min_periods).mean()
+#   ema            -> Series.ewm(span=..., adjust=False).mean()
+#   rsi_simple     -> RSI de graph_ds.py (medias simples de ganancias/pérdidas)
+#   rsi_wilder     -> ewm(alpha=1/periodo, adjust=False, min_periods=periodo)
+#   atr            -> True Range suavizado al estilo Wilder
+#   bollinger      -> media ± k * rolling(window).std()
+#   volatilidad    -> pct_change().rolling(window).std() * 100
+# benchmarks/bench_indicators.py comprueba la equivalencia y mide la mejora.
+import numpy as np
+
+# Tamaño de bloque máximo para el filtro recursivo de las medias exponenciales
+BLOQUE_EWM = 4096
+# Barras por bloque en las desviaciones móviles (acota error y memoria temporal)
+BLOQUE_STD = 4096
+
+
+def _array(valores):
+    return np.ascontiguousarray(valores, dtype=np.float64)
+
+
+def _sumas_moviles(x, window):
+    # Suma de las últimas `window` posiciones (o menos al principio) vía cumsum.
+    # Se resta x[0] antes de acumular para reducir el error de redondeo.
+    base = x[0] if len(x) else 0.0
+    acumulado = np.cumsum(x - base)
+    suma = acumulado.copy()
+    suma[window:] -= acumulado[:-window]
+    cuenta = np.minimum(np.arange(1, len(x) + 1), window)
+    return suma + base * cuenta, cuenta
+
+
+def sma(valores, window, min_periods=None):
+    x = _array(valores)
+    min_periods = window if min_periods is None else min_periods
+    suma, cuenta = _sumas_moviles(x, window)
+    media = suma / cuenta
+    media[cuenta < min_periods] = np.nan
+    return media
+
+
+def rolling_std(valores, window, ddof=1):
+    # Sumas y sumas de cuadrados acumuladas por bloques. Cada bloque se centra en
+    # su primer valor, así los acumulados se mantienen pequeños y la resta de
+    # sumas de cuadrados no pierde precisión aunque la serie sea muy larga.
+    x = _array(valores)
+    n = len(x)
+    std = np.full(n, np.nan)
+    for inicio in range(window - 1, n, BLOQUE_STD):
+        fin = min(n, inicio + BLOQUE_STD)
+        trozo = x[inicio - window + 1:fin] - x[inicio - window + 1]
+        s1 = np.concatenate(([0.0], np.cumsum(trozo)))
+        s2 = np.concatenate(([0.0], np.cumsum(trozo * trozo)))
+        suma = s1[window:] - s1[:-window]
+        suma_cuadrados = s2[window:] - s2[:-window]
+        varianza = (suma_cuadrados - suma * suma / window) / max(window - ddof, 1)
+        std[inicio:fin] = np.sqrt(np.maximum(varianza, 0.0))
+    return std
+
+
+def _ewm(x, alpha, min_periods=0):
+    # y[t] = alpha * x[t] + (1 - alpha) * y[t-1], y[0] = x[0]  (adjust=False)
+    # Se resuelve por bloques con la forma cerrada de la recurrencia: dentro de
+    # cada bloque las potencias de (1 - alpha) se mantienen en rango seguro.
+    n = len(x)
+    y = np.empty(n)
+    if n == 0:
+        return y
+    decaimiento = 1.0 - alpha
+    if decaimiento <= 0.0:
+        y[:] = x
+    else:
+        bloque = int(min(BLOQUE_EWM, max(1, 300.0 / -np.log(decaimiento))))
+        k = np.arange(bloque)
+        potencias = decaimiento ** k
+        inversas = 1.0 / potencias
+        anterior = x[0]
+        for inicio in range(0, n, bloque):
+            trozo = x[inicio:inicio + bloque]
+            m = len(trozo)
+            acumulado = np.cumsum(alpha * trozo * inversas[:m])
+            y[inicio:inicio + m] = potencias[:m] * (acumulado + decaimiento * anterior)
+            anterior = y[inicio + m - 1]
+        # y[0] = x[0] exactamente, como pandas
+        y[0] = x[0]
+    if min_periods > 1:
+        y[:min_periods - 1] = np.nan
+    return y
+
+
+def ema(valores, span, min_periods=0):
+    return _ewm(_array(valores), 2.0 / (span + 1.0), min_periods)
+
+
+def _ganancias_perdidas(x):
+    # Como delta.where(delta > 0, 0): la primera barra cuenta como 0
+    delta = np.empty_like(x)
+    if len(x):
+        delta[0] = 0.0
+        np.subtract(x[1:], x[:-1], out=delta[1:])
+    return np.maximum(delta, 0.0), np.maximum(-delta, 0.0)
+
+
+def _rsi_desde_medias(ganancia, perdida):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return 100.0 - 100.0 / (1.0 + ganancia / perdida)
+
+
+def rsi_simple(close, periodo=14):
+    ganancias, perdidas = _ganancias_perdidas(_array(close))
+    return _rsi_desde_medias(sma(ganancias, periodo), sma(perdidas, periodo))
+
+
+def rsi_wilder(close, periodo=14):
+    ganancias, perdidas = _ganancias_perdidas(_array(close))
+    alpha = 1.0 / periodo
+    return _rsi_desde_medias(_ewm(ganancias, alpha, periodo), _ewm(perdidas, alpha, periodo))
+
+
+def true_range(high, low, close):
+    high, low, close = _array(high), _array(low), _array(close)
+    rango = high - low
+    if len(close) > 1:
+        cierre_previo = close[:-1]
+        rango[1:] = np.maximum(rango[1:], np.abs(high[1:] - cierre_previo))
+        rango[1:] = np.maximum(rango[1:], np.abs(low[1:] - cierre_previo))
+    return rango
+
+
+def atr(high, low, close, periodo=14):
+    return _ewm(true_range(high, low, close), 1.0 / periodo, periodo)
+
+
+def bollinger(close, window=20, k=2.0):
+    media = sma(close, window)
+    desviacion = rolling_std(close, window)
+    return media, media + k * desviacion, media - k * desviacion
+
+
+def rendimientos(close):
+    # pct_change(): el primer valor es NaN
+    x = _array(close)
+    r = np.empty_like(x)
+    if len(x):
+        r[0] = np.nan
+        np.divide(x[1:], x[:-1], out=r[1:])
+        r[1:] -= 1.0
+    return r
+
+
+def volatilidad(close, window=20):
+    r = rendimientos(close)
+    vol = np.full_like(r, np.nan)
+    if len(r) > 1:
+        vol[1:] = rolling_std(r[1:], window) * 100
+    return vol
+
+
+def compute_all(high, low, close, ventanas=(20, 50), rsi_periodo=14,
+                bollinger_window=20, bollinger_k=2.0, atr_periodo=14, vol_window=20):
+    # Todos los indicadores de una vez sobre los mismos arrays contiguos
+    high, low, close = _array(high), _array(low), _array(close)
+    resultado = {}
+    for ventana in ventanas:
+        resultado[f'MA_{ventana}'] = sma(close, ventana, min_periods=1)
+        resultado[f'EMA_{ventana}'] = ema(close, ventana)
+
+    ganancias, perdidas = _ganancias_perdidas(close)
+    resultado['RSI'] = _rsi_desde_medias(sma(ganancias, rsi_periodo), sma(perdidas, rsi_periodo))
+    alpha = 1.0 / rsi_periodo
+    resultado['RSI_Wilder'] = _rsi_desde_medias(_ewm(ganancias, alpha, rsi_periodo),
+                                                _ewm(perdidas, alpha, rsi_periodo))
+
+    resultado['ATR'] = atr(high, low, close, atr_periodo)
+    media, superior, inferior = bollinger(close, bollinger_window, bollinger_k)
+    resultado['BB_Media'] = media
+    resultado['BB_Superior'] = superior
+    resultado['BB_Inferior'] = inferior
+    resultado['Volatilidad'] = volatilidad(close, vol_window)
+    return resultado
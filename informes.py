@@ -0,0 +1,328 @@
+# Informes por ventanas: las estadísticas de dxy_cli.py (cambio total,
+# máximo/mínimo con su fecha, volatilidad diaria, MA 20/50, RSI 14 y señal)
+# para cada mes, trimestre y año del histórico y para cada ventana móvil de N
+# barras, todo en una sola tabla.
+# Nada se recalcula ventana a ventana: se preparan una vez
+#   - sumas acumuladas de cierres, ganancias y pérdidas (medias y RSI del
+#     final de cada ventana),
+#   - sumas acumuladas de rendimientos y de sus cuadrados, centrados en la
+#     media global (varianza de cada ventana sin perder precisión),
+#   - tablas dispersas (sparse tables) con la posición del máximo de High y
+#     del mínimo de Low en cada tramo de 2^k barras,
+# y cada ventana se resuelve con unos pocos accesos a esos arrays: O(1) por
+# ventana, todas a la vez con numpy. Preparar cuesta O(n log n) (las tablas
+# dispersas, con log2 de la ventana más larga niveles).
+# Los valores coinciden con dxy_cli.estadisticas aplicada a cada ventana por
+# separado (sin redondear).
+#
+#   python3 informes.py --csv dxy_datos_2025-01-01_2026-01-05.csv --salida informe.csv
+#   python3 informes.py --ticker DX-Y.NYB --inicio 2000-01-01 --fin 2026-01-05 \
+#       --periodos mes,trimestre,ano,movil --ventana 252 --salida informe.parquet --graficos informes/
+import argparse
+import os
+import time
+
+import numpy as np
+
+import indicators
+import piramide
+
+PERIODOS = ('mes', 'trimestre', 'ano', 'movil')
+CAMPOS = ['periodo', 'etiqueta', 'desde', 'hasta', 'dias', 'primer_cierre', 'ultimo_cierre',
+          'cambio_pct', 'maximo', 'fecha_maximo', 'minimo', 'fecha_minimo',
+          'volatilidad_diaria_pct', 'ma_20', 'ma_50', 'rsi_14', 'senal']
+# Ventanas cortas, medias y RSI de dxy_cli.estadisticas
+MA_CORTA, MA_LARGA, RSI_PERIODO = 20, 50, 14
+
+
+class TablaDispersa:
+    # Posición del máximo (o mínimo) de cualquier tramo [i, j) en O(1).
+    # Nivel k: posición del extremo de [p, p + 2^k) para cada p. Un tramo se
+    # cubre con dos bloques de 2^k que se solapan; en empate gana el de la
+    # izquierda, así que la posición es la primera, como np.nanargmax.
+
+    def __init__(self, valores, maximo=True, longitud=None):
+        x = np.asarray(valores, dtype=np.float64)
+        # Los NaN no ganan nunca (como nanargmax/nanargmin)
+        self.valores = np.where(np.isnan(x), -np.inf if maximo else np.inf, x)
+        self.maximo = maximo
+        n = len(x)
+        longitud = n if longitud is None else min(n, longitud)
+        tipo = np.int32 if n < 2**31 else np.int64
+        self.niveles = [np.arange(n, dtype=tipo)]
+        extremos = self.valores  # valor del extremo de cada bloque del nivel anterior
+        k = 1
+        while (1 << k) <= longitud:
+            anterior = self.niveles[-1]
+            mitad, fin = 1 << (k - 1), n - (1 << k) + 1
+            a, b = extremos[:fin], extremos[mitad:mitad + fin]
+            izquierda = a >= b if maximo else a <= b
+            self.niveles.append(np.where(izquierda, anterior[:fin], anterior[mitad:mitad + fin]))
+            extremos = np.where(izquierda, a, b)
+            k += 1
+
+    def _gana(self, izquierda, derecha):
+        a, b = self.valores[izquierda], self.valores[derecha]
+        return a >= b if self.maximo else a <= b
+
+    def posicion(self, i, j):
+        # Arrays de inicios y finales (j > i); devuelve la posición del extremo de cada tramo
+        i, j = np.asarray(i), np.asarray(j)
+        k = np.floor(np.log2(j - i)).astype(np.int64)
+        resultado = np.empty(len(i), dtype=np.int64)
+        for nivel in np.unique(k):
+            filas = k == nivel
+            tabla = self.niveles[nivel]
+            izquierda = tabla[i[filas]]
+            derecha = tabla[j[filas] - (1 << int(nivel))]
+            resultado[filas] = np.where(self._gana(izquierda, derecha), izquierda, derecha)
+        return resultado
+
+
+def _acumulado(x):
+    return np.concatenate(([0.0], np.cumsum(x)))
+
+
+def ventanas_calendario(fechas, periodo):
+    # (inicios, finales, etiquetas) de los meses, trimestres o años con barras
+    fechas = np.asarray(fechas, dtype=np.int64)
+    if periodo == 'ano':
+        clave = fechas.astype('datetime64[ns]').astype('datetime64[Y]').astype(np.int64)
+    else:
+        clave = piramide.etiquetas(fechas, '1mo' if periodo == 'mes' else '3mo')
+    inicios = np.flatnonzero(np.r_[True, clave[1:] != clave[:-1]]) if len(fechas) else np.empty(0, np.int64)
+    finales = np.r_[inicios[1:], len(fechas)]
+
+    primeras = fechas[inicios].astype('datetime64[ns]')
+    if periodo == 'mes':
+        etiquetas = np.datetime_as_string(primeras, unit='M')
+    elif periodo == 'trimestre':
+        meses = primeras.astype('datetime64[M]').astype(np.int64)
+        etiquetas = [f"{1970 + m // 12}T{m % 12 // 3 + 1}" for m in meses]
+    else:
+        etiquetas = np.datetime_as_string(primeras, unit='Y')
+    return inicios, finales, etiquetas
+
+
+def ventanas_moviles(fechas, ventana):
+    # Una ventana de `ventana` barras terminada en cada barra desde la primera completa
+    finales = np.arange(ventana, len(fechas) + 1)
+    inicios = finales - ventana
+    etiquetas = np.datetime_as_string(np.asarray(fechas)[finales - 1].astype('datetime64[ns]'), unit='auto')
+    return inicios, finales, etiquetas
+
+
+class Prefijos:
+    # Todo lo que comparten las ventanas de una misma serie
+
+    def __init__(self, columnas, longitud=None):
+        self.fechas = np.asarray(columnas['Date'], dtype=np.int64)
+        self.close = np.asarray(columnas['Close'], dtype=np.float64)
+        self.n = len(self.close)
+
+        self.suma_close = _acumulado(self.close - (self.close[0] if self.n else 0.0))
+        # Ganancias y pérdidas de cada barra respecto a la anterior (RSI)
+        delta = np.r_[0.0, np.diff(self.close)]
+        self.ganancias, self.perdidas = np.maximum(delta, 0.0), np.maximum(-delta, 0.0)
+        self.suma_ganancias, self.suma_perdidas = _acumulado(self.ganancias), _acumulado(self.perdidas)
+
+        # Rendimiento de la barra p (respecto a p - 1); en una ventana [i, j)
+        # cuentan los de i + 1 .. j - 1, como pct_change() sobre la ventana
+        r = indicators.rendimientos(self.close)
+        validos = np.isfinite(r)
+        self.media_r = float(r[validos].mean()) if validos.any() else 0.0
+        centrados = np.where(validos, r - self.media_r, 0.0)
+        self.suma_r = _acumulado(centrados)
+        self.suma_r2 = _acumulado(centrados * centrados)
+        self.cuenta_r = _acumulado(validos.astype(np.float64))
+
+        self.maximos = TablaDispersa(columnas['High'], True, longitud)
+        self.minimos = TablaDispersa(columnas['Low'], False, longitud)
+        self.high = self.maximos.valores
+        self.low = self.minimos.valores
+
+    def _media_final(self, i, j, ventana):
+        # sma(close de la ventana, ventana, min_periods=1)[-1]
+        a = np.maximum(i, j - ventana)
+        return (self.suma_close[j] - self.suma_close[a]) / (j - a) + (self.close[0] if self.n else 0.0)
+
+    def _rsi_final(self, i, j):
+        # rsi_simple(close de la ventana)[-1]: en la ventana la primera barra
+        # no tiene ganancia ni pérdida
+        a = j - RSI_PERIODO
+        primera = a == i
+        g = self.suma_ganancias[j] - self.suma_ganancias[np.maximum(a, 0)] - np.where(primera, self.ganancias[i], 0.0)
+        p = self.suma_perdidas[j] - self.suma_perdidas[np.maximum(a, 0)] - np.where(primera, self.perdidas[i], 0.0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rsi = 100.0 - 100.0 / (1.0 + g / p)
+        return np.where(a >= i, rsi, np.nan)
+
+    def _volatilidad(self, i, j):
+        # nanstd(pct_change de la ventana, ddof=1) * 100
+        m = self.cuenta_r[j] - self.cuenta_r[i + 1]
+        s1 = self.suma_r[j] - self.suma_r[i + 1]
+        s2 = self.suma_r2[j] - self.suma_r2[i + 1]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            varianza = (s2 - s1 * s1 / m) / (m - 1)
+        return np.where(m > 1, np.sqrt(np.maximum(varianza, 0.0)) * 100, np.nan)
+
+    def estadisticas(self, inicios, finales):
+        # {campo: array} de las ventanas [inicios, finales)
+        i, j = np.asarray(inicios, dtype=np.int64), np.asarray(finales, dtype=np.int64)
+        i_max = self.maximos.posicion(i, j)
+        i_min = self.minimos.posicion(i, j)
+        ma_corta = self._media_final(i, j, MA_CORTA)
+        ma_larga = self._media_final(i, j, MA_LARGA)
+        return {
+            'desde': self.fechas[i],
+            'hasta': self.fechas[j - 1],
+            'dias': j - i,
+            'primer_cierre': self.close[i],
+            'ultimo_cierre': self.close[j - 1],
+            'cambio_pct': (self.close[j - 1] / self.close[i] - 1) * 100,
+            'maximo': self.high[i_max],
+            'fecha_maximo': self.fechas[i_max],
+            'minimo': self.low[i_min],
+            'fecha_minimo': self.fechas[i_min],
+            'volatilidad_diaria_pct': self._volatilidad(i, j),
+            'ma_20': ma_corta,
+            'ma_50': ma_larga,
+            'rsi_14': self._rsi_final(i, j),
+            'senal': np.where(ma_corta > ma_larga, 'ALCISTA', 'BAJISTA'),
+        }
+
+
+def ventanas(fechas, periodos=PERIODOS, ventana=252):
+    # [(periodo, inicios, finales, etiquetas)] de los periodos pedidos
+    resultado = []
+    for periodo in periodos:
+        if periodo not in PERIODOS:
+            raise ValueError(f"Periodo desconocido: {periodo} (válidos: {', '.join(PERIODOS)})")
+        if periodo == 'movil':
+            resultado.append((f'movil_{ventana}',) + ventanas_moviles(fechas, ventana))
+        else:
+            resultado.append((periodo,) + ventanas_calendario(fechas, periodo))
+    return resultado
+
+
+def informe(columnas, periodos=PERIODOS, ventana=252):
+    # Tabla (DataFrame) con una fila por ventana, ordenada por periodo y fecha
+    import pandas as pd
+
+    fechas = np.asarray(columnas['Date'], dtype=np.int64)
+    if len(fechas) == 0:
+        raise ValueError("No hay barras en el rango pedido")
+    grupos = [g for g in ventanas(fechas, periodos, ventana) if len(g[1])]
+    longitud = max((int((g[2] - g[1]).max()) for g in grupos), default=1)
+    prefijos = Prefijos(columnas, longitud)
+
+    tablas = []
+    for periodo, inicios, finales, etiquetas in grupos:
+        datos = prefijos.estadisticas(inicios, finales)
+        for campo in ('desde', 'hasta', 'fecha_maximo', 'fecha_minimo'):
+            datos[campo] = datos[campo].astype('datetime64[ns]')
+        tablas.append(pd.DataFrame({'periodo': periodo, 'etiqueta': etiquetas, **datos}))
+    if not tablas:
+        return pd.DataFrame(columns=CAMPOS)
+    return pd.concat(tablas, ignore_index=True)[CAMPOS]
+
+
+def guardar(tabla, ruta):
+    # CSV o Parquet según la extensión (Parquet necesita pyarrow o fastparquet)
+    directorio = os.path.dirname(ruta)
+    if directorio:
+        os.makedirs(directorio, exist_ok=True)
+    if ruta.endswith('.parquet'):
+        try:
+            tabla.to_parquet(ruta, index=False)
+        except ImportError as e:
+            raise RuntimeError(f"Parquet necesita pyarrow o fastparquet ({e}); usa una salida .csv") from e
+    else:
+        tabla.to_csv(ruta, index=False)
+
+
+def trabajos_graficos(barras, tabla, directorio, prefijo='dxy', dpi=150, ticker='DX-Y.NYB'):
+    # Un gráfico técnico (charts.grafico_tecnico) por ventana de calendario
+    # de la tabla, rotulado con su ventana; las ventanas móviles, una por
+    # barra, no se dibujan
+    # render_farm antes que charts (elige Agg en modo sin pantalla)
+    from render_farm import RenderJob
+    from charts import etiquetas
+
+    os.makedirs(directorio, exist_ok=True)
+    trabajos = []
+    for fila in tabla[~tabla['periodo'].str.startswith('movil')].itertuples():
+        desde = str(fila.desde)
+        hasta = str(np.datetime64(fila.hasta, 'D') + np.timedelta64(1, 'D'))
+        tramo = barras.loc[desde:str(fila.hasta)].copy()
+        cierres = tramo['Close'].to_numpy()
+        tramo['MA_20'] = indicators.sma(cierres, MA_CORTA, min_periods=1)
+        tramo['MA_50'] = indicators.sma(cierres, MA_LARGA, min_periods=1)
+        ruta = os.path.join(directorio, f"{prefijo}_{fila.periodo}_{fila.etiqueta}.png")
+        rotulos = etiquetas(ticker, fila.desde, fila.hasta)['grafico_tecnico']
+        if fila.periodo == 'trimestre':
+            rotulos['titulo'] += f' ({fila.etiqueta})'
+        trabajos.append(RenderJob('grafico_tecnico', (tramo, desde, hasta), ruta, dict(dpi=dpi), rotulos))
+    return trabajos
+
+
+def _columnas(barras):
+    return {'Date': barras.index.as_unit('ns').asi8, **{c: barras[c].to_numpy() for c in barras.columns}}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Estadísticas por mes, trimestre, año y ventana móvil')
+    parser.add_argument('--csv', help='CSV con columnas Date, High, Low y Close (en lugar del almacén)')
+    parser.add_argument('--ticker', default='DX-Y.NYB')
+    parser.add_argument('--inicio', default='2025-01-01')
+    parser.add_argument('--fin', default='2026-01-05')
+    parser.add_argument('--intervalo', default='1d')
+    parser.add_argument('--periodos', default=','.join(PERIODOS),
+                        help=f"lista separada por comas: {','.join(PERIODOS)}")
+    parser.add_argument('--ventana', type=int, default=252, help='barras de la ventana móvil')
+    parser.add_argument('--salida', default='informe_ventanas.csv', help='.csv o .parquet')
+    parser.add_argument('--graficos', metavar='DIR', help='un gráfico por mes/trimestre/año en DIR')
+    parser.add_argument('--dpi', type=float, default=150)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    import pandas as pd
+
+    if args.csv:
+        barras = pd.read_csv(args.csv, index_col=0, parse_dates=True)
+        columnas = _columnas(barras)
+    else:
+        from bar_store import BarStore
+
+        store = BarStore()
+        store.completar(args.ticker, args.inicio, args.fin, args.intervalo)
+        columnas = store.columnas_cubiertas(args.ticker, args.inicio, args.fin, args.intervalo)
+        barras = None
+        if columnas is None:
+            barras = store.get(args.ticker, args.inicio, args.fin, args.intervalo)
+            columnas = _columnas(barras)
+
+    t0 = time.perf_counter()
+    tabla = informe(columnas, [p.strip() for p in args.periodos.split(',') if p.strip()], args.ventana)
+    segundos = time.perf_counter() - t0
+    try:
+        guardar(tabla, args.salida)
+    except RuntimeError as e:
+        parser.exit(1, f"✗ {args.salida}: {e}\n")
+    print(f"{len(tabla):,} ventanas sobre {len(columnas['Date']):,} barras en {segundos:.2f} s")
+    print(f"✓ {args.salida}")
+    print(tabla.groupby('periodo', sort=False).size().to_string())
+
+    if args.graficos:
+        os.environ.setdefault('DXY_HEADLESS', '1')
+        from render_farm import render_all
+
+        if barras is None:
+            barras = store.get(args.ticker, args.inicio, args.fin, args.intervalo)
+        hechos, errores = render_all(trabajos_graficos(barras, tabla, args.graficos, dpi=args.dpi,
+                                                       ticker=args.ticker),
+                                     workers=args.workers)
+        for ruta in hechos:
+            print(f"✓ {ruta}")
+        for ruta, error in errores.items():
+            print(f"✗ {ruta}: {error}")
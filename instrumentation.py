@@ -0,0 +1,131 @@
+# Instrumentación por etapas del pipeline
+# Cada etapa (descarga, indicadores, construcción de la figura, tight_layout,
+# savefig...) registra tiempo real, tiempo de CPU y pico de memoria residente
+# del proceso. Se activa con variables de entorno:
+#   DXY_TRACE=traza.json    escribe la traza al terminar, en formato Chrome
+#                           trace (chrome://tracing o https://ui.perfetto.dev)
+#   DXY_TRACE_RESUMEN=1     imprime en stderr un resumen de una línea
+# Desactivada, etapa() devuelve siempre el mismo contexto vacío: el coste es
+# una llamada a función por etapa.
+#
+#   with etapa('descarga', ticker='DX-Y.NYB'):
+#       ...
+import atexit
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+RUTA_TRAZA = os.environ.get('DXY_TRACE') or None
+RESUMEN = os.environ.get('DXY_TRACE_RESUMEN', '0') not in ('', '0', 'false', 'no')
+ACTIVA = bool(RUTA_TRAZA or RESUMEN)
+
+_NULO = contextlib.nullcontext()
+_eventos = []
+_lock = threading.Lock()
+# Origen común de los tiempos (los workers de render_farm heredan el del padre con fork)
+_T0 = time.perf_counter()
+
+
+def rss_max_mb():
+    # Pico de memoria residente del proceso (ru_maxrss: KB en Linux, bytes en macOS)
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico / (1024 * 1024) if sys.platform == 'darwin' else pico / 1024
+
+
+class _Etapa:
+
+    def __init__(self, nombre, args):
+        self.nombre = nombre
+        self.args = args
+
+    def __enter__(self):
+        self.rss_inicio = rss_max_mb()
+        self.cpu = time.process_time()
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        fin = time.perf_counter()
+        cpu = time.process_time() - self.cpu
+        rss = rss_max_mb()
+        evento = {
+            'name': self.nombre, 'ph': 'X', 'pid': os.getpid(), 'tid': threading.get_ident(),
+            'ts': (self.inicio - _T0) * 1e6, 'dur': (fin - self.inicio) * 1e6,
+            'args': dict(self.args, cpu_ms=round(cpu * 1000, 3),
+                         rss_max_mb=None if rss is None else round(rss, 1),
+                         rss_aumento_mb=None if rss is None else round(rss - self.rss_inicio, 1)),
+        }
+        with _lock:
+            _eventos.append(evento)
+        return False
+
+
+def etapa(nombre, **args):
+    # Contexto que mide una etapa; sin coste apreciable si la traza está desactivada
+    if not ACTIVA:
+        return _NULO
+    return _Etapa(nombre, args)
+
+
+def extraer_eventos():
+    # Devuelve y vacía los eventos de este proceso (los workers los envían al padre)
+    with _lock:
+        eventos = list(_eventos)
+        _eventos.clear()
+    return eventos
+
+
+def incorporar(eventos):
+    with _lock:
+        _eventos.extend(eventos)
+
+
+def eventos():
+    with _lock:
+        return list(_eventos)
+
+
+def resumen():
+    # 'descarga 0.12s | indicadores 0.01s | ... | pico 180 MB' (tiempo real por
+    # nombre de etapa, sumando repeticiones y procesos)
+    totales = {}
+    for evento in eventos():
+        totales[evento['name']] = totales.get(evento['name'], 0.0) + evento['dur'] / 1e6
+    partes = [f'{nombre} {segundos:.2f}s' for nombre, segundos in totales.items()]
+    pico = rss_max_mb()
+    if pico is not None:
+        partes.append(f'pico {pico:.0f} MB')
+    return ' | '.join(partes)
+
+
+def escribir_traza(ruta):
+    traza = {'traceEvents': eventos(), 'displayTimeUnit': 'ms',
+             'otherData': {'argv': sys.argv, 'rss_max_mb': rss_max_mb()}}
+    with open(ruta + '.tmp', 'w') as f:
+        json.dump(traza, f)
+    os.replace(ruta + '.tmp', ruta)
+
+
+def _al_terminar():
+    # Solo el proceso que importó el módulo primero (no los workers) escribe
+    if os.getpid() != _PID:
+        return
+    if RUTA_TRAZA:
+        escribir_traza(RUTA_TRAZA)
+    if RESUMEN:
+        print(f"[traza] {resumen()}", file=sys.stderr)
+
+
+_PID = os.getpid()
+if ACTIVA:
+    atexit.register(_al_terminar)
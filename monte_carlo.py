@@ -0,0 +1,160 @@
+# Motor de simulación de escenarios (Monte Carlo vectorizado)
+# Genera N caminos x T fechas alrededor de una tendencia interpolada entre
+# puntos ancla, con un único numpy.random.Generator sembrado. El ruido de cada
+# fecha es normal con la volatilidad de su régimen; con persistencia > 0 el
+# ruido sigue un AR(1) en lugar de ser independiente entre fechas.
+# Con regímenes (regimenes.py) cada camino recorre además una cadena de Markov
+# de estados de volatilidad y el ruido se escala con la sigma de su estado.
+# Para acotar la memoria se puede trocear el eje temporal: cada trozo genera
+# N x trozo valores, calcula sus percentiles y se descarta.
+# Los percentiles salen de np.partition sobre los estadísticos de orden que
+# hacen falta (no de np.percentile, que ordena cada fila una vez por percentil).
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+PERCENTILES = (5, 25, 50, 75, 95)
+
+# sigma: volatilidad de cada estado; transicion: matriz de cambio de estado por
+# paso (filas = estado de partida); inicial: probabilidades del primer paso
+Regimenes = namedtuple('Regimenes', ['sigma', 'transicion', 'inicial'])
+
+
+def interpolar_tendencia(anchors, fechas, method='time'):
+    # Tendencia en las fechas pedidas a partir de {fecha: valor}
+    # (misma lógica que usd_graph.py: se unen fechas y anclas y se interpola)
+    serie_anclas = pd.Series(anchors, dtype='float64')
+    serie_anclas.index = pd.to_datetime(serie_anclas.index)
+    fechas = pd.DatetimeIndex(fechas)
+    combinado = serie_anclas.reindex(fechas.union(serie_anclas.index).sort_values())
+    return combinado.interpolate(method=method).reindex(fechas)
+
+
+def volatilidad_por_mes(fechas, por_mes, defecto):
+    # Volatilidad de cada fecha según su mes: por_mes = {mes: sigma}
+    meses = pd.DatetimeIndex(fechas).month.to_numpy()
+    tabla = np.full(13, float(defecto))
+    for mes, sigma in por_mes.items():
+        tabla[mes] = sigma
+    return tabla[meses]
+
+
+def dias_por_paso(fechas):
+    # Días hábiles medios entre fechas consecutivas (5 en una serie semanal)
+    dias = pd.DatetimeIndex(fechas).values.astype('datetime64[D]')
+    if len(dias) < 2:
+        return 1.0
+    return float(np.busday_count(dias[:-1], dias[1:]).mean())
+
+
+def por_paso(regimenes, dias):
+    # Regímenes diarios llevados a pasos de `dias` días hábiles: la sigma crece
+    # con la raíz del tiempo y la transición se eleva al número de días
+    # (redondeado, mínimo uno)
+    return Regimenes(np.asarray(regimenes.sigma, dtype=np.float64) * np.sqrt(dias),
+                     np.linalg.matrix_power(np.asarray(regimenes.transicion, dtype=np.float64),
+                                            max(1, round(dias))),
+                     np.asarray(regimenes.inicial, dtype=np.float64))
+
+
+def _estados(rng, regimenes, anterior, pasos, n_paths):
+    # Estados [pasos, n_paths] de la cadena de Markov a partir de `anterior`
+    # (None: el primer paso se sortea con las probabilidades iniciales)
+    acumulada = np.cumsum(regimenes.transicion, axis=1)
+    sorteo = rng.random((pasos, n_paths))
+    estados = np.empty((pasos, n_paths), dtype=np.intp)
+    for t in range(pasos):
+        if anterior is None:
+            umbrales = np.broadcast_to(np.cumsum(regimenes.inicial), (n_paths, len(regimenes.inicial)))
+        else:
+            umbrales = acumulada[anterior]
+        anterior = np.minimum((sorteo[t, :, None] > umbrales).sum(axis=1), len(regimenes.sigma) - 1)
+        estados[t] = anterior
+    return estados
+
+
+def simular_caminos(tendencia, sigma, n_paths, seed=None, persistencia=0.0, chunk=None, regimenes=None):
+    # Generador de bloques (inicio, valores[t, n_paths]) a lo largo del tiempo.
+    # Cada fila es una fecha: los N caminos de una fecha quedan contiguos en
+    # memoria, que es como se recorren al calcular percentiles.
+    # Con regimenes (por paso, ver por_paso) el ruido de cada camino es
+    # sigma[t] * regimenes.sigma[estado]: sigma pasa a ser la escala (p. ej. el
+    # nivel de la tendencia si las sigmas de los estados son rendimientos).
+    tendencia = np.asarray(tendencia, dtype=np.float64)
+    sigma = np.broadcast_to(np.asarray(sigma, dtype=np.float64), tendencia.shape)
+    rng = np.random.default_rng(seed)
+    total = len(tendencia)
+    chunk = total if chunk is None else max(1, int(chunk))
+
+    # Estado del AR(1) y de la cadena de regímenes entre trozos
+    anterior = np.zeros(n_paths)
+    estado = None
+    for inicio in range(0, total, chunk):
+        fin = min(total, inicio + chunk)
+        ruido = rng.standard_normal((fin - inicio, n_paths))
+        ruido *= sigma[inicio:fin, None]
+        if regimenes is not None:
+            estados = _estados(rng, regimenes, estado, fin - inicio, n_paths)
+            estado = estados[-1]
+            ruido *= np.asarray(regimenes.sigma, dtype=np.float64)[estados]
+        if persistencia:
+            for t in range(fin - inicio):
+                anterior = persistencia * anterior + ruido[t]
+                ruido[t] = anterior
+        ruido += tendencia[inicio:fin, None]
+        yield inicio, ruido
+
+
+def percentiles_por_fila(valores, percentiles):
+    # Lo mismo que np.percentile(valores, percentiles, axis=1) (interpolación
+    # lineal), reordenando `valores` en el sitio. Cada estadístico de orden se
+    # fija con una partición de un solo k sobre el tramo que queda entre los ya
+    # fijados (bisección desde la mediana); el siguiente estadístico, para
+    # interpolar, es el mínimo del tramo de encima.
+    n = valores.shape[1]
+    posicion = np.asarray(percentiles, dtype=np.float64) / 100 * (n - 1)
+    abajo = np.floor(posicion).astype(np.intp)
+    fraccion = posicion - abajo
+    fijados = np.unique(abajo)
+
+    pendientes = [(0, n, 0, len(fijados))]
+    while pendientes:
+        a, b, i, j = pendientes.pop()
+        if i < j:
+            m = (i + j) // 2
+            k = fijados[m]
+            valores[:, a:b].partition(k - a, axis=1)
+            pendientes += [(a, k, i, m), (k + 1, b, m + 1, j)]
+
+    # Fin del tramo de encima de cada estadístico: el siguiente fijado (o el final)
+    fin = np.append(fijados[1:] + 1, n)[np.searchsorted(fijados, abajo)]
+    arriba = np.stack([valores[:, k + 1:f].min(axis=1) if k + 1 < n else valores[:, k]
+                       for k, f in zip(abajo, fin)])
+    bandas = valores[:, abajo].T * (1 - fraccion[:, None]) + arriba * fraccion[:, None]
+    # Como np.percentile: una fila con NaN da NaN en todas sus bandas
+    bandas[:, np.isnan(valores).any(axis=1)] = np.nan
+    return bandas
+
+
+def simular(tendencia, sigma, n_paths=10000, seed=None, persistencia=0.0, chunk=None,
+            percentiles=PERCENTILES, regimenes=None):
+    # Bandas de percentiles para un gráfico de abanico.
+    # Devuelve un DataFrame con la tendencia y una columna P<x> por percentil.
+    indice = getattr(tendencia, 'index', None)
+    valores = np.asarray(tendencia, dtype=np.float64)
+    bandas = np.empty((len(percentiles), len(valores)))
+    for inicio, caminos in simular_caminos(valores, sigma, n_paths, seed, persistencia, chunk,
+                                              regimenes):
+        bandas[:, inicio:inicio + len(caminos)] = percentiles_por_fila(caminos, percentiles)
+
+    resultado = pd.DataFrame({f'P{p:g}': banda for p, banda in zip(percentiles, bandas)},
+                             index=indice)
+    resultado.insert(0, 'Tendencia', valores)
+    return resultado
+
+
+def un_camino(tendencia, sigma, seed=None, persistencia=0.0, regimenes=None):
+    # Un solo camino simulado (el "Cierre Semanal (Simulado)" de usd_graph.py)
+    _, caminos = next(simular_caminos(tendencia, sigma, 1, seed, persistencia, regimenes=regimenes))
+    return caminos[:, 0]
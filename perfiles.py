@@ -0,0 +1,186 @@
+# Perfiles de salida: impresión, web, redes sociales y miniatura
+# Cada perfil fija la resolución, si la figura se recorta a su contenido
+# (bbox_inches='tight'), qué capas se rasterizan dentro de un PDF/SVG y cómo
+# se codifica la imagen:
+#   - Las figuras de charts.py ya tienen la composición fija (tight_layout o
+#     subplots_adjust), así que web, social y miniatura guardan la figura
+#     entera y se ahorran la pasada de medición del recorte (y, en PDF/SVG, la
+#     pasada de composición que savefig hace tras un tight_layout).
+#   - Las imágenes se dibujan una sola vez con Agg y el búfer se codifica
+#     directamente con Pillow: PNG con paleta (octree rápido) o WebP con
+#     pérdida. Con recorte, la caja del contenido se mide sobre ese mismo
+#     dibujo y se recorta el búfer, sin volver a dibujar.
+#   - En PDF/SVG, los rellenos (fill_between, scatter) y grupos de barras con
+#     más vértices que el umbral del perfil se rasterizan a la resolución del
+#     perfil. Texto, ejes y líneas siguen siendo vectoriales: una polilínea ya
+#     es compacta y rasterizarla agranda el archivo.
+#
+#   from perfiles import guardar
+#   guardar(fig, 'dxy.webp', perfil='web')
+# En un RenderJob basta con savefig=dict(perfil='web') (render_farm.py).
+import os
+from collections import namedtuple
+
+import numpy as np
+
+# formato: el de las imágenes (png o webp); PDF y SVG se deciden por la ruta.
+# recorte: bbox_inches='tight'. rasterizar: vértices a partir de los que una
+# capa se rasteriza en PDF/SVG (None: nunca). colores: paleta del PNG (None:
+# color completo). calidad: WebP con pérdida (None: sin pérdida).
+Perfil = namedtuple('Perfil', ['formato', 'dpi', 'recorte', 'rasterizar', 'colores', 'calidad'])
+
+PERFILES = {
+    'impresion': Perfil('png', 300, True, 20_000, None, None),
+    'web': Perfil('webp', 150, False, 5_000, None, 85),
+    'social': Perfil('png', 150, False, 5_000, 256, None),
+    'miniatura': Perfil('png', 40, False, 1_000, 64, None),
+}
+
+VECTORIALES = ('pdf', 'svg')
+# Formato -> nombre del codificador en Pillow
+IMAGENES = {'png': 'PNG', 'webp': 'WEBP'}
+# Esfuerzo del codificador WebP (0-6): con 2, ~20 % más de bytes que con 4 en
+# la mitad de tiempo
+METODO_WEBP = 2
+
+
+def perfil_de(nombre):
+    try:
+        return PERFILES[nombre]
+    except KeyError:
+        raise ValueError(f"perfil desconocido: {nombre} (válidos: {', '.join(PERFILES)})") from None
+
+
+def _formato(destino, opciones, perfil):
+    formato = opciones.pop('format', None)
+    if formato is None and isinstance(destino, (str, os.PathLike)):
+        formato = os.path.splitext(os.fspath(destino))[1][1:].lower()
+    return formato or perfil.formato
+
+
+def guardar(fig, destino, perfil=None, **opciones):
+    # fig.savefig(destino, **opciones) con el perfil indicado (nombre o Perfil).
+    # Sin perfil es exactamente fig.savefig. Un dpi explícito tiene prioridad
+    # sobre el del perfil; el recorte lo decide siempre el perfil.
+    if perfil is None:
+        fig.savefig(destino, **opciones)
+        return
+    if isinstance(perfil, str):
+        perfil = perfil_de(perfil)
+    formato = _formato(destino, opciones, perfil)
+    opciones.pop('bbox_inches', None)
+    dpi = opciones.pop('dpi', None) or perfil.dpi
+
+    if formato in VECTORIALES:
+        _guardar_vectorial(fig, destino, perfil, formato, dpi, opciones)
+    elif formato in IMAGENES:
+        _guardar_imagen(fig, destino, perfil, formato, dpi, opciones)
+    else:
+        raise ValueError(f"formato no admitido con perfiles: {formato} "
+                         f"(válidos: {', '.join(VECTORIALES + tuple(IMAGENES))})")
+
+
+def _vertices(coleccion):
+    # Un scatter repite su marcador en cada posición
+    por_trazo = sum(len(trazo.vertices) for trazo in coleccion.get_paths())
+    return por_trazo * max(1, len(coleccion.get_offsets()))
+
+
+def capas_pesadas(fig, umbral):
+    # Artistas de datos con más de `umbral` vértices: colecciones
+    # (fill_between, scatter) y grupos de barras (cuatro vértices por barra)
+    from matplotlib.container import BarContainer
+
+    capas = []
+    for ax in fig.axes:
+        capas += [c for c in ax.collections if _vertices(c) > umbral]
+        for grupo in ax.containers:
+            if isinstance(grupo, BarContainer) and 4 * len(grupo.patches) > umbral:
+                capas += grupo.patches
+    return capas
+
+
+def _guardar_vectorial(fig, destino, perfil, formato, dpi, opciones):
+    from matplotlib.layout_engine import PlaceHolderLayoutEngine
+
+    # Las capas se marcan solo durante el guardado: las plantillas de
+    # chart_templates.py reutilizan la figura para otras salidas
+    capas = [] if perfil.rasterizar is None else capas_pesadas(fig, perfil.rasterizar)
+    previos = [a.get_rasterized() for a in capas]
+    for artista in capas:
+        artista.set_rasterized(True)
+    # tight_layout deja un motor de composición inerte con el que savefig
+    # dibuja la figura una vez de más (con las capas rasterizadas incluidas)
+    motor = fig.get_layout_engine()
+    fija = not perfil.recorte and isinstance(motor, PlaceHolderLayoutEngine)
+    if fija:
+        fig.set_layout_engine(None)
+        if fig.get_layout_engine() is not None:
+            # El estilo activa figure.autolayout o constrained_layout: se respeta
+            fig.set_layout_engine(motor)
+            fija = False
+    try:
+        fig.savefig(destino, format=formato, dpi=dpi, bbox_inches='tight' if perfil.recorte else None,
+                    **opciones)
+    finally:
+        if fija:
+            fig.set_layout_engine(motor)
+        for artista, previo in zip(capas, previos):
+            artista.set_rasterized(previo)
+
+
+def _recortar(fig, renderer, rgba, dpi, margen):
+    # Caja del contenido (la de bbox_inches='tight') medida sobre el dibujo ya
+    # hecho, en píxeles (mismo tamaño que da savefig) y limitada a la figura
+    caja = fig.get_tightbbox(renderer).padded(margen)
+    alto = rgba.shape[0]
+    x0, y0 = round(caja.x0 * dpi), round(alto - caja.y1 * dpi)
+    x1, y1 = x0 + int(caja.x1 * dpi - caja.x0 * dpi), y0 + int(caja.y1 * dpi - caja.y0 * dpi)
+    return rgba[max(y0, 0):max(y1, 0), max(x0, 0):max(x1, 0)]
+
+
+def _guardar_imagen(fig, destino, perfil, formato, dpi, opciones):
+    import matplotlib
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from PIL import Image
+
+    no_admitidas = set(opciones) - {'facecolor', 'edgecolor', 'pad_inches'}
+    if no_admitidas:
+        raise ValueError(f"opciones de savefig no admitidas con perfiles: {', '.join(sorted(no_admitidas))}")
+
+    # Colores de fondo y borde como los resuelve savefig ('auto': los de la figura)
+    colores = {}
+    for clave in ('facecolor', 'edgecolor'):
+        color = opciones.get(clave, matplotlib.rcParams[f'savefig.{clave}'])
+        if not (isinstance(color, str) and color == 'auto'):
+            colores[clave] = color
+    margen = opciones.get('pad_inches')
+    if margen is None:
+        margen = matplotlib.rcParams['savefig.pad_inches']
+
+    lienzo_original, dpi_original = fig.canvas, fig.dpi
+    colores_originales = {'facecolor': fig.get_facecolor(), 'edgecolor': fig.get_edgecolor()}
+    lienzo = lienzo_original if isinstance(lienzo_original, FigureCanvasAgg) else FigureCanvasAgg(fig)
+    try:
+        fig.dpi = dpi
+        fig.set(**colores)
+        lienzo.draw()
+        rgba = np.asarray(lienzo.buffer_rgba())
+        if perfil.recorte:
+            rgba = _recortar(fig, lienzo.get_renderer(), rgba, dpi, margen)
+        imagen = Image.fromarray(rgba)
+        if rgba[..., 3].min() == 255:
+            imagen = imagen.convert('RGB')
+
+        if formato == 'webp':
+            calidad = {'lossless': True} if perfil.calidad is None else {'quality': perfil.calidad}
+            imagen.save(destino, IMAGENES[formato], method=METODO_WEBP, **calidad)
+        else:
+            if perfil.colores:
+                imagen = imagen.quantize(perfil.colores, method=Image.Quantize.FASTOCTREE)
+            imagen.save(destino, IMAGENES[formato], dpi=(dpi, dpi))
+    finally:
+        fig.dpi = dpi_original
+        fig.set(**colores_originales)
+        if lienzo is not lienzo_original:
+            fig.set_canvas(lienzo_original)
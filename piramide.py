@@ -0,0 +1,179 @@
+# Pirámide de resoluciones OHLC
+# Sobre las barras guardadas de un ticker (intradía o diarias) se mantienen
+# agregados por día, semana (W-FRI), mes y trimestre, cada uno en formato
+# columnar dentro del directorio de la serie (<serie>/piramide/<nivel>/):
+#   intradía -> 1d -> 1wk (W-FRI)
+#                  -> 1mo -> 3mo
+# Los periodos se etiquetan como en pandas: el día (00:00), el viernes de la
+# semana, el último día del mes y el del trimestre. Se calculan una vez y se
+# actualizan al llegar barras nuevas (bar_store.py avisa desde la primera
+# barra escrita): solo se vuelven a agregar los periodos afectados, con el
+# último, que puede estar incompleto, sustituido en su sitio.
+# Un gráfico pide las barras de un rango para un ancho en píxeles y recibe el
+# nivel más grueso que aún tiene al menos una barra por píxel: un gráfico de
+# 30 años lee unos miles de barras diarias en lugar de millones de minutos.
+import json
+import os
+
+import numpy as np
+
+import columnar
+
+NIVELES = ['1d', '1wk', '1mo', '3mo']
+# Nivel del que se agrega cada uno (None: las barras de la serie)
+FUENTE = {'1d': None, '1wk': '1d', '1mo': '1d', '3mo': '1mo'}
+DIA = 86_400 * 10**9
+META = 'meta.json'
+
+
+def niveles(intervalo):
+    # Niveles que se pueden agregar a partir de barras del intervalo dado
+    if intervalo == '1d':
+        return NIVELES[1:]
+    if intervalo.endswith(('m', 'h')) and not intervalo.endswith('mo'):
+        return list(NIVELES)
+    return []
+
+
+def etiquetas(fechas, nivel):
+    # Fecha (ns) del periodo al que pertenece cada barra
+    dias = np.asarray(fechas, dtype=np.int64) // DIA
+    if nivel == '1d':
+        fin = dias
+    elif nivel == '1wk':
+        # 1970-01-01 fue jueves: (dias + 3) % 7 es el día de la semana (lunes = 0)
+        fin = dias + (4 - (dias + 3)) % 7
+    else:
+        meses = dias.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+        if nivel == '3mo':
+            meses = meses - meses % 3 + 2
+        fin = (meses + 1).astype('datetime64[M]').astype('datetime64[D]').astype(np.int64) - 1
+    return fin * DIA
+
+
+def inicio_periodo(etiqueta, nivel):
+    # Primer instante (ns) del periodo con esa etiqueta
+    dia = np.datetime64(int(etiqueta) // DIA, 'D')
+    if nivel == '1d':
+        inicio = dia
+    elif nivel == '1wk':
+        inicio = dia - np.timedelta64(6, 'D')
+    else:
+        mes = dia.astype('datetime64[M]')
+        if nivel == '3mo':
+            mes = mes - np.timedelta64(2, 'M')
+        inicio = mes.astype('datetime64[D]')
+    return int(inicio.astype(np.int64)) * DIA
+
+
+def agregar(columnas, nivel):
+    # OHLCV por periodo: apertura de la primera barra, cierre de la última,
+    # máximo y mínimo (sin NaN) y volumen sumado
+    fechas = np.asarray(columnas['Date'], dtype=np.int64)
+    if len(fechas) == 0:
+        return {nombre: np.empty(0, dtype=np.int64 if nombre == 'Date' else np.float64)
+                for nombre in ['Date'] + columnar.COLUMNAS}
+    etiqueta = etiquetas(fechas, nivel)
+    inicios = np.flatnonzero(np.r_[True, etiqueta[1:] != etiqueta[:-1]])
+    finales = np.r_[inicios[1:], len(fechas)] - 1
+    return {
+        'Date': etiqueta[inicios],
+        'Open': np.asarray(columnas['Open'], dtype=np.float64)[inicios],
+        'High': np.fmax.reduceat(np.asarray(columnas['High'], dtype=np.float64), inicios),
+        'Low': np.fmin.reduceat(np.asarray(columnas['Low'], dtype=np.float64), inicios),
+        'Close': np.asarray(columnas['Close'], dtype=np.float64)[finales],
+        'Volume': np.add.reduceat(np.nan_to_num(np.asarray(columnas['Volume'], dtype=np.float64)), inicios),
+    }
+
+
+def directorio(base, nivel=None):
+    ruta = os.path.join(base, 'piramide')
+    return ruta if nivel is None else os.path.join(ruta, nivel)
+
+
+def existe(base):
+    return os.path.exists(os.path.join(directorio(base), META))
+
+
+def _leer_meta(base):
+    with open(os.path.join(directorio(base), META)) as f:
+        return json.load(f)
+
+
+def _huella_base(archivo):
+    # Lo que permite saber si la serie cambió sin pasar por actualizar()
+    if len(archivo) == 0:
+        return {'filas': 0, 'primera': None, 'ultima': None}
+    return {'filas': len(archivo), 'primera': int(archivo.fechas[0]), 'ultima': int(archivo.fechas[-1])}
+
+
+def actualizar(base, intervalo, desde=None):
+    # Pone al día los niveles de la serie guardada en `base`. `desde` es la
+    # primera barra que ha cambiado (ns o fecha): se reagregan los periodos
+    # desde el que la contiene. Sin `desde`, solo se reconstruye si la serie no
+    # coincide con la de la última actualización.
+    if not niveles(intervalo) or columnar.leer_cabecera(base) is None:
+        return False
+    archivo = columnar.BarFile(base)
+    huella = _huella_base(archivo)
+    meta = _leer_meta(base) if existe(base) else None
+
+    if meta is None or meta['base']['primera'] != huella['primera'] or meta['intervalo'] != intervalo:
+        desde = None  # primera vez o serie reescrita por delante: todo de nuevo
+    elif desde is None:
+        if meta['base'] == huella:
+            return False
+        desde = meta['base']['ultima']  # cambios sin aviso: desde la última barra conocida
+    else:
+        desde = min(columnar.a_ns(desde), meta['base']['ultima'])
+
+    for nivel in niveles(intervalo):
+        fuente = archivo if FUENTE[nivel] in (None, intervalo) else columnar.BarFile(directorio(base, FUENTE[nivel]))
+        destino = directorio(base, nivel)
+        if desde is None:
+            if os.path.exists(destino):
+                for nombre in os.listdir(destino):
+                    os.remove(os.path.join(destino, nombre))
+            nuevas = agregar(fuente.columnas(), nivel)
+            columnar.anadir_columnas(destino, nuevas)
+        else:
+            inicio = inicio_periodo(etiquetas([desde], nivel)[0], nivel)
+            nuevas = agregar(fuente.columnas(start=inicio), nivel)
+            columnar.anadir_columnas(destino, nuevas, reemplazar=True)
+
+    os.makedirs(directorio(base), exist_ok=True)
+    ruta = os.path.join(directorio(base), META)
+    with open(ruta + '.tmp', 'w') as f:
+        json.dump({'intervalo': intervalo, 'base': huella}, f, indent=2)
+    os.replace(ruta + '.tmp', ruta)
+    return True
+
+
+def posiciones(archivo, nivel, start, end):
+    # Filas del nivel cuyos periodos se solapan con [start, end)
+    i = int(np.searchsorted(archivo.fechas, columnar.a_ns(start), 'left'))
+    ultima = etiquetas([columnar.a_ns(end) - 1], nivel)[0]
+    j = int(np.searchsorted(archivo.fechas, ultima, 'right'))
+    return i, max(i, j)
+
+
+def elegir(base, intervalo, start, end, puntos):
+    # (nivel, BarFile, (i, j)) del nivel más grueso con al menos `puntos`
+    # barras en el rango; si ninguno llega, las barras de la serie
+    for nivel in reversed(niveles(intervalo)):
+        archivo = columnar.BarFile(directorio(base, nivel))
+        i, j = posiciones(archivo, nivel, start, end)
+        if j - i >= puntos:
+            return nivel, archivo, (i, j)
+    archivo = columnar.BarFile(base)
+    return intervalo, archivo, archivo.posiciones(start, end)
+
+
+def dataframe(archivo, filas):
+    # Las filas [i, j) del nivel como DataFrame OHLCV
+    import pandas as pd
+
+    i, j = filas
+    indice = pd.DatetimeIndex(np.asarray(archivo.fechas[i:j]).astype('datetime64[ns]'), name='Date')
+    return pd.DataFrame({nombre: np.asarray(archivo.columna(nombre)[i:j], dtype=np.float64)
+                         for nombre in columnar.COLUMNAS}, index=indice)
@@ -0,0 +1,401 @@
+# Modelo de regímenes de volatilidad calibrado con barras reales
+# Sustituye las volatilidades fijadas a mano (0.8 de febrero a septiembre y
+# 0.4 el resto en usd_graph.py, o la única pct_change().std() de graph_ds.py)
+# por medidas sobre el histórico de cada ticker:
+#   - volatilidad realizada móvil (sumas acumuladas, ventana en barras)
+#   - EWMA de RiskMetrics (lambda 0.94)
+#   - GARCH(1,1) con varianza objetivo, ajustado por máxima verosimilitud
+#     sobre una rejilla (alfa, beta) que se refina alrededor del mejor punto
+#   - regímenes ocultos: modelo de Markov oculto gaussiano (2 o 3 estados)
+#     ajustado con Baum-Welch; probabilidades suavizadas por día
+# Todos los ajustes recorren el tiempo una sola vez por iteración con arrays
+# (fechas x tickers): un lote de tickers se ajusta a la vez y los lotes se
+# reparten en un pool de procesos. Los rendimientos son logarítmicos; en las
+# fechas sin barra de un ticker la varianza se propaga sin observación.
+#
+# El resultado de cada ticker (JSON) alimenta monte_carlo.py: volatilidad por
+# estado, matriz de transición diaria y probabilidades de arranque. Las specs
+# de escenarios/ lo usan con "volatilidad": {"regimenes": "regimenes/DX-Y.NYB.json"}.
+#
+#   python3 regimenes.py DX-Y.NYB EURUSD=X JPY=X --inicio 2015-01-01 --salida regimenes/
+#   python3 regimenes.py DX-Y.NYB --estados 3 --series series/ --workers 4
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+VENTANA = 21
+LAMBDA = 0.94
+ESTADOS = 2
+NOMBRES = {2: ('baja', 'alta'), 3: ('baja', 'media', 'alta')}
+# Barras por año para expresar volatilidades anualizadas
+ANUAL = 252
+# Rejilla inicial del GARCH y refinamientos alrededor del mejor punto
+ALFAS = np.linspace(0.01, 0.30, 30)
+BETAS = np.linspace(0.50, 0.99, 50)
+REFINAMIENTOS = 3
+ITERACIONES = 200
+TOLERANCIA = 1e-7
+
+# resumen: dict serializable (JSON); series: DataFrame por fecha
+Ajuste = namedtuple('Ajuste', ['resumen', 'series'])
+
+
+def rendimientos(series):
+    # {ticker: cierres} -> (fechas, matriz T x K de rendimientos log con NaN)
+    import pandas as pd
+
+    tabla = pd.concat({t: s.dropna() for t, s in series.items()}, axis=1).sort_index()
+    log = np.log(tabla.to_numpy(dtype=np.float64))
+    r = np.full(log.shape, np.nan)
+    # Rendimiento respecto a la barra anterior del mismo ticker (salta huecos)
+    for k in range(log.shape[1]):
+        validas = np.flatnonzero(~np.isnan(log[:, k]))
+        r[validas[1:], k] = np.diff(log[validas, k])
+    return tabla.index, r
+
+
+def volatilidad_movil(r, ventana=VENTANA):
+    # Desviación típica de las últimas `ventana` barras con dato (sumas acumuladas)
+    valido = ~np.isnan(r)
+    x = np.where(valido, r, 0.0)
+    ceros = np.zeros((1, r.shape[1]))
+    s1 = np.concatenate([ceros, np.cumsum(x, axis=0)])
+    s2 = np.concatenate([ceros, np.cumsum(x * x, axis=0)])
+    n = np.concatenate([ceros, np.cumsum(valido, axis=0)])
+    inicio = np.maximum(np.arange(1, len(r) + 1) - ventana, 0)
+    suma, cuadrados, cuenta = s1[1:] - s1[inicio], s2[1:] - s2[inicio], n[1:] - n[inicio]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        varianza = (cuadrados - suma * suma / cuenta) / (cuenta - 1)
+    return np.where(cuenta >= ventana, np.sqrt(np.maximum(varianza, 0.0)), np.nan)
+
+
+def ewma(r, lam=LAMBDA):
+    # Volatilidad EWMA: var_t = lam * var_{t-1} + (1 - lam) * r_{t-1}^2.
+    # Arranca con la varianza de la muestra; sin dato, la varianza se mantiene.
+    valido = ~np.isnan(r)
+    x2 = np.where(valido, r, 0.0) ** 2
+    var = np.nanvar(r, axis=0)
+    salida = np.empty(r.shape)
+    for t in range(len(r)):
+        salida[t] = var
+        var = np.where(valido[t], lam * var + (1 - lam) * x2[t], var)
+    return np.sqrt(salida)
+
+
+def _garch_recorrido(x2, valido, varianza, alfa, beta):
+    # Log-verosimilitud (sin constantes) y varianza condicional de GARCH(1,1)
+    # con varianza objetivo para cada combinación: alfa, beta [..., K]
+    omega = varianza * (1 - alfa - beta)
+    h = np.broadcast_to(varianza, alfa.shape).copy()
+    total = np.zeros(alfa.shape)
+    varianzas = np.empty((len(x2),) + alfa.shape)
+    for t in range(len(x2)):
+        varianzas[t] = h
+        total -= valido[t] * (np.log(h) + x2[t] / h)
+        # Sin observación, r^2 se sustituye por su esperanza (h)
+        h = omega + alfa * np.where(valido[t], x2[t], h) + beta * h
+    return 0.5 * total, varianzas, h
+
+
+def garch(r):
+    # Ajuste GARCH(1,1) de cada columna: dict de arrays por ticker y la
+    # volatilidad condicional (T x K)
+    valido = ~np.isnan(r)
+    x = np.where(valido, r - np.nanmean(r, axis=0), 0.0)
+    x2 = x * x
+    varianza = np.nanvar(r, axis=0)
+    k = r.shape[1]
+
+    # Rejilla completa (alfa + beta < 1), la misma para todos los tickers
+    a, b = np.meshgrid(ALFAS, BETAS, indexing='ij')
+    estable = a + b < 0.999
+    alfa = np.repeat(a[estable][:, None], k, axis=1)
+    beta = np.repeat(b[estable][:, None], k, axis=1)
+    paso_a, paso_b = ALFAS[1] - ALFAS[0], BETAS[1] - BETAS[0]
+    for ronda in range(REFINAMIENTOS + 1):
+        verosimilitud, _, _ = _garch_recorrido(x2, valido, varianza, alfa, beta)
+        mejor = np.argmax(verosimilitud, axis=0)
+        columnas = np.arange(k)
+        mejor_a, mejor_b = alfa[mejor, columnas], beta[mejor, columnas]
+        if ronda == REFINAMIENTOS:
+            break
+        # Rejilla 9 x 9 alrededor del mejor punto, con pasos cuatro veces menores
+        paso_a, paso_b = paso_a / 4, paso_b / 4
+        desplazamientos = np.arange(-4, 5)
+        da, db = np.meshgrid(desplazamientos * paso_a, desplazamientos * paso_b, indexing='ij')
+        alfa = np.clip(mejor_a + da.reshape(-1, 1), 1e-4, 0.999)
+        beta = np.clip(mejor_b + db.reshape(-1, 1), 0.0, 0.999)
+        # Fuera de la región estacionaria: se reduce beta hasta el borde
+        beta = np.minimum(beta, 0.999 - alfa)
+
+    verosimilitud, varianzas, siguiente = _garch_recorrido(x2, valido, varianza, mejor_a, mejor_b)
+    return {
+        'omega': varianza * (1 - mejor_a - mejor_b),
+        'alfa': mejor_a,
+        'beta': mejor_b,
+        'persistencia': mejor_a + mejor_b,
+        'volatilidad_largo_plazo': np.sqrt(varianza),
+        'volatilidad_siguiente': np.sqrt(siguiente),
+        'log_verosimilitud': verosimilitud - 0.5 * valido.sum(axis=0) * np.log(2 * np.pi),
+    }, np.sqrt(varianzas)
+
+
+def _emisiones(x, valido, media, sigma):
+    # Densidad normal de cada rendimiento en cada estado [T, K, S] (1 sin dato)
+    z = (x[:, :, None] - media) / sigma
+    densidad = np.exp(-0.5 * z * z) / (sigma * np.sqrt(2 * np.pi))
+    return np.where(valido[:, :, None], densidad, 1.0)
+
+
+def _adelante_atras(b, inicial, transicion):
+    # Forward-backward escalado: (alfa, beta, escalas) con alfa filtrada
+    t_total, k, s = b.shape
+    alfa = np.empty(b.shape)
+    beta = np.empty(b.shape)
+    escala = np.empty((t_total, k))
+    # Cada paso escribe en su fila (menos temporales: el bucle es en Python)
+    traspuesta = transicion.transpose(0, 2, 1)
+    np.multiply(inicial, b[0], out=alfa[0])
+    np.sum(alfa[0], axis=1, out=escala[0])
+    alfa[0] /= escala[0][:, None]
+    for t in range(1, t_total):
+        np.multiply(np.matmul(traspuesta, alfa[t - 1][:, :, None])[:, :, 0], b[t], out=alfa[t])
+        np.sum(alfa[t], axis=1, out=escala[t])
+        alfa[t] /= escala[t][:, None]
+    beta[-1] = 1.0
+    siguiente = b * (1 / escala)[:, :, None]
+    for t in range(t_total - 2, -1, -1):
+        np.matmul(transicion, (siguiente[t + 1] * beta[t + 1])[:, :, None], out=beta[t][:, :, None])
+    return alfa, beta, escala
+
+
+def hmm(r, estados=ESTADOS, iteraciones=ITERACIONES, tolerancia=TOLERANCIA):
+    # Baum-Welch de un HMM gaussiano por columna. Los estados salen ordenados
+    # de menor a mayor volatilidad. Devuelve (parámetros, probabilidades
+    # suavizadas [T, K, S], probabilidades filtradas en la última fecha [K, S])
+    valido = ~np.isnan(r)
+    x = np.where(valido, r, 0.0)
+    k = r.shape[1]
+    desviacion = np.nanstd(r, axis=0)
+
+    # Arranque: volatilidades repartidas alrededor de la de la muestra y
+    # regímenes persistentes (2 % de cambio diario)
+    sigma = desviacion[:, None] * np.linspace(0.6, 1.6, estados)
+    media = np.zeros((k, estados))
+    transicion = np.full((k, estados, estados), 0.02 / (estados - 1))
+    transicion[:, np.arange(estados), np.arange(estados)] = 0.98
+    inicial = np.full((k, estados), 1.0 / estados)
+    minimo = desviacion[:, None] * 0.05
+    previa = np.full(k, -np.inf)
+    # Cada ticker deja de actualizarse al converger: el resultado no depende
+    # de con qué otros tickers comparta lote
+    activo = np.ones(k, dtype=bool)
+    for _ in range(iteraciones):
+        b = _emisiones(x, valido, media, sigma)
+        alfa, beta, escala = _adelante_atras(b, inicial, transicion)
+        verosimilitud = np.log(escala).sum(axis=0)
+        activo &= np.abs(verosimilitud - previa) > tolerancia * np.abs(verosimilitud)
+        if not activo.any():
+            break
+        previa = verosimilitud
+        gamma = alfa * beta
+        gamma /= gamma.sum(axis=2, keepdims=True)
+        xi = np.einsum('tki,kij,tkj->kij', alfa[:-1], transicion, b[1:] * beta[1:] / escala[1:, :, None])
+
+        peso = gamma * valido[:, :, None]
+        total = peso.sum(axis=0)
+        nueva_media = (peso * x[:, :, None]).sum(axis=0) / total
+        nueva_sigma = np.maximum(np.sqrt((peso * (x[:, :, None] - nueva_media) ** 2).sum(axis=0) / total), minimo)
+        inicial = np.where(activo[:, None], gamma[0], inicial)
+        transicion = np.where(activo[:, None, None], xi / xi.sum(axis=2, keepdims=True), transicion)
+        media = np.where(activo[:, None], nueva_media, media)
+        sigma = np.where(activo[:, None], nueva_sigma, sigma)
+
+    b = _emisiones(x, valido, media, sigma)
+    alfa, beta, escala = _adelante_atras(b, inicial, transicion)
+    gamma = alfa * beta
+    gamma /= gamma.sum(axis=2, keepdims=True)
+
+    orden = np.argsort(sigma, axis=1)
+    filas = np.arange(k)[:, None]
+    parametros = {
+        'sigma': sigma[filas, orden],
+        'media': media[filas, orden],
+        'transicion': transicion[filas[:, :, None], orden[:, :, None], orden[:, None, :]],
+        'log_verosimilitud': np.log(escala).sum(axis=0),
+    }
+    return parametros, gamma[:, filas, orden], alfa[-1][filas, orden]
+
+
+def estacionaria(transicion):
+    # Distribución estacionaria de una matriz de transición (autovector de 1)
+    valores, vectores = np.linalg.eig(np.asarray(transicion).T)
+    v = np.real(vectores[:, np.argmin(np.abs(valores - 1))])
+    return v / v.sum()
+
+
+def ajustar(series, ventana=VENTANA, lam=LAMBDA, estados=ESTADOS):
+    # {ticker: cierres (Series con fechas)} -> {ticker: Ajuste}, todos a la vez
+    import pandas as pd
+
+    fechas, r = rendimientos(series)
+    movil = volatilidad_movil(r, ventana)
+    suavizada = ewma(r, lam)
+    ajuste_garch, condicional = garch(r)
+    regimen, probabilidades, filtradas = hmm(r, estados)
+    nombres = NOMBRES[estados]
+
+    resultado = {}
+    for k, ticker in enumerate(series):
+        validas = np.flatnonzero(~np.isnan(r[:, k]))
+        ultima = validas[-1]
+        transicion = regimen['transicion'][k]
+        actual = filtradas[k] @ transicion
+        resumen = {
+            'ticker': ticker,
+            'desde': str(fechas[validas[0] - 1].date()),
+            'hasta': str(fechas[ultima].date()),
+            'rendimientos': len(validas),
+            'volatilidad_diaria': float(np.nanstd(r[:, k], ddof=1)),
+            'volatilidad_movil': {'ventana': ventana, 'ultima': float(movil[ultima, k])},
+            'ewma': {'lambda': lam, 'siguiente': float(suavizada[ultima, k])},
+            'garch': {clave: float(valores[k]) for clave, valores in ajuste_garch.items()},
+            'regimenes': {
+                'nombres': list(nombres),
+                'sigma': regimen['sigma'][k].tolist(),
+                'media': regimen['media'][k].tolist(),
+                'transicion': transicion.tolist(),
+                'duracion_media': (1 / (1 - np.diag(transicion))).tolist(),
+                'estacionaria': estacionaria(transicion).tolist(),
+                'actual': actual.tolist(),
+                'estado_actual': nombres[int(np.argmax(filtradas[k]))],
+                'log_verosimilitud': float(regimen['log_verosimilitud'][k]),
+            },
+        }
+        tabla = pd.DataFrame({'rendimiento': r[:, k], 'volatilidad_movil': movil[:, k],
+                              'ewma': suavizada[:, k], 'garch': condicional[:, k],
+                              **{f'p_{nombre}': probabilidades[:, k, s] for s, nombre in enumerate(nombres)}},
+                             index=fechas)
+        tabla = tabla.iloc[validas]
+        tabla['regimen'] = np.asarray(nombres)[np.argmax(probabilidades[validas, k], axis=1)]
+        resultado[ticker] = Ajuste(resumen, tabla)
+    return resultado
+
+
+def _trabajo(argumentos):
+    series, ventana, lam, estados = argumentos
+    return ajustar(series, ventana, lam, estados)
+
+
+def ajustar_lote(series, ventana=VENTANA, lam=LAMBDA, estados=ESTADOS, workers=None):
+    # Reparte los tickers en un lote por worker; cada lote se ajusta vectorizado
+    tickers = list(series)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    # Igual que render_farm.py: solo 'fork' (los scripts no tienen guarda __main__)
+    if 'fork' not in multiprocessing.get_all_start_methods():
+        workers = 1
+    workers = max(1, min(workers, len(tickers)))
+    lotes = [{t: series[t] for t in tickers[i::workers]} for i in range(workers)]
+    trabajos = [(lote, ventana, lam, estados) for lote in lotes]
+
+    if workers <= 1:
+        resultados = map(_trabajo, trabajos)
+    else:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('fork')) as pool:
+            resultados = list(pool.map(_trabajo, trabajos))
+    ajustes = {}
+    for resultado in resultados:
+        ajustes.update(resultado)
+    return {t: ajustes[t] for t in tickers}
+
+
+def guardar(resumen, ruta):
+    with open(ruta + '.tmp', 'w') as f:
+        json.dump(resumen, f, indent=2, ensure_ascii=False)
+    os.replace(ruta + '.tmp', ruta)
+
+
+def cargar(ruta):
+    with open(ruta, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def regimenes_de(resumen, arranque='actual'):
+    # monte_carlo.Regimenes diarios de un resumen. arranque: 'actual' (estado
+    # filtrado en la última barra) o 'estacionario' (frecuencia a largo plazo)
+    from monte_carlo import Regimenes
+
+    if arranque not in ('actual', 'estacionario'):
+        raise ValueError(f"arranque desconocido: {arranque} (válidos: actual, estacionario)")
+    regimenes = resumen['regimenes']
+    return Regimenes(np.asarray(regimenes['sigma']), np.asarray(regimenes['transicion']),
+                     np.asarray(regimenes['actual' if arranque == 'actual' else 'estacionaria']))
+
+
+def imprimir_resumen(resumen):
+    anual = np.sqrt(ANUAL) * 100
+    g, reg = resumen['garch'], resumen['regimenes']
+    print(f"{resumen['ticker']} ({resumen['desde']} a {resumen['hasta']}, {resumen['rendimientos']} rendimientos):")
+    print(f"• Volatilidad diaria: {resumen['volatilidad_diaria'] * 100:.2f}% "
+          f"({resumen['volatilidad_diaria'] * anual:.1f}% anual)")
+    print(f"• Realizada {resumen['volatilidad_movil']['ventana']} barras: "
+          f"{resumen['volatilidad_movil']['ultima'] * 100:.2f}%  |  "
+          f"EWMA ({resumen['ewma']['lambda']:g}): {resumen['ewma']['siguiente'] * 100:.2f}%")
+    print(f"• GARCH(1,1): alfa {g['alfa']:.3f}, beta {g['beta']:.3f} (persistencia {g['persistencia']:.3f}), "
+          f"próxima {g['volatilidad_siguiente'] * 100:.2f}%, largo plazo {g['volatilidad_largo_plazo'] * 100:.2f}%")
+    for nombre, sigma, duracion, peso, actual in zip(reg['nombres'], reg['sigma'], reg['duracion_media'],
+                                                     reg['estacionaria'], reg['actual']):
+        print(f"• Régimen {nombre:<6} {sigma * 100:.2f}% diaria ({sigma * anual:.1f}% anual), "
+              f"dura ~{duracion:.0f} barras, {peso:.0%} del tiempo, prob. mañana {actual:.0%}")
+    print(f"• Régimen actual: {reg['estado_actual']}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Calibra regímenes de volatilidad con barras reales')
+    parser.add_argument('tickers', nargs='*', default=['DX-Y.NYB'])
+    parser.add_argument('--inicio', default='2025-01-01')
+    parser.add_argument('--fin', default='2026-01-05')
+    parser.add_argument('--intervalo', default='1d')
+    parser.add_argument('--ventana', type=int, default=VENTANA, help='barras de la volatilidad realizada')
+    parser.add_argument('--lambda', dest='lam', type=float, default=LAMBDA, help='decaimiento de la EWMA')
+    parser.add_argument('--estados', type=int, choices=sorted(NOMBRES), default=ESTADOS)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--salida', default='regimenes', help='directorio de los JSON (<ticker>.json)')
+    parser.add_argument('--series', help='directorio para los CSV diarios de volatilidades y regímenes')
+    args = parser.parse_args()
+
+    from async_fetch import fetch_bulk
+    from bar_store import BarStore
+
+    t0 = time.perf_counter()
+    store = BarStore()
+    if store.provider.cacheable:
+        fetch_bulk(args.tickers, args.inicio, args.fin, args.intervalo, store=store)
+    series = {}
+    for ticker in args.tickers:
+        cierres = store.get(ticker, args.inicio, args.fin, args.intervalo)['Close'].dropna()
+        if len(cierres) < max(args.ventana, 30):
+            print(f"✗ {ticker}: solo {len(cierres)} barras entre {args.inicio} y {args.fin}")
+            continue
+        series[ticker] = cierres
+    t1 = time.perf_counter()
+    ajustes = ajustar_lote(series, args.ventana, args.lam, args.estados, args.workers)
+    t2 = time.perf_counter()
+
+    os.makedirs(args.salida, exist_ok=True)
+    if args.series:
+        os.makedirs(args.series, exist_ok=True)
+    for ticker, ajuste in ajustes.items():
+        print()
+        imprimir_resumen(ajuste.resumen)
+        guardar(ajuste.resumen, os.path.join(args.salida, f'{ticker}.json'))
+        if args.series:
+            ajuste.series.to_csv(os.path.join(args.series, f'{ticker}.csv'))
+    print(f"\n{len(ajustes)} ticker(s): datos {t1 - t0:.2f} s, ajuste {t2 - t1:.2f} s -> {args.salida}/")
@@ -0,0 +1,132 @@
+# Caché de renders direccionada por contenido
+# Cada salida (PNG, PDF...) se identifica por un hash de todo lo que decide
+# sus píxeles: el constructor de charts.py y sus argumentos (las barras del
+# tramo dibujado incluidas), las opciones de savefig, los rcParams de
+# matplotlib activos (estilo) y la versión del código de dibujo. Si la clave
+# coincide con la registrada para el archivo que ya existe en disco, el
+# render se omite; solo se vuelven a dibujar las salidas obsoletas.
+#
+# Las claves se guardan en un manifiesto por directorio de salida
+# (.render_cache.json: {archivo: {clave, tamano}}). Con DXY_RENDER_CACHE=0 se
+# desactiva y se renderiza siempre.
+import hashlib
+import json
+import os
+
+import numpy as np
+
+MANIFIESTO = '.render_cache.json'
+ACTIVA = os.environ.get('DXY_RENDER_CACHE', '1') not in ('', '0', 'false', 'no')
+
+# Módulos cuyo código cambia el resultado de un render
+MODULOS_DIBUJO = ('charts.py', 'chart_templates.py', 'downsample.py', 'eventos.py', 'perfiles.py')
+
+_version_codigo = None
+
+
+def version_codigo():
+    # Hash de los fuentes de dibujo y de la versión de matplotlib (una vez por proceso)
+    global _version_codigo
+    if _version_codigo is None:
+        import matplotlib
+
+        h = hashlib.sha256(matplotlib.__version__.encode())
+        directorio = os.path.dirname(os.path.abspath(__file__))
+        for nombre in MODULOS_DIBUJO:
+            with open(os.path.join(directorio, nombre), 'rb') as f:
+                h.update(f.read())
+        _version_codigo = h.hexdigest()
+    return _version_codigo
+
+
+def _huella(obj, h):
+    # Añade al hash una representación estable de obj (datos incluidos)
+    tipo = type(obj).__name__
+    h.update(tipo.encode())
+    if isinstance(obj, np.ndarray):
+        h.update(f'{obj.dtype.str}{obj.shape}'.encode())
+        h.update(np.ascontiguousarray(obj).tobytes())
+    elif hasattr(obj, 'index') and hasattr(obj, 'to_numpy'):
+        # DataFrame / Series: etiquetas, índice y valores de cada fila
+        import pandas as pd
+
+        nombres = list(obj.columns) if hasattr(obj, 'columns') else [obj.name]
+        h.update(repr(nombres).encode())
+        h.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+    elif isinstance(obj, dict):
+        for clave in sorted(obj, key=repr):
+            _huella(clave, h)
+            _huella(obj[clave], h)
+    elif isinstance(obj, (list, tuple)):
+        h.update(str(len(obj)).encode())
+        for elemento in obj:
+            _huella(elemento, h)
+    else:
+        h.update(repr(obj).encode())
+
+
+# rcParams que no cambian el archivo generado
+NO_ESTILO = ('backend', 'backend_fallback', 'interactive')
+
+
+def _huella_estilo(h):
+    import matplotlib
+
+    for clave, valor in sorted(matplotlib.rcParams.items()):
+        if clave in NO_ESTILO:
+            continue
+        h.update(f'{clave}={valor!r};'.encode())
+
+
+def clave(trabajo):
+    # Clave de un RenderJob (ver render_farm.py)
+    h = hashlib.sha256(version_codigo().encode())
+    _huella((trabajo.grafico, trabajo.args, trabajo.kwargs, trabajo.savefig,
+             os.path.splitext(trabajo.ruta)[1]), h)
+    _huella_estilo(h)
+    return h.hexdigest()
+
+
+class RenderCache:
+
+    def __init__(self):
+        self._manifiestos = {}
+        self._modificados = set()
+
+    def _manifiesto(self, directorio):
+        if directorio not in self._manifiestos:
+            ruta = os.path.join(directorio, MANIFIESTO)
+            try:
+                with open(ruta) as f:
+                    self._manifiestos[directorio] = json.load(f)
+            except (OSError, ValueError):
+                self._manifiestos[directorio] = {}
+        return self._manifiestos[directorio]
+
+    def _entrada(self, ruta):
+        directorio, archivo = os.path.split(os.path.abspath(ruta))
+        return self._manifiesto(directorio), archivo
+
+    def vigente(self, ruta, clave_trabajo):
+        # True si el archivo existe y se generó con la misma clave
+        manifiesto, archivo = self._entrada(ruta)
+        entrada = manifiesto.get(archivo)
+        if entrada is None or entrada['clave'] != clave_trabajo:
+            return False
+        try:
+            return os.path.getsize(ruta) == entrada['tamano']
+        except OSError:
+            return False
+
+    def registrar(self, ruta, clave_trabajo):
+        manifiesto, archivo = self._entrada(ruta)
+        manifiesto[archivo] = {'clave': clave_trabajo, 'tamano': os.path.getsize(ruta)}
+        self._modificados.add(os.path.dirname(os.path.abspath(ruta)))
+
+    def guardar(self):
+        for directorio in self._modificados:
+            ruta = os.path.join(directorio, MANIFIESTO)
+            with open(ruta + '.tmp', 'w') as f:
+                json.dump(self._manifiestos[directorio], f, indent=2, sort_keys=True)
+            os.replace(ruta + '.tmp', ruta)
+        self._modificados.clear()
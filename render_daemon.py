@@ -0,0 +1,307 @@
+# Servidor de gráficos persistente
+# Cada script paga al arrancar la importación de matplotlib, la búsqueda de
+# fuentes y el estilo por defecto antes de dibujar nada. Este proceso lo hace
+# una sola vez (backend Agg, estilo 'default', fuentes resueltas, charts.py y
+# las plantillas de chart_templates.py cargadas, un primer render de
+# calentamiento) y después atiende peticiones de gráficos por HTTP en
+# localhost o por un socket Unix, devolviendo los bytes de la imagen:
+#
+#   GET /grafico?ticker=DX-Y.NYB&inicio=2025-01-01&fin=2026-01-05&grafico=infografia&formato=png&dpi=150
+#   GET /estado      (JSON: peticiones, aciertos de caché, memoria usada...)
+#
+# Parámetros: ticker, inicio, fin, intervalo, grafico (los de dxy_cli.py),
+# formato (png, webp, pdf, svg), dpi, estilo (hoja de estilo de matplotlib) y
+# perfil (perfiles.py: fija formato y dpi por defecto, recorte y codificación).
+# Las barras salen del almacén (bar_store.py) al nivel de la pirámide que
+# llena el ancho de la figura, como en dxy_cli.py. Las imágenes recientes se
+# guardan en memoria (LRU acotado en MB) con la clave de render_cache.py:
+# datos, opciones, estilo y código de dibujo. Repetir una petición cuesta leer
+# las barras y calcular la clave (milisegundos), y si llegan barras nuevas la
+# clave cambia y el gráfico se vuelve a dibujar.
+# matplotlib no admite dibujar desde varios hilos: los renders se hacen de
+# uno en uno; cada estilo tiene sus propias plantillas.
+#
+#   python3 render_daemon.py --puerto 8766
+#   python3 render_daemon.py --socket /tmp/dxy_render.sock --memoria 512
+#   curl -o dxy.png 'http://127.0.0.1:8766/grafico?grafico=grafico_tecnico&dpi=100'
+#   curl --unix-socket /tmp/dxy_render.sock -o dxy.png 'http://localhost/grafico?grafico=infografia'
+#   curl -o dxy.webp 'http://127.0.0.1:8766/grafico?grafico=infografia&perfil=web'
+import argparse
+import contextlib
+import http.client
+import io
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlencode, urlparse
+
+import matplotlib
+
+matplotlib.use('Agg')
+
+GRAFICOS = ('grafico_tecnico', 'infografia', 'infografia_social', 'grafico_simple')
+FORMATOS = {'png': 'image/png', 'webp': 'image/webp', 'pdf': 'application/pdf', 'svg': 'image/svg+xml'}
+PARAMETROS = {'ticker': 'DX-Y.NYB', 'inicio': '2025-01-01', 'fin': '2026-01-05', 'intervalo': '1d',
+              'grafico': 'grafico_tecnico', 'formato': 'png', 'dpi': '100', 'estilo': '', 'perfil': ''}
+MEMORIA_MB = 256
+# Ancho en pulgadas de la figura más ancha (como dxy_cli.ANCHO_FIGURA)
+ANCHO_FIGURA = 14
+
+
+class CacheLRU:
+    # {clave: bytes} acotado por tamaño total; se descartan los menos usados
+
+    def __init__(self, memoria_mb=MEMORIA_MB):
+        self.limite = int(memoria_mb * 2**20)
+        self.entradas = OrderedDict()
+        self.bytes = 0
+        self.aciertos = 0
+        self.fallos = 0
+
+    def get(self, clave):
+        datos = self.entradas.get(clave)
+        if datos is None:
+            self.fallos += 1
+            return None
+        self.entradas.move_to_end(clave)
+        self.aciertos += 1
+        return datos
+
+    def poner(self, clave, datos):
+        if len(datos) > self.limite:
+            return
+        if clave in self.entradas:
+            self.bytes -= len(self.entradas.pop(clave))
+        self.entradas[clave] = datos
+        self.bytes += len(datos)
+        while self.bytes > self.limite:
+            _, descartado = self.entradas.popitem(last=False)
+            self.bytes -= len(descartado)
+
+    def estado(self):
+        return {'entradas': len(self.entradas), 'memoria_mb': round(self.bytes / 2**20, 2),
+                'limite_mb': round(self.limite / 2**20, 2), 'aciertos': self.aciertos, 'fallos': self.fallos}
+
+
+class Renderizador:
+    # Estado que se mantiene caliente entre peticiones
+
+    def __init__(self, store=None, memoria_mb=MEMORIA_MB):
+        from bar_store import BarStore
+
+        self.store = store or BarStore()
+        self.cache = CacheLRU(memoria_mb)
+        self.plantillas = {}  # {estilo: plantillas de render_farm.render_job}
+        self.lock = threading.Lock()
+        self.peticiones = 0
+        self.inicio = time.time()
+        self.precargar()
+
+    def precargar(self):
+        # Todo lo que un script paga en cada ejecución, aquí una sola vez
+        import matplotlib.pyplot as plt
+        from matplotlib import font_manager
+        import pandas as pd
+
+        import chart_templates  # noqa: F401
+        import charts
+        import perfiles
+        import render_cache
+
+        plt.style.use('default')
+        for familia in matplotlib.rcParams['font.family']:
+            font_manager.findfont(font_manager.FontProperties(family=[familia]))
+        render_cache.version_codigo()
+        # Un render completo deja cargados Agg, las fuentes y el texto
+        serie = pd.Series(100.0 + pd.Series(range(30)).to_numpy() * 0.1,
+                          index=pd.date_range('2025-01-01', periods=30), name='Close')
+        fig = charts.grafico_simple(serie)
+        fig.savefig(io.BytesIO(), format='png', dpi=50)
+        # ... y los codificadores de Pillow de los perfiles
+        perfiles.guardar(fig, io.BytesIO(), 'web', dpi=50)
+        perfiles.guardar(fig, io.BytesIO(), 'social', dpi=50)
+        plt.close(fig)
+
+    def trabajo(self, parametros):
+        # RenderJob de la petición (con las barras ya leídas)
+        from charts import etiquetas
+        from dxy_cli import con_medias
+        from perfiles import perfil_de
+        from render_farm import RenderJob
+
+        p = dict(PARAMETROS)
+        if parametros.get('perfil'):
+            # Formato y dpi del perfil salvo que la petición los indique
+            perfil = perfil_de(parametros['perfil'])
+            p.update(formato=perfil.formato, dpi=str(perfil.dpi))
+        p.update(parametros)
+        if p['grafico'] not in GRAFICOS:
+            raise ValueError(f"grafico desconocido: {p['grafico']} (válidos: {', '.join(GRAFICOS)})")
+        if p['formato'] not in FORMATOS:
+            raise ValueError(f"formato desconocido: {p['formato']} (válidos: {', '.join(FORMATOS)})")
+        dpi = float(p['dpi'])
+        if not 10 <= dpi <= 600:
+            raise ValueError("dpi fuera de rango (10-600)")
+
+        _, barras = self.store.get_resolucion(p['ticker'], p['inicio'], p['fin'], int(ANCHO_FIGURA * dpi),
+                                              p['intervalo'])
+        if len(barras) == 0:
+            raise LookupError(f"No hay datos de {p['ticker']} entre {p['inicio']} y {p['fin']}")
+
+        if p['perfil']:
+            savefig = dict(perfil=p['perfil'], dpi=dpi, format=p['formato'])
+        else:
+            savefig = dict(dpi=dpi, bbox_inches='tight', format=p['formato'])
+        if p['grafico'] == 'grafico_tecnico':
+            args = (con_medias(barras), p['inicio'], p['fin'])
+        else:
+            args = (barras['Close'],)
+            if p['grafico'] != 'grafico_simple':
+                savefig.update(facecolor='white', edgecolor='none')
+        nombre = f"{p['ticker']}_{p['grafico']}.{p['formato']}"
+        rotulos = etiquetas(p['ticker'], p['inicio'], barras.index[-1])[p['grafico']]
+        return RenderJob(p['grafico'], args, nombre, savefig, rotulos)
+
+    def render(self, parametros):
+        # (bytes, tipo MIME, acierto de caché)
+        import matplotlib.style
+        import render_cache
+        from render_farm import render_job
+
+        estilo = parametros.get('estilo') or ''
+        if estilo and estilo not in matplotlib.style.available:
+            raise ValueError(f"estilo desconocido: {estilo}")
+        with self.lock:
+            self.peticiones += 1
+            with matplotlib.style.context(estilo) if estilo else contextlib.nullcontext():
+                trabajo = self.trabajo(parametros)
+                clave = render_cache.clave(trabajo)
+                tipo = FORMATOS[trabajo.savefig['format']]
+                datos = self.cache.get(clave)
+                if datos is not None:
+                    return datos, tipo, True
+                destino = io.BytesIO()
+                render_job(trabajo, destino, self.plantillas.setdefault(estilo, {}))
+                datos = destino.getvalue()
+                self.cache.poner(clave, datos)
+                return datos, tipo, False
+
+    def estado(self):
+        return {'peticiones': self.peticiones, 'activo_s': round(time.time() - self.inicio, 1),
+                'pid': os.getpid(), **self.cache.estado()}
+
+
+class _Manejador(BaseHTTPRequestHandler):
+    renderizador = None
+    detalle = False
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == '/estado':
+            return self._responder(200, json.dumps(self.renderizador.estado()).encode(), 'application/json')
+        if url.path != '/grafico':
+            return self._responder(404, b'Rutas: /grafico, /estado\n', 'text/plain; charset=utf-8')
+
+        t0 = time.perf_counter()
+        try:
+            datos, tipo, acierto = self.renderizador.render(dict(parse_qsl(url.query)))
+        except ValueError as e:
+            return self._responder(400, f"{e}\n".encode(), 'text/plain; charset=utf-8')
+        except LookupError as e:
+            return self._responder(404, f"{e}\n".encode(), 'text/plain; charset=utf-8')
+        except Exception as e:
+            return self._responder(500, f"{type(e).__name__}: {e}\n".encode(), 'text/plain; charset=utf-8')
+        ms = (time.perf_counter() - t0) * 1000
+        self._responder(200, datos, tipo, {'X-Cache': 'HIT' if acierto else 'MISS', 'X-Render-Ms': f'{ms:.1f}'})
+
+    def _responder(self, codigo, cuerpo, tipo, cabeceras=None):
+        self.send_response(codigo)
+        self.send_header('Content-Type', tipo)
+        self.send_header('Content-Length', str(len(cuerpo)))
+        for nombre, valor in (cabeceras or {}).items():
+            self.send_header(nombre, valor)
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, formato, *args):
+        # Sin dirección del cliente: por socket Unix no la hay
+        if self.detalle:
+            print(f"{self.log_date_time_string()} {formato % args}", file=sys.stderr)
+
+
+class _ServidorUnix(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def servidor(renderizador, puerto=8766, host='127.0.0.1', ruta_socket=None, detalle=False):
+    # Servidor HTTP (TCP en localhost o socket Unix) sobre un Renderizador
+    manejador = type('Manejador', (_Manejador,), {'renderizador': renderizador, 'detalle': detalle})
+    if ruta_socket:
+        if os.path.exists(ruta_socket):
+            os.remove(ruta_socket)
+        return _ServidorUnix(ruta_socket, manejador)
+    return ThreadingHTTPServer((host, puerto), manejador)
+
+
+class _ConexionUnix(http.client.HTTPConnection):
+
+    def __init__(self, ruta, timeout=60):
+        super().__init__('localhost', timeout=timeout)
+        self.ruta = ruta
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.ruta)
+
+
+def pedir(direccion='http://127.0.0.1:8766', timeout=60, **parametros):
+    # Cliente: (bytes, cabeceras) del gráfico pedido. `direccion` es una URL
+    # http://host:puerto o la ruta de un socket Unix.
+    if direccion.startswith('http://'):
+        url = urlparse(direccion)
+        conexion = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=timeout)
+    else:
+        conexion = _ConexionUnix(direccion, timeout)
+    try:
+        conexion.request('GET', '/grafico?' + urlencode(parametros))
+        respuesta = conexion.getresponse()
+        cuerpo = respuesta.read()
+        if respuesta.status != 200:
+            raise RuntimeError(f"{respuesta.status}: {cuerpo.decode('utf-8', 'replace').strip()}")
+        return cuerpo, dict(respuesta.getheaders())
+    finally:
+        conexion.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Servidor persistente de gráficos del DXY')
+    parser.add_argument('--puerto', type=int, default=8766)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--socket', help='socket Unix en lugar de TCP')
+    parser.add_argument('--memoria', type=float, default=MEMORIA_MB, help='MB para imágenes en caché')
+    parser.add_argument('--detalle', action='store_true', help='registra cada petición')
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    renderizador = Renderizador(memoria_mb=args.memoria)
+    servicio = servidor(renderizador, args.puerto, args.host, args.socket, args.detalle)
+    donde = args.socket or f"http://{args.host}:{args.puerto}"
+    print(f"Precarga en {time.perf_counter() - t0:.2f} s; sirviendo gráficos en {donde}", flush=True)
+    # kill (SIGTERM) también cierra limpiamente y borra el socket
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        servicio.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servicio.server_close()
+        if args.socket and os.path.exists(args.socket):
+            os.remove(args.socket)
@@ -0,0 +1,150 @@
+# Renderizado en paralelo y sin pantalla (backend Agg)
+# Cada trabajo es un par (figura, formato): el nombre de un constructor de
+# charts.py con sus argumentos, la ruta de salida y las opciones de savefig.
+# Los trabajos se reparten en un pool de procesos, de modo que todas las
+# salidas de una ejecución (PNG, PDF, infografías...) se generan a la vez.
+#
+# Modo sin pantalla: DXY_HEADLESS=1 usa el backend Agg y nunca llama a show().
+# Las salidas que no han cambiado desde la última ejecución no se vuelven a
+# dibujar (render_cache.py; DXY_RENDER_CACHE=0 lo desactiva). Con
+# savefig=dict(perfil=...) la salida se guarda con un perfil de perfiles.py.
+import multiprocessing
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+
+import instrumentation
+from instrumentation import etapa
+
+HEADLESS = os.environ.get('DXY_HEADLESS', '0') not in ('', '0', 'false', 'no')
+
+if HEADLESS:
+    matplotlib.use('Agg')
+
+RenderJob = namedtuple('RenderJob', ['grafico', 'args', 'ruta', 'savefig', 'kwargs'],
+                       defaults=[{}, {}])
+
+
+def _iniciar_worker():
+    # Los workers nunca abren ventanas
+    matplotlib.use('Agg')
+
+
+# Plantillas ya construidas en este proceso: {(grafico, textos): plantilla}
+_plantillas = {}
+
+
+def render_job(trabajo, destino=None, plantillas=None):
+    # `destino`: archivo abierto (p. ej. BytesIO) donde guardar en lugar de
+    # trabajo.ruta, que entonces solo da nombre al trabajo. `plantillas`: tabla
+    # de plantillas propia (una por estilo en render_daemon.py)
+    import matplotlib.pyplot as plt
+    import charts
+    import perfiles
+    from chart_templates import PLANTILLAS
+
+    # Las infografías reutilizan la figura ya montada en este proceso y solo
+    # actualizan sus datos (chart_templates.py); el resto se construye de cero
+    if trabajo.grafico in PLANTILLAS:
+        plantillas = _plantillas if plantillas is None else plantillas
+        clave = (trabajo.grafico, tuple(sorted(trabajo.kwargs.items())))
+        plantilla = plantillas.get(clave)
+        with etapa('construir', grafico=trabajo.grafico, plantilla=True):
+            if plantilla is None:
+                plantilla = plantillas[clave] = PLANTILLAS[trabajo.grafico](*trabajo.args, **trabajo.kwargs)
+            else:
+                plantilla.actualizar(*trabajo.args)
+        with etapa('savefig', ruta=trabajo.ruta, dpi=trabajo.savefig.get('dpi')):
+            plantilla.guardar(trabajo.ruta if destino is None else destino, **trabajo.savefig)
+        return trabajo.ruta
+
+    with etapa('construir', grafico=trabajo.grafico):
+        fig = getattr(charts, trabajo.grafico)(*trabajo.args, **trabajo.kwargs)
+    try:
+        with etapa('savefig', ruta=trabajo.ruta, dpi=trabajo.savefig.get('dpi')):
+            perfiles.guardar(fig, trabajo.ruta if destino is None else destino, **trabajo.savefig)
+    finally:
+        plt.close(fig)
+    return trabajo.ruta
+
+
+def _render_en_worker(trabajo):
+    # Los eventos de traza del worker vuelven al padre junto con la ruta
+    try:
+        return render_job(trabajo), instrumentation.extraer_eventos()
+    except Exception:
+        instrumentation.extraer_eventos()
+        raise
+
+
+def _renderizar(trabajos, workers):
+    hechos, errores = [], {}
+
+    if workers is None:
+        workers = min(len(trabajos), os.cpu_count() or 1)
+
+    # Los scripts se ejecutan a nivel de módulo (sin guarda __main__), así que
+    # solo se usa 'fork': con 'spawn' cada worker volvería a ejecutar el script
+    if 'fork' not in multiprocessing.get_all_start_methods():
+        workers = 1
+
+    if workers <= 1:
+        for trabajo in trabajos:
+            try:
+                hechos.append(render_job(trabajo))
+            except Exception as e:
+                errores[trabajo.ruta] = e
+        return hechos, errores
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_iniciar_worker,
+                             mp_context=multiprocessing.get_context('fork')) as pool:
+        futuros = {pool.submit(_render_en_worker, trabajo): trabajo for trabajo in trabajos}
+        for futuro, trabajo in futuros.items():
+            try:
+                ruta, eventos = futuro.result()
+            except Exception as e:
+                errores[trabajo.ruta] = e
+            else:
+                hechos.append(ruta)
+                instrumentation.incorporar(eventos)
+    return hechos, errores
+
+
+def render_all(trabajos, workers=None, cache=None):
+    # Devuelve (rutas generadas, {ruta: excepción}); un fallo no detiene al resto.
+    # Con la caché (render_cache.py, activa por defecto) las salidas cuyo
+    # contenido no ha cambiado no se vuelven a dibujar y cuentan como hechas.
+    import render_cache
+
+    trabajos = list(trabajos)
+    if cache is None:
+        cache = render_cache.ACTIVA
+    if not cache:
+        with etapa('render', trabajos=len(trabajos)):
+            return _renderizar(trabajos, workers)
+
+    cache = render_cache.RenderCache()
+    with etapa('render_cache', trabajos=len(trabajos)):
+        claves = {trabajo.ruta: render_cache.clave(trabajo) for trabajo in trabajos}
+        vigentes = [t.ruta for t in trabajos if cache.vigente(t.ruta, claves[t.ruta])]
+    pendientes = [t for t in trabajos if t.ruta not in vigentes]
+
+    with etapa('render', trabajos=len(pendientes)):
+        hechos, errores = _renderizar(pendientes, workers) if pendientes else ([], {})
+    for ruta in hechos:
+        cache.registrar(ruta, claves[ruta])
+    cache.guardar()
+    return vigentes + hechos, errores
+
+
+def mostrar(grafico, *args, **kwargs):
+    # Vista interactiva (solo fuera del modo sin pantalla)
+    if HEADLESS:
+        return
+    import matplotlib.pyplot as plt
+    import charts
+
+    getattr(charts, grafico)(*args, **kwargs)
+    plt.show()
@@ -0,0 +1,180 @@
+# Escenarios declarativos del DXY
+# Cada narrativa (anclas, método de interpolación, eventos, fases, estilo y
+# simulación opcional) vive en un archivo JSON o TOML de escenarios/ en lugar
+# de en el cuerpo de un script. El lote completo se interpola de una vez: una
+# rejilla diaria común con una columna por escenario y una sola llamada a
+# DataFrame.interpolate por método. Después las figuras se renderizan en
+# paralelo con render_farm.py.
+#
+#   python3 scenario_specs.py escenarios/*.json --workers 8 --out salidas/
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+# render_farm antes que pyplot (elige Agg en modo sin pantalla)
+from render_farm import RenderJob, render_all
+from monte_carlo import dias_por_paso, por_paso, simular, un_camino, volatilidad_por_mes
+
+DIRECTORIO = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'escenarios')
+METODOS = ('time', 'linear', 'pchip', 'akima', 'cubicspline')
+
+
+def cargar_spec(ruta):
+    # Lee una spec JSON o TOML; el nombre por defecto es el del archivo
+    if ruta.endswith('.toml'):
+        import tomllib
+        with open(ruta, 'rb') as f:
+            spec = tomllib.load(f)
+    else:
+        with open(ruta, encoding='utf-8') as f:
+            spec = json.load(f)
+
+    spec.setdefault('nombre', os.path.splitext(os.path.basename(ruta))[0])
+    spec.setdefault('salida', spec['nombre'] + '.png')
+    spec.setdefault('interpolacion', 'time')
+    spec.setdefault('frecuencia', 'D')
+    spec.setdefault('lineas', [{'datos': 'tendencia', 'estilo': {'label': spec['nombre']}}])
+
+    if len(spec.get('anclas', {})) < 2:
+        raise ValueError(f"Escenario {spec['nombre']}: hacen falta al menos dos anclas")
+    if spec['interpolacion'] not in METODOS:
+        raise ValueError(f"Escenario {spec['nombre']}: interpolación desconocida "
+                         f"'{spec['interpolacion']}' (válidas: {', '.join(METODOS)})")
+    return spec
+
+
+def cargar_specs(rutas):
+    # Acepta archivos y directorios (se toman sus .json y .toml)
+    specs = []
+    for ruta in rutas:
+        if os.path.isdir(ruta):
+            specs += cargar_specs(sorted(os.path.join(ruta, nombre) for nombre in os.listdir(ruta)
+                                         if nombre.endswith(('.json', '.toml'))))
+        else:
+            specs.append(cargar_spec(ruta))
+    return specs
+
+
+def _anclas(spec):
+    anclas = pd.Series(spec['anclas'], dtype='float64')
+    anclas.index = pd.to_datetime(anclas.index)
+    return anclas.sort_index()
+
+
+def interpolar_lote(specs):
+    # Rejilla diaria común a todos los escenarios (una columna por escenario).
+    # Cada columna solo se rellena entre su primera y su última ancla.
+    anclas = {spec['nombre']: _anclas(spec) for spec in specs}
+    if len(anclas) < len(specs):
+        raise ValueError("Hay escenarios con el mismo nombre en el lote")
+    inicio = min(serie.index[0] for serie in anclas.values()).normalize()
+    fin = max(serie.index[-1] for serie in anclas.values())
+    rejilla = pd.date_range(inicio, fin, freq='D')
+
+    # Las anclas con hora (no caen en la rejilla) se añaden como filas extra
+    extra = pd.DatetimeIndex(np.concatenate([serie.index.to_numpy() for serie in anclas.values()]))
+    indice = rejilla.union(extra.unique())
+    tabla = pd.DataFrame({nombre: serie.reindex(indice) for nombre, serie in anclas.items()})
+
+    # Una pasada vectorizada por método de interpolación
+    for metodo in {spec['interpolacion'] for spec in specs}:
+        columnas = [spec['nombre'] for spec in specs if spec['interpolacion'] == metodo]
+        tabla[columnas] = tabla[columnas].interpolate(method=metodo, limit_area='inside')
+    return tabla.reindex(rejilla)
+
+
+def serie_tendencia(spec, tabla):
+    # Tendencia del escenario en su frecuencia (diaria, semanal...)
+    anclas = _anclas(spec)
+    fechas = pd.date_range(anclas.index[0], anclas.index[-1], freq=spec['frecuencia'])
+    return tabla[spec['nombre']].reindex(fechas).rename('tendencia')
+
+
+def _regimenes(volatilidad):
+    # "regimenes": ruta a un JSON de regimenes.py (relativa a escenarios/) o
+    # {"ticker", "inicio", "fin"} para calibrar en el momento con el BarStore
+    import regimenes
+
+    origen = volatilidad['regimenes']
+    if isinstance(origen, str):
+        resumen = regimenes.cargar(os.path.join(DIRECTORIO, origen))
+    else:
+        from bar_store import BarStore
+
+        ticker = origen.get('ticker', 'DX-Y.NYB')
+        cierres = BarStore().get(ticker, origen['inicio'], origen['fin'], origen.get('intervalo', '1d'))
+        resumen = regimenes.ajustar({ticker: cierres['Close'].dropna()},
+                                    estados=origen.get('estados', regimenes.ESTADOS))[ticker].resumen
+    return regimenes.regimenes_de(resumen, volatilidad.get('arranque', 'actual'))
+
+
+def preparar(spec, tendencia):
+    # DataFrame que dibuja charts.escenario: tendencia y, si la spec lo pide,
+    # un camino simulado y las bandas de percentiles (monte_carlo.py)
+    datos = tendencia.to_frame()
+    simulacion = spec.get('simulacion')
+    if simulacion:
+        volatilidad = simulacion.get('volatilidad', {})
+        regimenes = None
+        if 'regimenes' in volatilidad:
+            # Volatilidad medida (regimenes.py): la sigma de cada estado es un
+            # rendimiento, así que la escala del ruido es el nivel de la tendencia
+            regimenes = por_paso(_regimenes(volatilidad), dias_por_paso(datos.index))
+            sigma = tendencia.to_numpy()
+        else:
+            sigma = volatilidad_por_mes(datos.index,
+                                        {int(mes): s for mes, s in volatilidad.get('por_mes', {}).items()},
+                                        volatilidad.get('defecto', 0.0))
+        semilla = simulacion.get('semilla')
+        persistencia = simulacion.get('persistencia', 0.0)
+        datos['simulado'] = un_camino(tendencia, sigma, seed=semilla, persistencia=persistencia,
+                                      regimenes=regimenes)
+        bandas = simular(tendencia, sigma, n_paths=simulacion.get('caminos', 10000),
+                         seed=semilla, persistencia=persistencia, regimenes=regimenes)
+        datos = datos.join(bandas.drop(columns='Tendencia'))
+    return datos
+
+
+def render_lote(specs, salida='.', workers=None, savefig=None):
+    # Interpola todo el lote y renderiza cada escenario en la farm de procesos.
+    # Devuelve (rutas generadas, {ruta: excepción}) como render_all.
+    tabla = interpolar_lote(specs)
+    trabajos = [RenderJob('escenario', (spec, preparar(spec, serie_tendencia(spec, tabla))),
+                          os.path.join(salida, spec['salida']), savefig or {})
+                for spec in specs]
+    if salida != '.':
+        os.makedirs(salida, exist_ok=True)
+    return render_all(trabajos, workers=workers)
+
+
+def render_escenario(nombre):
+    # Atajo para los scripts: renderiza escenarios/<nombre>.json en el directorio actual
+    hechos, errores = render_lote([cargar_spec(os.path.join(DIRECTORIO, nombre + '.json'))])
+    if errores:
+        raise next(iter(errores.values()))
+    return hechos[0]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Renderiza escenarios declarativos del DXY')
+    parser.add_argument('specs', nargs='*', default=[DIRECTORIO],
+                        help='archivos .json/.toml o directorios (por defecto escenarios/)')
+    parser.add_argument('--out', default='.', help='directorio de salida')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--dpi', type=float, default=None)
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    specs = cargar_specs(args.specs)
+    hechos, errores = render_lote(specs, args.out, args.workers,
+                                  None if args.dpi is None else {'dpi': args.dpi})
+    for ruta in hechos:
+        print(f"✅ {ruta}")
+    for ruta, error in errores.items():
+        print(f"❌ {ruta}: {error}")
+    print(f"{len(hechos)} escenarios renderizados en {time.perf_counter() - t0:.2f} s")
+    raise SystemExit(1 if errores else 0)
@@ -0,0 +1,230 @@
+# Motor incremental de indicadores (MA_20, MA_50, RSI 14 y Signal; las
+# ventanas de las medias son configurables y dan nombre a sus columnas)
+# Mismas definiciones que graph_ds.py, pero con estado O(1) por indicador:
+# cada barra nueva actualiza las medias sin recalcular el histórico. El estado
+# se guarda en JSON junto a las barras del almacén local (bar_store.py).
+# La última barra se puede revisar (el almacén reescribe la del día en curso
+# cuando llega corregida): cada indicador recuerda cómo deshacer su última
+# actualización y la barra revisada sustituye a su contribución anterior.
+import json
+import math
+import os
+
+import pandas as pd
+
+
+class RollingMean:
+    # Media móvil sobre un buffer circular (equivale a rolling(window, min_periods))
+
+    def __init__(self, window, min_periods=None):
+        self.window = window
+        self.min_periods = window if min_periods is None else min_periods
+        self.buffer = []
+        self.pos = 0
+        self.suma = 0.0
+        # Para deshacer la última actualización: el valor que pisó en el buffer
+        # (None si se añadió al final)
+        self.deshacible = False
+        self.pisado = None
+
+    def update(self, valor):
+        self.deshacible = True
+        if len(self.buffer) < self.window:
+            self.pisado = None
+            self.buffer.append(valor)
+            self.suma += valor
+        else:
+            self.pisado = self.buffer[self.pos]
+            self.suma += valor - self.buffer[self.pos]
+            self.buffer[self.pos] = valor
+            self.pos = (self.pos + 1) % self.window
+            # Cada vuelta completa se recalcula la suma para no acumular error
+            # de redondeo (coste amortizado O(1) por barra)
+            if self.pos == 0:
+                self.suma = math.fsum(self.buffer)
+        return self.value
+
+    def deshacer(self):
+        # Retira la última actualización (solo una); False si no hay nada que deshacer
+        if not self.deshacible:
+            return False
+        if self.pisado is None:
+            self.buffer.pop()
+        else:
+            self.pos = (self.pos - 1) % self.window
+            self.buffer[self.pos] = self.pisado
+        self.suma = math.fsum(self.buffer)
+        self.deshacible = False
+        return True
+
+    @property
+    def value(self):
+        if len(self.buffer) < self.min_periods:
+            return math.nan
+        return self.suma / len(self.buffer)
+
+    def state(self):
+        return {'window': self.window, 'min_periods': self.min_periods,
+                'buffer': self.buffer, 'pos': self.pos,
+                'deshacible': self.deshacible, 'pisado': self.pisado}
+
+    @classmethod
+    def from_state(cls, estado):
+        media = cls(estado['window'], estado['min_periods'])
+        media.buffer = list(estado['buffer'])
+        media.pos = estado['pos']
+        media.suma = math.fsum(media.buffer)
+        # Estados guardados antes de poder revisar la última barra: no se deshace
+        media.deshacible = estado.get('deshacible', False)
+        media.pisado = estado.get('pisado')
+        return media
+
+
+class SimpleRSI:
+    # RSI "simplificado" de graph_ds.py: medias simples de ganancias y pérdidas.
+    # Como en pandas, la primera barra (delta NaN) cuenta como ganancia y pérdida 0.
+
+    def __init__(self, periodo=14):
+        self.periodo = periodo
+        self.ganancias = RollingMean(periodo)
+        self.perdidas = RollingMean(periodo)
+        self.ultimo = None
+        # Cierre anterior a la última actualización (para deshacerla)
+        self.penultimo = None
+
+    def update(self, close):
+        delta = 0.0 if self.ultimo is None else close - self.ultimo
+        self.penultimo = self.ultimo
+        self.ultimo = close
+        self.ganancias.update(delta if delta > 0 else 0.0)
+        self.perdidas.update(-delta if delta < 0 else 0.0)
+        return self.value
+
+    def deshacer(self):
+        if not (self.ganancias.deshacer() and self.perdidas.deshacer()):
+            return False
+        self.ultimo = self.penultimo
+        return True
+
+    @property
+    def value(self):
+        ganancia, perdida = self.ganancias.value, self.perdidas.value
+        if math.isnan(ganancia) or math.isnan(perdida):
+            return math.nan
+        if perdida == 0:
+            return math.nan if ganancia == 0 else 100.0
+        return 100 - (100 / (1 + ganancia / perdida))
+
+    def state(self):
+        return {'periodo': self.periodo, 'ultimo': self.ultimo, 'penultimo': self.penultimo,
+                'ganancias': self.ganancias.state(), 'perdidas': self.perdidas.state()}
+
+    @classmethod
+    def from_state(cls, estado):
+        rsi = cls(estado['periodo'])
+        rsi.ultimo = estado['ultimo']
+        rsi.penultimo = estado.get('penultimo')
+        rsi.ganancias = RollingMean.from_state(estado['ganancias'])
+        rsi.perdidas = RollingMean.from_state(estado['perdidas'])
+        return rsi
+
+
+class IndicatorEngine:
+
+    def __init__(self, rapida=20, lenta=50, rsi_periodo=14):
+        self.ma_rapida = RollingMean(rapida, min_periods=1)
+        self.ma_lenta = RollingMean(lenta, min_periods=1)
+        self.rsi = SimpleRSI(rsi_periodo)
+        self.ultima_fecha = None
+
+    def update(self, fecha, close):
+        # Procesa una barra. La de la última fecha es una revisión: sustituye a
+        # la versión anterior; las anteriores a la última se ignoran.
+        fecha = pd.Timestamp(fecha)
+        if self.ultima_fecha is not None:
+            if fecha < self.ultima_fecha:
+                return None
+            if fecha == self.ultima_fecha and not self.deshacer():
+                return None
+
+        self.ultima_fecha = fecha
+        self.ma_rapida.update(close)
+        self.ma_lenta.update(close)
+        self.rsi.update(close)
+        return self.valores()
+
+    def deshacer(self):
+        # Retira la contribución de la última barra de todos los indicadores
+        # (todos se actualizan juntos, así que o se pueden deshacer todos o ninguno)
+        if not self.ma_rapida.deshacible:
+            return False
+        self.ma_rapida.deshacer()
+        self.ma_lenta.deshacer()
+        self.rsi.deshacer()
+        return True
+
+    def update_batch(self, barras):
+        # Procesa un DataFrame de barras y devuelve los indicadores de las nuevas
+        # (y de la última ya vista, si viene revisada)
+        filas = {}
+        for fecha, close in zip(barras.index, barras['Close'].to_numpy()):
+            valores = self.update(fecha, float(close))
+            if valores is not None:
+                filas[fecha] = valores
+        return pd.DataFrame.from_dict(filas, orient='index', columns=self.columnas())
+
+    def columnas(self):
+        # Las medias se nombran por su ventana (MA_20 y MA_50 por defecto)
+        return [f'MA_{self.ma_rapida.window}', f'MA_{self.ma_lenta.window}', 'RSI', 'Signal']
+
+    def valores(self):
+        rapida, lenta = self.ma_rapida.value, self.ma_lenta.value
+        return dict(zip(self.columnas(),
+                        [rapida, lenta, self.rsi.value, 'ALCISTA' if rapida > lenta else 'BAJISTA']))
+
+    def state(self):
+        return {'ultima_fecha': None if self.ultima_fecha is None else str(self.ultima_fecha),
+                'ma_rapida': self.ma_rapida.state(),
+                'ma_lenta': self.ma_lenta.state(),
+                'rsi': self.rsi.state()}
+
+    @classmethod
+    def from_state(cls, estado):
+        motor = cls()
+        motor.ma_rapida = RollingMean.from_state(estado['ma_rapida'])
+        motor.ma_lenta = RollingMean.from_state(estado['ma_lenta'])
+        motor.rsi = SimpleRSI.from_state(estado['rsi'])
+        if estado['ultima_fecha'] is not None:
+            motor.ultima_fecha = pd.Timestamp(estado['ultima_fecha'])
+        return motor
+
+    def save(self, ruta):
+        with open(ruta + '.tmp', 'w') as f:
+            json.dump(self.state(), f)
+        os.replace(ruta + '.tmp', ruta)
+
+    @classmethod
+    def load(cls, ruta):
+        if not os.path.exists(ruta):
+            return cls()
+        with open(ruta) as f:
+            return cls.from_state(json.load(f))
+
+
+def ruta_estado(store, ticker, interval='1d'):
+    # El estado de los indicadores vive junto a las barras del almacén
+    return os.path.join(store.directorio(ticker, interval), 'indicators.json')
+
+
+def actualizar_indicadores(store, ticker, interval='1d'):
+    # Actualización diaria: solo se leen del disco las barras desde la última
+    # del estado guardado, incluida (puede haberse reescrito con datos corregidos)
+    ruta = ruta_estado(store, ticker, interval)
+    motor = IndicatorEngine.load(ruta)
+    barras, _ = store.cargar(ticker, interval, start=motor.ultima_fecha)
+
+    nuevos = motor.update_batch(barras)
+    if len(nuevos):
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        motor.save(ruta)
+    return motor, nuevos
@@ -0,0 +1,174 @@
+# Servidor HTTP local de respuestas grabadas (sustituto de la red en pruebas)
+# Sirve barras en CSV con el mismo contrato que espera HttpProvider
+# (data_sources.py):
+#   GET /bars?ticker=EURUSD=X&start=2025-01-01&end=2026-01-05&interval=1d
+# Las respuestas salen de un directorio de grabaciones con un CSV por ticker
+# (<ticker>_<intervalo>.csv, ver grabar()); con --csv se sirve el mismo CSV
+# para cualquier ticker. Se pueden inyectar latencia y fallos para medir el
+# rendimiento y el manejo de errores de async_fetch.py sin red:
+#   - fallos={ticker: n}: las n primeras peticiones del ticker devuelven 503
+#   - tickers sin grabación: 404
+#
+#   python3 stub_server.py --dir grabaciones/ --puerto 8765 --latencia 0.05 --fallos EURUSD=X:2
+#   DXY_DATA_SOURCE=http://127.0.0.1:8765 python3 async_fetch.py DX-Y.NYB EURUSD=X
+import argparse
+import os
+import threading
+import time
+import urllib.parse
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+
+from data_sources import aplanar_columnas, nombre_grabacion
+
+
+def grabar(tickers, start, end, directorio, interval='1d', provider=None):
+    # Graba las respuestas del proveedor real (Yahoo por defecto) para servirlas después
+    from data_sources import get_provider
+
+    provider = get_provider(provider)
+    os.makedirs(directorio, exist_ok=True)
+    for ticker in tickers:
+        datos = provider.download(ticker, start, end, interval)
+        datos.to_csv(os.path.join(directorio, nombre_grabacion(ticker, interval)))
+
+
+class _Handler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        stub = self.server.stub
+        url = urllib.parse.urlsplit(self.path)
+        if url.path != '/bars':
+            return self._responder(404, 'ruta desconocida')
+        consulta = dict(urllib.parse.parse_qsl(url.query))
+        ticker = consulta.get('ticker', '')
+        stub.registrar(ticker)
+
+        if stub.latencia:
+            time.sleep(stub.latencia)
+        if stub.debe_fallar(ticker):
+            return self._responder(503, 'fallo inyectado')
+        datos = stub.barras(ticker, consulta.get('interval', '1d'))
+        if datos is None:
+            return self._responder(404, f'sin grabación para {ticker}')
+
+        mascara = (datos.index >= pd.Timestamp(consulta['start'])) & (datos.index < pd.Timestamp(consulta['end']))
+        self._responder(200, datos.loc[mascara].to_csv(), 'text/csv')
+
+    def _responder(self, codigo, cuerpo, tipo='text/plain'):
+        cuerpo = cuerpo.encode()
+        self.send_response(codigo)
+        self.send_header('Content-Type', f'{tipo}; charset=utf-8')
+        self.send_header('Content-Length', str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, formato, *args):
+        if self.server.stub.verbose:
+            super().log_message(formato, *args)
+
+
+class StubServer:
+    # Servidor en un hilo; se usa como contexto:
+    #   with StubServer(csv='dxy.csv', latencia=0.05) as stub:
+    #       provider = HttpProvider(stub.url)
+
+    def __init__(self, directorio=None, csv=None, host='127.0.0.1', puerto=0,
+                 latencia=0.0, fallos=None, verbose=False):
+        self.directorio = directorio
+        self.csv = csv
+        self.latencia = latencia
+        self.fallos = dict(fallos or {})
+        self.verbose = verbose
+        self.peticiones = Counter()
+        self._cargados = {}
+        self._lock = threading.Lock()
+        self.servidor = ThreadingHTTPServer((host, puerto), _Handler)
+        self.servidor.daemon_threads = True
+        self.servidor.stub = self
+        self._hilo = None
+
+    @property
+    def url(self):
+        host, puerto = self.servidor.server_address[:2]
+        return f'http://{host}:{puerto}'
+
+    def registrar(self, ticker):
+        with self._lock:
+            self.peticiones[ticker] += 1
+
+    def debe_fallar(self, ticker):
+        with self._lock:
+            if self.fallos.get(ticker, 0) > 0:
+                self.fallos[ticker] -= 1
+                return True
+        return False
+
+    def barras(self, ticker, interval):
+        if self.csv is not None:
+            ruta = self.csv
+        elif self.directorio is not None:
+            ruta = os.path.join(self.directorio, nombre_grabacion(ticker, interval))
+        else:
+            return None
+        with self._lock:
+            if ruta not in self._cargados:
+                if not os.path.exists(ruta):
+                    return None
+                self._cargados[ruta] = aplanar_columnas(pd.read_csv(ruta, index_col=0, parse_dates=True))
+            return self._cargados[ruta]
+
+    def iniciar(self):
+        self._hilo = threading.Thread(target=self.servidor.serve_forever, daemon=True)
+        self._hilo.start()
+        return self
+
+    def detener(self):
+        self.servidor.shutdown()
+        self.servidor.server_close()
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *exc):
+        self.detener()
+
+
+def _fallos(texto):
+    # 'EURUSD=X:2,JPY=X:1' -> {'EURUSD=X': 2, 'JPY=X': 1}
+    fallos = {}
+    for parte in filter(None, texto.split(',')):
+        ticker, _, n = parte.rpartition(':')
+        fallos[ticker] = int(n)
+    return fallos
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Servidor local de barras grabadas')
+    parser.add_argument('--dir', help='directorio con <ticker>_<intervalo>.csv')
+    parser.add_argument('--csv', help='un único CSV servido para cualquier ticker')
+    parser.add_argument('--puerto', type=int, default=8765)
+    parser.add_argument('--latencia', type=float, default=0.0, help='segundos por petición')
+    parser.add_argument('--fallos', default='', help="503 inyectados, p. ej. 'EURUSD=X:2'")
+    parser.add_argument('--grabar', nargs='*', metavar='TICKER',
+                        help='graba estos tickers del proveedor real en --dir y termina')
+    parser.add_argument('--inicio', default='2025-01-01')
+    parser.add_argument('--fin', default='2026-01-05')
+    args = parser.parse_args()
+
+    if args.grabar:
+        grabar(args.grabar, args.inicio, args.fin, args.dir)
+        print(f"✓ {len(args.grabar)} tickers grabados en {args.dir}")
+        raise SystemExit(0)
+
+    stub = StubServer(args.dir, args.csv, puerto=args.puerto, latencia=args.latencia,
+                      fallos=_fallos(args.fallos), verbose=True)
+    print(f"Sirviendo barras en {stub.url} (Ctrl+C para terminar)")
+    try:
+        stub.servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub.servidor.server_close()